@@ -1,55 +1,168 @@
-from backend.schemas.analysis import AnalysisRequest, AnalysisResponse, AgentStatus
+from backend.schemas.analysis import AnalysisRequest, AnalysisResponse, AgentStatus, RunProgress, TokenUsageRow
 from backend.services.graph import run_financial_analysis
+from backend.services.quick_analysis import run_quick_analysis
+from backend.services.report_store import report_store, REPORT_MAX_AGE_SECONDS
+from backend.services.earnings import earnings_calendar
+from backend.services.cancellation import RunContext, RunCancelled, register_run, unregister_run, get_run
+from backend.services.admission import admission_for, AdmissionRejected
+from backend.services.checkpoints import stage_checkpointer, CHECKPOINT_MAX_AGE_SECONDS
+from backend.services.cache import TTLCache
+from backend.services.metrics import metrics
+from backend.services.symbols import symbol_index
+from backend.services.token_usage import RunTokens, token_ledger, RUN_TOKEN_BUDGET
 from datetime import datetime
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+# (agent name, stage, label, LLM agents recorded for it) per mode. The
+# writer's digests are produced by the summarizer.
+FULL_STAGES = [
+    ("Market Researcher", "research", "Research", ["research"]),
+    ("Data Analyst", "analysis", "Analysis", ["analyst"]),
+    ("Report Writer", "report", "Report", ["writer", "summarizer"]),
+]
+MODE_STAGES = {
+    "quick": [("Quick Analyst", "report", "Summary", ["quick"])],
+    "standard": FULL_STAGES,
+    "deep": FULL_STAGES,
+}
+
+STAGE_FIELDS = {"research": "research_data", "analysis": "analysis_data", "report": "report_data"}
+
+
+def _store_key(ticker: str, mode: str) -> str:
+    # Standard reports keep the bare ticker so existing entries stay valid.
+    return ticker if mode == "standard" else f"{ticker}@{mode}"
+
+
+def _run_token_budget(request: AnalysisRequest) -> int:
+    budgets = [b for b in (request.token_budget, RUN_TOKEN_BUDGET) if b]
+    return min(budgets) if budgets else 0
+
+
+# Status of background runs started by this process. Stage outputs live in
+# the checkpoint store, so progress is readable from any worker.
+_background_runs = TTLCache(ttl=CHECKPOINT_MAX_AGE_SECONDS, max_entries=10000)
 
 
 class AnalysisInteractor:
 
-    def execute_analysis(self, request: AnalysisRequest) -> AnalysisResponse:
+    def get_stored_report(self, request: AnalysisRequest) -> Optional[AnalysisResponse]:
+        # Stored reports are generic; portfolio-specific requests always run.
+        if request.holdings or request.max_age_seconds == 0:
+            return None
+        
+        # The default is stretched between earnings releases; no report from
+        # before the last release is served either way.
+        explicit = request.max_age_seconds is not None
+        max_age = earnings_calendar.max_age_for(
+            request.ticker, request.max_age_seconds if explicit else REPORT_MAX_AGE_SECONDS, extend=not explicit
+        )
+        payload = report_store.get(_store_key(request.ticker, request.mode), max_age=max_age)
+        if payload is None:
+            return None
+        
+        payload["cached"] = True
+        return AnalysisResponse(**payload)
+    
+    def get_stored_reports(self, tickers: List[str], max_age: Optional[int] = None) -> Tuple[List[AnalysisResponse], List[str]]:
+        reports, missing = [], []
+        for ticker in tickers:
+            payload = report_store.get(
+                ticker, max_age=earnings_calendar.max_age_for(ticker, max_age or REPORT_MAX_AGE_SECONDS, extend=not max_age)
+            )
+            if payload is None:
+                missing.append(ticker)
+            else:
+                payload["cached"] = True
+                reports.append(AnalysisResponse(**payload))
+        return reports, missing
+    
+    def execute_analysis(
+        self,
+        request: AnalysisRequest,
+        run: RunContext = None,
+        client_id: str = "anonymous",
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> AnalysisResponse:
+
+        stored = self.get_stored_report(request)
+        if stored is not None:
+            return stored
 
+        run = register_run(run or RunContext())
+        run.tokens = RunTokens(request.ticker, client_id, budget=_run_token_budget(request))
+        run.mode = request.mode
+        start = time.perf_counter()
         try:
-            result = run_financial_analysis(
-                ticker=request.ticker,
-                company_name=request.company_name
-            )
+            if request.mode == "quick":
+                # on_token receives the summary as it streams.
+                result = run_quick_analysis(
+                    ticker=request.ticker,
+                    company_name=request.company_name,
+                    holdings=request.holdings,
+                    run_id=run.run_id,
+                    on_token=on_token
+                )
+            else:
+                result = run_financial_analysis(
+                    ticker=request.ticker,
+                    company_name=request.company_name,
+                    holdings=request.holdings,
+                    run_id=run.run_id,
+                    mode=request.mode
+                )
+            metrics.observe("analysis_latency_seconds", time.perf_counter() - start, mode=request.mode)
+            metrics.increment("analysis_runs", mode=request.mode, status=result.get("status", "completed"))
+            
+            if result.get("status") == "cancelled":
+                metrics.increment("analysis_runs_cancelled", reason=run.reason or "cancelled")
 
             research_data = result.get("research_data", {})
             analysis_data = result.get("analysis_data", {})
             report_data = result.get("report_data", {})
 
-            agent_statuses = [
-                AgentStatus(
-                    agent_name="Market Researcher",
-                    status="completed" if research_data else "failed",
-                    message="Research completed successfully" if research_data else "Research failed",
-                    timestamp=datetime.now()
-                ),
-                AgentStatus(
-                    agent_name="Data Analyst",
-                    status="completed" if analysis_data else "failed",
-                    message="Analysis completed successfully" if analysis_data else "Analysis failed",
-                    timestamp=datetime.now()
-                ),
-                AgentStatus(
-                    agent_name="Report Writer",
-                    status="completed" if report_data else "failed",
-                    message="Report completed successfully" if report_data else "Report failed",
-                    timestamp=datetime.now()
+            stage_results = result.get("stage_results") or {}
+            
+            def stage_status(agent_name: str, stage: str, label: str, agents: List[str], succeeded: bool) -> AgentStatus:
+                if succeeded:
+                    stage_result = stage_results.get(stage)
+                    detail = f" ({stage_result.describe()})" if stage_result is not None else ""
+                    message = f"{label} completed successfully{detail}"
+                else:
+                    message = f"{label} failed"
+                return AgentStatus(
+                    agent_name=agent_name,
+                    status="completed" if succeeded else "failed",
+                    message=message,
+                    timestamp=datetime.now(),
+                    **run.tokens.combined(agents)
                 )
+            
+            agent_statuses = [
+                stage_status(agent_name, stage, label, agents, bool(result.get(STAGE_FIELDS[stage])))
+                for agent_name, stage, label, agents in MODE_STAGES[request.mode]
             ]
 
             response = AnalysisResponse(
                 ticker=request.ticker.upper(),
                 company_name=request.company_name or request.ticker.upper(),
                 status=result.get("status", "completed"),
+                mode=request.mode,
                 research_data=research_data if research_data else None,
                 analysis_data=analysis_data if analysis_data else None,
                 report_data=report_data if report_data else None,
                 agent_statuses=agent_statuses,
                 error=result.get("error"),
+                run_id=run.run_id,
                 timestamp=datetime.now()
             )
             
+            if response.status == "completed" and not request.holdings:
+                report_store.save(_store_key(response.ticker, request.mode), response.model_dump(mode="json"))
+            
             return response
             
         except Exception as e:
@@ -58,21 +171,101 @@ class AnalysisInteractor:
                 ticker=request.ticker.upper(),
                 company_name=request.company_name,
                 status="error",
+                mode=request.mode,
                 error=str(e),
+                run_id=run.run_id,
                 agent_statuses=[],
                 timestamp=datetime.now()
             )
+        
+        finally:
+            unregister_run(run)
     
     
-    def validate_ticker(self, ticker: str) -> bool:
-        if not ticker:
-            return False
+    def start_analysis(self, request: AnalysisRequest, client_id: str) -> RunProgress:
+        stored = self.get_stored_report(request)
+        if stored is not None:
+            return RunProgress(
+                ticker=stored.ticker,
+                status="completed",
+                completed_stages=[stage for stage, field in STAGE_FIELDS.items() if getattr(stored, field)],
+                research_data=stored.research_data,
+                analysis_data=stored.analysis_data,
+                report_data=stored.report_data,
+                cached=True
+            )
         
-        ticker = ticker.strip().upper()
-        if len(ticker) < 1 or len(ticker) > 5:
-            return False
+        run = register_run(RunContext.for_request(request.run_id, request.deadline_seconds))
+        ticker = request.ticker.upper()
+        _background_runs.set(run.run_id, {"ticker": ticker, "status": "queued"})
         
-        if not ticker.isalpha():
+        def worker():
+            try:
+                with admission_for(request.mode).admit(client_id, request.priority, run):
+                    _background_runs.set(run.run_id, {"ticker": ticker, "status": "running"})
+                    response = self.execute_analysis(request, run=run, client_id=client_id)
+                outcome = {"status": response.status, "error": response.error}
+            except AdmissionRejected as e:
+                outcome = {"status": "rejected", "error": e.reason}
+            except RunCancelled as e:
+                outcome = {"status": "cancelled", "error": e.reason}
+            finally:
+                unregister_run(run)
+            _background_runs.set(run.run_id, {"ticker": ticker, **outcome})
+        
+        threading.Thread(target=worker, name=f"analysis-{run.run_id[:8]}", daemon=True).start()
+        return RunProgress(run_id=run.run_id, ticker=ticker, status="queued")
+    
+    def get_progress(self, run_id: str) -> Optional[RunProgress]:
+        tracked = _background_runs.get(run_id)
+        checkpoint = stage_checkpointer.load(run_id)
+        if tracked is None and checkpoint is None:
+            return None
+        
+        checkpoint = checkpoint or {}
+        tracked = tracked or {}
+        status = tracked.get("status")
+        if status is None:
+            # Started by another worker: infer from the checkpoint.
+            stored_status = checkpoint.get("status")
+            status = stored_status if stored_status in ("completed", "error", "cancelled") else "running"
+        
+        return RunProgress(
+            run_id=run_id,
+            ticker=tracked.get("ticker") or checkpoint.get("ticker", ""),
+            status=status,
+            completed_stages=checkpoint.get("completed_stages") or [],
+            research_data=checkpoint.get("research_data") or None,
+            analysis_data=checkpoint.get("analysis_data") or None,
+            report_data=checkpoint.get("report_data") or None,
+            error=tracked.get("error") or checkpoint.get("error") or None
+        )
+    
+    def get_token_usage(self, ticker: Optional[str], days: int) -> List[TokenUsageRow]:
+        return [TokenUsageRow(**row) for row in token_ledger.usage(ticker, days=days)]
+    
+    def cancel_analysis(self, run_id: str) -> bool:
+        run = get_run(run_id)
+        if run is None:
             return False
+        run.cancel("client_cancelled")
+        return True
+    
+    def validate_ticker(self, ticker: str) -> bool:
+        return symbol_index.validate(ticker) is None
+    
+    def resolve_request(self, request: AnalysisRequest) -> AnalysisRequest:
+        """Canonical ticker and company name for `request`, from the symbol
+        index. Raises ValueError before any agent work for tickers that are
+        malformed or not in the universe."""
+        error = symbol_index.validate(request.ticker)
+        if error:
+            raise ValueError(error)
         
-        return True
\ No newline at end of file
+        record = symbol_index.resolve(request.ticker)
+        if record is None:
+            return request.model_copy(update={"ticker": request.ticker.strip().upper()})
+        return request.model_copy(update={
+            "ticker": record["symbol"],
+            "company_name": request.company_name or record["name"] or None
+        })
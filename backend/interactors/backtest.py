@@ -0,0 +1,34 @@
+from backend.schemas.backtest import BacktestRequest, BacktestResponse
+from backend.services.backtest import run_backtest, BUILTIN_RULES, BacktestInputError, BacktestNotFound
+from backend.services.symbols import symbol_index, well_formed
+
+
+class BacktestInteractor:
+
+    def execute_backtest(self, request: BacktestRequest) -> BacktestResponse:
+        """Raises BacktestInputError for a malformed ticker, period or
+        horizon, and BacktestNotFound for unknown tickers or when none of
+        them has price history."""
+        malformed = [t for t in request.tickers if not well_formed(t)]
+        if malformed:
+            raise BacktestInputError(f"Invalid ticker symbol(s): {', '.join(malformed)}")
+        if symbol_index.loaded:
+            unknown = [t for t in request.tickers if symbol_index.resolve(t) is None]
+            if unknown:
+                raise BacktestNotFound(f"Unknown ticker symbol(s): {', '.join(unknown)}")
+
+        rules = dict(BUILTIN_RULES) if request.include_builtin_rules or not request.rules else {}
+        for rule in request.rules or []:
+            rules[rule.name] = {"expression": rule.expression, "direction": rule.direction}
+
+        result = run_backtest(
+            tickers=request.tickers,
+            rules=rules,
+            period=request.period,
+            horizon=request.horizon
+        )
+
+        if result.get("error"):
+            raise BacktestNotFound(result["error"])
+
+        return BacktestResponse(**result)
@@ -0,0 +1,115 @@
+from backend.schemas.analysis import AgentStatus
+from backend.schemas.compare import CompareRequest, CompareResponse
+from backend.services.comparison import run_comparison
+from backend.services.report_store import report_store, REPORT_MAX_AGE_SECONDS
+from backend.services.earnings import earnings_calendar
+from backend.services.cancellation import RunContext, register_run, unregister_run
+from backend.services.metrics import metrics
+from backend.services.symbols import symbol_index
+from backend.services.token_usage import RunTokens, RUN_TOKEN_BUDGET
+from datetime import datetime
+import time
+from typing import Dict, Optional
+
+
+def _store_key(tickers) -> str:
+    # The same set of tickers in any order is the same comparison.
+    return "compare:" + "+".join(sorted({t.upper() for t in tickers}))
+
+
+class CompareInteractor:
+
+    def resolve_request(self, request: CompareRequest) -> CompareRequest:
+        """Canonical, de-duplicated tickers for `request`. Raises ValueError
+        for a malformed or unknown ticker, or fewer than two distinct ones."""
+        tickers = []
+        for ticker in request.tickers:
+            error = symbol_index.validate(ticker)
+            if error:
+                raise ValueError(error)
+            record = symbol_index.resolve(ticker)
+            symbol = record["symbol"] if record else ticker.strip().upper()
+            if symbol not in tickers:
+                tickers.append(symbol)
+        if len(tickers) < 2:
+            raise ValueError("A comparison needs at least two different tickers")
+        return request.model_copy(update={"tickers": tickers})
+    
+    def company_names(self, request: CompareRequest) -> Dict[str, str]:
+        names = {}
+        for ticker in request.tickers:
+            record = symbol_index.resolve(ticker)
+            if record and record["name"]:
+                names[ticker] = record["name"]
+        return names
+    
+    def get_stored_comparison(self, request: CompareRequest) -> Optional[CompareResponse]:
+        if request.max_age_seconds == 0:
+            return None
+        
+        explicit = request.max_age_seconds is not None
+        max_age = min(
+            earnings_calendar.max_age_for(ticker, request.max_age_seconds if explicit else REPORT_MAX_AGE_SECONDS,
+                                          extend=not explicit)
+            for ticker in request.tickers
+        )
+        payload = report_store.get(_store_key(request.tickers), max_age=max_age)
+        if payload is None:
+            return None
+        
+        payload["cached"] = True
+        return CompareResponse(**payload)
+    
+    def execute_comparison(self, request: CompareRequest, run: RunContext = None, client_id: str = "anonymous") -> CompareResponse:
+        stored = self.get_stored_comparison(request)
+        if stored is not None:
+            return stored
+        
+        budgets = [b for b in (request.token_budget, RUN_TOKEN_BUDGET) if b]
+        run = register_run(run or RunContext())
+        run.tokens = RunTokens("+".join(request.tickers), client_id, budget=min(budgets) if budgets else 0)
+        start = time.perf_counter()
+        try:
+            names = self.company_names(request)
+            result = run_comparison(request.tickers, names, run_id=run.run_id)
+            metrics.observe("compare_latency_seconds", time.perf_counter() - start, tickers=len(request.tickers))
+            metrics.increment("compare_runs", status=result["status"])
+            
+            facts = result.get("facts") or {}
+            completed = result["status"] == "completed"
+            response = CompareResponse(
+                tickers=request.tickers,
+                company_names={ticker: f["company"] for ticker, f in facts.items()} or names,
+                status=result["status"],
+                tables=result.get("tables") or [],
+                report_text=result.get("report_text") or None,
+                facts=facts,
+                agent_statuses=[AgentStatus(
+                    agent_name="Comparison Writer",
+                    status="completed" if completed else "failed",
+                    message=f"Compared {len(request.tickers)} tickers" if completed else "Comparison failed",
+                    timestamp=datetime.now(),
+                    **run.tokens.combined(["compare"])
+                )],
+                error=result.get("error") or None,
+                run_id=run.run_id,
+                timestamp=datetime.now()
+            )
+            
+            if completed:
+                report_store.save(_store_key(request.tickers), response.model_dump(mode="json"))
+            
+            return response
+        
+        except Exception as e:
+            
+            return CompareResponse(
+                tickers=request.tickers,
+                status="error",
+                error=str(e),
+                run_id=run.run_id,
+                timestamp=datetime.now()
+            )
+        
+        finally:
+            unregister_run(run)
@@ -0,0 +1,14 @@
+from typing import List
+from backend.schemas.prices import PriceSeriesResponse
+from backend.services.downsample import build_price_series
+
+
+class PricesInteractor:
+
+    def get_price_series(self, ticker: str, period: str, points: int, mode: str, overlays: List[str]) -> PriceSeriesResponse:
+        series = build_price_series(ticker, period=period, points=points, mode=mode, overlays=overlays)
+
+        if series.get("error"):
+            raise LookupError(series["error"])
+
+        return PriceSeriesResponse(**series)
@@ -0,0 +1,24 @@
+import threading
+from backend.schemas.screener import ScreenResponse, ScreenRefreshRequest
+from backend.services.screener import screener_index
+
+
+class ScreenerInteractor:
+
+    def execute_screen(self, query: str, limit: int) -> ScreenResponse:
+        return ScreenResponse(**screener_index.screen(query, limit=limit))
+
+    def start_refresh(self, request: ScreenRefreshRequest) -> dict:
+        # Claimed here rather than in the thread, so two requests can never
+        # both report "started".
+        if not screener_index.claim_refresh():
+            return {"status": "already_running", **screener_index.refresh_status()}
+
+        thread = threading.Thread(
+            target=screener_index.refresh,
+            args=(request.symbols, True),
+            name="screener-refresh",
+            daemon=True
+        )
+        thread.start()
+        return {"status": "started", "symbols": len(request.symbols) if request.symbols else None}
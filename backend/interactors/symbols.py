@@ -0,0 +1,24 @@
+import threading
+from backend.schemas.symbols import SymbolSearchResponse, SymbolMatch, SymbolRefreshRequest
+from backend.services.symbols import symbol_index
+
+
+class SymbolsInteractor:
+
+    def search(self, query: str, limit: int) -> SymbolSearchResponse:
+        return SymbolSearchResponse(
+            query=query,
+            results=[SymbolMatch(**record) for record in symbol_index.search(query, limit=limit)],
+            universe_size=len(symbol_index),
+            refreshed_at=symbol_index.refreshed_at
+        )
+
+    def start_refresh(self, request: SymbolRefreshRequest) -> dict:
+        thread = threading.Thread(
+            target=symbol_index.refresh,
+            args=(request.exchanges,),
+            name="symbol-refresh",
+            daemon=True
+        )
+        thread.start()
+        return {"status": "started", "exchanges": request.exchanges}
@@ -1,35 +1,274 @@
-from fastapi import APIRouter, HTTPException
-from backend.schemas.analysis import AnalysisRequest, AnalysisResponse
+import asyncio
+import json
+
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from backend.schemas.analysis import AnalysisRequest, AnalysisResponse, RunProgress, TokenUsageRow
 from backend.interactors.analysis import AnalysisInteractor
+from backend.services.admission import admission_for, AdmissionRejected
+from backend.services.cancellation import RunContext, RunCancelled, get_run
+from backend.services.metrics import metrics
+from backend.services.token_usage import token_ledger, TokenBudgetExceeded
+from backend.routes.responses import parse_fields, project, render
 
 router = APIRouter()
 
+
+def _client_id(http_request: Request) -> str:
+    return http_request.headers.get("X-Client-Id") or (http_request.client.host if http_request.client else "anonymous")
+
+
+async def _watch_disconnect(http_request: Request, run: RunContext):
+    while not run.cancelled:
+        if await http_request.is_disconnected():
+            run.cancel("client_disconnected")
+            return
+        await asyncio.sleep(1)
+
+
+def _cancelled_error(run: RunContext, reason: str) -> HTTPException:
+    # The run id lets the client retry and resume from the last checkpoint.
+    headers = {"X-Run-Id": run.run_id}
+    if reason == "deadline_exceeded":
+        return HTTPException(status_code=504, detail="Analysis exceeded its deadline", headers=headers)
+    if reason in ("token_budget_exceeded", "client_token_budget_exceeded"):
+        return HTTPException(status_code=429, detail=f"Analysis stopped: {reason}", headers=headers)
+    # 499 (client closed request) only ever reaches logs; the client is gone.
+    return HTTPException(status_code=499, detail=f"Analysis cancelled: {reason}", headers=headers)
+
+
+async def _check_token_budget(client_id: str):
+    try:
+        await run_in_threadpool(token_ledger.check_client, client_id)
+    except TokenBudgetExceeded as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Token budget exhausted: {e.reason}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+def _new_run(request: AnalysisRequest) -> RunContext:
+    return RunContext.for_request(request.run_id, request.deadline_seconds)
+
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. 'status,report_data' (dotted paths select nested values)"
+
+
 @router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_stock(request: AnalysisRequest):
+async def analyze_stock(
+    request: AnalysisRequest,
+    http_request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     interactor = AnalysisInteractor()
+    selected = parse_fields(fields, AnalysisResponse)
+    
+    try:
+        request = interactor.resolve_request(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    stored = interactor.get_stored_report(request)
+    if stored is not None:
+        return render(project(stored.model_dump(mode="json"), selected), http_request)
     
-    if not interactor.validate_ticker(request.ticker):
+    if get_run(request.run_id) is not None:
         raise HTTPException(
-            status_code=400,
-            detail=f"Invalid ticker symbol: {request.ticker}"
+            status_code=409,
+            detail=f"Run {request.run_id} is still in progress"
         )
     
+    client_id = _client_id(http_request)
+    await _check_token_budget(client_id)
+    
+    run = _new_run(request)
+    
+    def run_admitted():
+        with admission_for(request.mode).admit(client_id, request.priority, run):
+            return interactor.execute_analysis(request, run=run, client_id=client_id)
+    
+    watcher = asyncio.create_task(_watch_disconnect(http_request, run))
     try:
-        response = interactor.execute_analysis(request)
-        
-        if response.status == "error":
-            raise HTTPException(
-                status_code=500,
-                detail=f"Analysis failed: {response.error}"
-            )
-        
-        return response
-        
+        response = await run_in_threadpool(run_admitted)
+    except RunCancelled as e:
+        raise _cancelled_error(run, e.reason)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Analysis capacity exhausted: {e.reason}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Analysis error: {str(e)}"
         )
+    finally:
+        watcher.cancel()
+    
+    if response.status == "cancelled":
+        raise _cancelled_error(run, run.reason)
+    
+    if response.status == "error":
+        raise HTTPException(
+            status_code=500,
+            detail=f"Analysis failed: {response.error}",
+            headers={"X-Run-Id": run.run_id}
+        )
+    
+    return render(project(response.model_dump(mode="json"), selected), http_request)
+
+
+@router.post("/analyze/stream")
+async def stream_quick_analysis(request: AnalysisRequest, http_request: Request):
+    """Quick mode as newline-delimited JSON: {"event": "token", "text": ...}
+    lines while the summary is written, then one {"event": "result", "data":
+    <AnalysisResponse>} or {"event": "error", "status": ..., "detail": ...}."""
+    interactor = AnalysisInteractor()
+    
+    try:
+        request = interactor.resolve_request(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if request.mode != "quick":
+        raise HTTPException(status_code=400, detail="Streaming is only available with mode 'quick'")
+    
+    if get_run(request.run_id) is not None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Run {request.run_id} is still in progress"
+        )
+    
+    client_id = _client_id(http_request)
+    await _check_token_budget(client_id)
+    
+    run = _new_run(request)
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    
+    def on_token(text: str):
+        loop.call_soon_threadsafe(queue.put_nowait, {"event": "token", "text": text})
+    
+    def run_admitted():
+        try:
+            with admission_for(request.mode).admit(client_id, request.priority, run):
+                response = interactor.execute_analysis(request, run=run, client_id=client_id, on_token=on_token)
+            if response.status == "cancelled":
+                error = _cancelled_error(run, run.reason)
+                event = {"event": "error", "status": error.status_code, "detail": error.detail}
+            elif response.status == "error":
+                event = {"event": "error", "status": 500, "detail": f"Analysis failed: {response.error}"}
+            else:
+                event = {"event": "result", "data": response.model_dump(mode="json")}
+        except RunCancelled as e:
+            error = _cancelled_error(run, e.reason)
+            event = {"event": "error", "status": error.status_code, "detail": error.detail}
+        except AdmissionRejected as e:
+            event = {"event": "error", "status": 503, "detail": f"Analysis capacity exhausted: {e.reason}"}
+        except Exception as e:
+            event = {"event": "error", "status": 500, "detail": f"Analysis error: {str(e)}"}
+        event["run_id"] = run.run_id
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+    
+    async def events():
+        worker = asyncio.ensure_future(run_in_threadpool(run_admitted))
+        try:
+            while True:
+                event = await queue.get()
+                yield json.dumps(event, default=str) + "\n"
+                if event["event"] != "token":
+                    break
+        finally:
+            # The client stopped reading; stop the run too.
+            if not worker.done():
+                run.cancel("client_disconnected")
+    
+    # Identity encoding keeps the compression middleware from buffering tokens.
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Content-Encoding": "identity", "Cache-Control": "no-cache", "X-Run-Id": run.run_id}
+    )
+
+
+@router.post("/analyze/runs", response_model=RunProgress, status_code=202)
+async def start_analysis_run(request: AnalysisRequest, http_request: Request):
+    interactor = AnalysisInteractor()
+    
+    try:
+        request = interactor.resolve_request(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if get_run(request.run_id) is not None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Run {request.run_id} is still in progress"
+        )
+    
+    client_id = _client_id(http_request)
+    await _check_token_budget(client_id)
+    
+    return await run_in_threadpool(interactor.start_analysis, request, client_id)
+
+
+@router.get("/analyze/runs/{run_id}", response_model=RunProgress)
+async def get_analysis_run(run_id: str, http_request: Request, fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    interactor = AnalysisInteractor()
+    selected = parse_fields(fields, RunProgress)
+    
+    progress = await run_in_threadpool(interactor.get_progress, run_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run: {run_id}")
+    
+    return render(project(progress.model_dump(mode="json"), selected), http_request)
+
+
+@router.delete("/analyze/runs/{run_id}", status_code=202)
+async def cancel_analysis_run(run_id: str):
+    interactor = AnalysisInteractor()
+    
+    if not interactor.cancel_analysis(run_id):
+        raise HTTPException(status_code=404, detail=f"Run {run_id} is not running in this worker")
+    
+    return {"run_id": run_id, "status": "cancelling"}
+
+
+@router.get("/reports")
+async def get_stored_reports(
+    http_request: Request,
+    tickers: str = Query(..., description="Comma-separated tickers"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    max_age_seconds: Optional[int] = Query(None, ge=1, description="Only return reports younger than this")
+):
+    interactor = AnalysisInteractor()
+    symbols = [t.strip().upper() for t in tickers.split(",") if t.strip()]
+    if not symbols or len(symbols) > 500:
+        raise HTTPException(status_code=400, detail="Provide between 1 and 500 tickers")
+    
+    selected = parse_fields(fields, AnalysisResponse)
+    reports, missing = await run_in_threadpool(interactor.get_stored_reports, symbols, max_age_seconds)
+    return render(
+        {
+            "reports": [project(report.model_dump(mode="json"), selected) for report in reports],
+            "missing": missing
+        },
+        http_request
+    )
+
+
+@router.get("/analyze/usage", response_model=List[TokenUsageRow])
+async def get_token_usage(
+    ticker: Optional[str] = Query(None, description="Only this ticker"),
+    days: int = Query(7, ge=1, le=90)
+):
+    interactor = AnalysisInteractor()
+    return await run_in_threadpool(interactor.get_token_usage, ticker, days)
 
 
 @router.get("/health")
@@ -37,4 +276,9 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Financial Analysis API"
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
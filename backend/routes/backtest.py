@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from backend.schemas.backtest import BacktestRequest, BacktestResponse
+from backend.interactors.backtest import BacktestInteractor
+from backend.services.backtest import BacktestInputError, BacktestNotFound
+from backend.services.expressions import ExpressionError
+
+router = APIRouter()
+
+
+@router.post("/backtest", response_model=BacktestResponse)
+async def backtest_signals(request: BacktestRequest):
+    interactor = BacktestInteractor()
+
+    try:
+        return await run_in_threadpool(interactor.execute_backtest, request)
+    except ExpressionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BacktestNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BacktestInputError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Backtest error: {str(e)}"
+        )
@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from backend.schemas.compare import CompareRequest, CompareResponse
+from backend.interactors.compare import CompareInteractor
+from backend.services.admission import admission_controller, AdmissionRejected
+from backend.services.cancellation import RunContext, RunCancelled
+from backend.routes.analysis import _client_id, _watch_disconnect, _cancelled_error, _check_token_budget
+
+router = APIRouter()
+
+
+@router.post("/compare", response_model=CompareResponse)
+async def compare_stocks(request: CompareRequest, http_request: Request):
+    interactor = CompareInteractor()
+    
+    try:
+        request = interactor.resolve_request(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    stored = interactor.get_stored_comparison(request)
+    if stored is not None:
+        return stored
+    
+    client_id = _client_id(http_request)
+    await _check_token_budget(client_id)
+    
+    run = RunContext.for_request(deadline_seconds=request.deadline_seconds)
+    
+    def run_admitted():
+        with admission_controller.admit(client_id, request.priority, run):
+            return interactor.execute_comparison(request, run=run, client_id=client_id)
+    
+    watcher = asyncio.create_task(_watch_disconnect(http_request, run))
+    try:
+        response = await run_in_threadpool(run_admitted)
+    except RunCancelled as e:
+        raise _cancelled_error(run, e.reason)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Analysis capacity exhausted: {e.reason}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    finally:
+        watcher.cancel()
+    
+    if response.status == "cancelled":
+        raise _cancelled_error(run, run.reason)
+    
+    if response.status == "error":
+        raise HTTPException(status_code=500, detail=f"Comparison failed: {response.error}")
+    
+    return response
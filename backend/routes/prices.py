@@ -0,0 +1,27 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from backend.schemas.prices import PriceSeriesResponse
+from backend.interactors.prices import PricesInteractor
+
+router = APIRouter()
+
+
+@router.get("/prices/{ticker}", response_model=PriceSeriesResponse)
+async def get_price_series(
+    ticker: str,
+    period: Literal["1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"] = Query("1y"),
+    points: int = Query(500, ge=10, le=5000, description="Target number of points or candles"),
+    mode: Literal["line", "ohlc"] = Query("line"),
+    overlays: str = Query("sma_50,sma_200", description="Comma-separated indicators: sma_20, sma_50, sma_200, rsi_14, return_1d, volume_avg_20")
+):
+    interactor = PricesInteractor()
+    names = [name.strip() for name in overlays.split(",") if name.strip()]
+
+    try:
+        return await run_in_threadpool(interactor.get_price_series, ticker.upper(), period, points, mode, names)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
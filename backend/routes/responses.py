@@ -0,0 +1,103 @@
+import importlib.util
+from typing import Dict, Any, Iterable, Optional, Type, Union, get_args, get_origin
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel
+
+# ORJSONResponse imports without orjson and only fails when rendering.
+FastJSONResponse = ORJSONResponse if importlib.util.find_spec("orjson") is not None else JSONResponse
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+COMPRESSION_MINIMUM_SIZE = 1000
+
+
+def add_compression(app: FastAPI):
+    """Compress responses with Brotli when available (falling back to gzip
+    for clients that lack it), else gzip. Responses that set their own
+    Content-Encoding, like the token stream, pass through untouched."""
+    try:
+        from brotli_asgi import BrotliMiddleware
+        app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+    except ImportError:
+        from fastapi.middleware.gzip import GZipMiddleware
+        app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+
+
+def _nested_model(annotation) -> Optional[Type[BaseModel]]:
+    # Optional[Model] and Model can be selected into; lists cannot.
+    candidates = get_args(annotation) if get_origin(annotation) is Union else (annotation,)
+    for candidate in candidates:
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[list]:
+    """Split a `fields` selection and check every path against the
+    response `model`, so a bad selection is a 400 before any work starts.
+    Models that allow extra keys accept any path below them."""
+    if not fields:
+        return None
+    selected = [f.strip() for f in fields.split(",") if f.strip()] or None
+
+    for path in selected or []:
+        current = model
+        for part in path.split("."):
+            if current is None:
+                raise HTTPException(status_code=400, detail=f"Unknown field: {path}")
+            if part not in current.model_fields:
+                if current.model_config.get("extra") == "allow":
+                    break
+                raise HTTPException(status_code=400, detail=f"Unknown field: {path}")
+            current = _nested_model(current.model_fields[part].annotation)
+    return selected
+
+
+def project(payload: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Keep only `fields` (as checked by parse_fields) of a response payload.
+
+    Dotted paths select inside nested objects, so
+    `status,report_data.report_text` returns just those two values in their
+    usual places. Paths the payload lacks come back as None.
+    """
+    if not fields:
+        return payload
+
+    projected = {}
+    for path in fields:
+        source, target = payload, projected
+        parts = path.split(".")
+        for i, part in enumerate(parts):
+            source = source.get(part) if isinstance(source, dict) else None
+            if i == len(parts) - 1:
+                target[part] = source
+            elif source is None:
+                target[part] = None
+                break
+            else:
+                target = target.setdefault(part, {})
+    return projected
+
+
+def render(payload: Any, request: Request = None, status_code: int = 200) -> Response:
+    """Serialize a JSON-ready payload for the client.
+
+    msgpack is used when the client asks for it and the package is
+    installed; otherwise orjson when available, else the standard encoder.
+    Compression is applied afterwards by the middleware.
+    """
+    accept = request.headers.get("accept", "") if request is not None else ""
+    if msgpack is not None and MSGPACK_MEDIA_TYPE in accept:
+        return Response(
+            content=msgpack.packb(payload, use_bin_type=True),
+            media_type=MSGPACK_MEDIA_TYPE,
+            status_code=status_code
+        )
+    return FastJSONResponse(content=payload, status_code=status_code)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException
+from backend.services.scheduler import scheduler
+
+router = APIRouter()
+
+
+@router.get("/scheduler/jobs")
+async def list_scheduled_jobs():
+    if scheduler is None:
+        return {"running": False, "jobs": [], "history": []}
+    return scheduler.describe()
+
+
+@router.post("/scheduler/jobs/{name}/run", status_code=202)
+async def run_scheduled_job(name: str):
+    if scheduler is None or name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown scheduled job: {name}")
+    if not scheduler.trigger(name):
+        # Another worker holds the scheduler lock, or the scheduler stopped.
+        raise HTTPException(status_code=503, detail="Scheduler is not running in this worker")
+    return {"status": "queued", "job": name}
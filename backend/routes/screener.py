@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Query, Response
+from backend.schemas.screener import ScreenResponse, ScreenRefreshRequest
+from backend.interactors.screener import ScreenerInteractor
+from backend.services.expressions import ExpressionError
+
+router = APIRouter()
+
+
+@router.get("/screen", response_model=ScreenResponse)
+async def screen_stocks(
+    q: str = Query("", description="Filter and sort, e.g. 'pe_ratio<20 and rsi_14<35 order by roe desc'"),
+    limit: int = Query(50, ge=1, le=5000)
+):
+    interactor = ScreenerInteractor()
+
+    try:
+        return interactor.execute_screen(q, limit)
+    except ExpressionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/screen/refresh", status_code=202)
+async def refresh_screener(response: Response, request: ScreenRefreshRequest = None):
+    interactor = ScreenerInteractor()
+    result = interactor.start_refresh(request or ScreenRefreshRequest())
+    if result["status"] == "already_running":
+        response.status_code = 409
+    return result
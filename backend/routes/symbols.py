@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Query
+from backend.schemas.symbols import SymbolSearchResponse, SymbolRefreshRequest
+from backend.interactors.symbols import SymbolsInteractor
+
+router = APIRouter()
+
+
+@router.get("/symbols", response_model=SymbolSearchResponse)
+async def search_symbols(
+    q: str = Query(..., min_length=1, max_length=64, description="Symbol or company name prefix, e.g. 'BRK' or 'berkshire'"),
+    limit: int = Query(10, ge=1, le=100)
+):
+    interactor = SymbolsInteractor()
+    return interactor.search(q, limit)
+
+
+@router.post("/symbols/refresh", status_code=202)
+async def refresh_symbols(request: SymbolRefreshRequest = None):
+    interactor = SymbolsInteractor()
+    return interactor.start_refresh(request or SymbolRefreshRequest())
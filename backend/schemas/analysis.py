@@ -1,11 +1,18 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 
 class AnalysisRequest(BaseModel):
     ticker: str = Field(..., description="Stock ticker symbol (e.g., AAPL, TSLA)")
     company_name: Optional[str] = Field(None, description="Company name (optional)")
+    holdings: Optional[List[str]] = Field(None, description="Tickers currently held, used to place the analysis in portfolio context (optional)")
+    mode: Literal["quick", "standard", "deep"] = Field("standard", description="quick: one-pass ~300-word summary in seconds; standard: full three-agent report; deep: full report with the large model on every turn")
+    max_age_seconds: Optional[int] = Field(None, ge=0, description="Serve a stored report up to this many seconds old; 0 forces a fresh run")
+    priority: Literal["interactive", "batch", "scheduled"] = Field("interactive", description="Queueing class when the backend is busy")
+    run_id: Optional[str] = Field(None, max_length=64, description="Resume a failed run from its last completed stage (returned in every response)")
+    deadline_seconds: Optional[int] = Field(None, gt=0, description="Abandon the run after this many seconds; capped by the server deadline")
+    token_budget: Optional[int] = Field(None, gt=0, description="Stop the run once its LLM calls use this many tokens; capped by the server budget")
     
     class Config:
         json_schema_extra = {
@@ -19,9 +26,21 @@ class AgentStatus(BaseModel):
     agent_name: str
     status: str
     message: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    llm_calls: Optional[int] = None
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
+class TokenUsageRow(BaseModel):
+    day: str
+    ticker: str
+    agent: str
+    prompt_tokens: int
+    completion_tokens: int
+    calls: int
+
+
 class ResearchData(BaseModel):
     summary: Optional[str] = None
     
@@ -44,11 +63,14 @@ class AnalysisResponse(BaseModel):
     ticker: str
     company_name: Optional[str] = None
     status: str
+    mode: str = "standard"
     research_data: Optional[ResearchData] = None
     analysis_data: Optional[AnalysisData] = None
     report_data: Optional[ReportData] = None
     agent_statuses: List[AgentStatus] = []
     error: Optional[str] = None
+    run_id: Optional[str] = None
+    cached: bool = False
     timestamp: datetime = Field(default_factory=datetime.now)
     
     class Config:
@@ -59,4 +81,17 @@ class AnalysisResponse(BaseModel):
                 "status": "completed",
                 "timestamp": "2026-01-30T10:00:00"
             }
-        }
\ No newline at end of file
+        }
+
+
+class RunProgress(BaseModel):
+    run_id: Optional[str] = None
+    ticker: str
+    status: str = Field(..., description="queued, running, completed, error, cancelled or rejected")
+    completed_stages: List[str] = []
+    research_data: Optional[ResearchData] = None
+    analysis_data: Optional[AnalysisData] = None
+    report_data: Optional[ReportData] = None
+    error: Optional[str] = None
+    cached: bool = False
+    updated_at: datetime = Field(default_factory=datetime.now)
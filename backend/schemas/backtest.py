@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+from datetime import datetime
+
+
+class BacktestRule(BaseModel):
+    name: str = Field(..., description="Rule name used in the results")
+    expression: str = Field(..., description="Signal condition over indicators, e.g. 'rsi_14 < 30 and close > sma_200'")
+    direction: Literal["long", "short"] = "long"
+
+
+class BacktestRequest(BaseModel):
+    tickers: List[str] = Field(..., min_length=1, max_length=1000, description="Tickers to backtest")
+    rules: Optional[List[BacktestRule]] = Field(None, description="Custom rules; defaults to the RSI and SMA trend signals")
+    include_builtin_rules: bool = Field(True, description="Also evaluate the built-in RSI and SMA trend signals")
+    period: str = Field("5y", description="History period (1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)")
+    horizon: int = Field(5, ge=1, le=252, description="Forward return horizon in trading days")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "tickers": ["AAPL", "MSFT"],
+                "rules": [{"name": "dip_buy", "expression": "close < sma_20 * 0.95 and rsi_14 < 40", "direction": "long"}],
+                "period": "5y",
+                "horizon": 5
+            }
+        }
+
+
+class BacktestResult(BaseModel):
+    rule: str
+    ticker: str
+    expression: str
+    direction: str
+    signals: int
+    hit_rate: Optional[float] = None
+    avg_forward_return_pct: Optional[float] = None
+    base_hit_rate: Optional[float] = None
+    base_avg_forward_return_pct: Optional[float] = None
+    max_drawdown_pct: Optional[float] = None
+    total_return_pct: Optional[float] = None
+    annual_turnover: Optional[float] = None
+
+
+class BacktestResponse(BaseModel):
+    tickers: List[str] = []
+    missing_tickers: List[str] = []
+    period: str
+    horizon_days: int
+    bars: int = 0
+    results: List[BacktestResult] = []
+    timestamp: datetime = Field(default_factory=datetime.now)
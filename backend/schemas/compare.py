@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal
+from datetime import datetime
+
+from backend.schemas.analysis import AgentStatus
+
+
+class CompareRequest(BaseModel):
+    tickers: List[str] = Field(..., min_length=2, max_length=5, description="2-5 ticker symbols to compare")
+    max_age_seconds: Optional[int] = Field(None, ge=0, description="Serve a stored comparison up to this many seconds old; 0 forces a fresh run")
+    priority: Literal["interactive", "batch", "scheduled"] = Field("interactive", description="Queueing class when the backend is busy")
+    deadline_seconds: Optional[int] = Field(None, gt=0, description="Abandon the run after this many seconds; capped by the server deadline")
+    token_budget: Optional[int] = Field(None, gt=0, description="Stop the run once its LLM calls use this many tokens; capped by the server budget")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "tickers": ["AAPL", "MSFT", "GOOGL"]
+            }
+        }
+
+
+class ComparisonRow(BaseModel):
+    metric: str
+    label: str
+    values: Dict[str, Optional[float]]
+    leader: Optional[str] = Field(None, description="Ticker with the best value, for metrics with a better direction")
+
+
+class ComparisonTable(BaseModel):
+    title: str
+    rows: List[ComparisonRow] = []
+
+
+class CompareResponse(BaseModel):
+    tickers: List[str]
+    company_names: Dict[str, str] = {}
+    status: str
+    tables: List[ComparisonTable] = []
+    report_text: Optional[str] = None
+    facts: Dict[str, Dict[str, Any]] = {}
+    agent_statuses: List[AgentStatus] = []
+    error: Optional[str] = None
+    run_id: Optional[str] = None
+    cached: bool = False
+    timestamp: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
+
+
+class PriceSeriesResponse(BaseModel):
+    ticker: str
+    period: str
+    mode: str = Field(..., description="'line' (LTTB-sampled closes) or 'ohlc' (aggregated candles)")
+    points: int
+    source_points: int = Field(..., description="Daily bars before downsampling")
+    timestamps: List[str] = Field([], description="Bar dates; for candles, the first day of each candle")
+    close: List[Optional[float]] = []
+    open: Optional[List[Optional[float]]] = None
+    high: Optional[List[Optional[float]]] = None
+    low: Optional[List[Optional[float]]] = None
+    volume: Optional[List[Optional[float]]] = None
+    overlays: Dict[str, List[Optional[float]]] = {}
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+
+class ScreenRow(BaseModel):
+    symbol: str
+
+    class Config:
+        extra = "allow"
+
+
+class ScreenResponse(BaseModel):
+    query: str
+    universe_size: int
+    matched: int
+    results: List[ScreenRow] = []
+    tickers: List[str] = Field([], description="Matched symbols in order, ready for batch analysis")
+    refreshed_at: Optional[float] = None
+
+
+class ScreenRefreshRequest(BaseModel):
+    symbols: Optional[List[str]] = Field(None, description="Symbols to index; defaults to the configured universe")
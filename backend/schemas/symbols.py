@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+
+class SymbolMatch(BaseModel):
+    symbol: str
+    name: str = ""
+    type: str = Field("", description="Security type, e.g. 'Common Stock', 'ETP'")
+    exchange: str = Field("", description="Market identifier code")
+
+
+class SymbolSearchResponse(BaseModel):
+    query: str
+    results: List[SymbolMatch] = []
+    universe_size: int
+    refreshed_at: Optional[float] = None
+
+
+class SymbolRefreshRequest(BaseModel):
+    exchanges: Optional[List[str]] = Field(None, description="Finnhub exchange codes; defaults to SYMBOL_EXCHANGES")
@@ -0,0 +1,202 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+from backend.services.cancellation import RunContext, RunCancelled
+from backend.services.metrics import metrics
+
+load_dotenv()
+
+
+PRIORITIES = {"interactive": 0, "batch": 1, "scheduled": 2}
+
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "4"))
+MAX_QUEUED_RUNS = int(os.getenv("MAX_QUEUED_RUNS", "16"))
+MAX_QUEUE_WAIT_SECONDS = float(os.getenv("MAX_QUEUE_WAIT_SECONDS", "120"))
+QUICK_MAX_CONCURRENT_RUNS = int(os.getenv("QUICK_MAX_CONCURRENT_RUNS", "16"))
+QUICK_MAX_QUEUE_WAIT_SECONDS = float(os.getenv("QUICK_MAX_QUEUE_WAIT_SECONDS", "5"))
+DEFAULT_RUN_SECONDS = 90.0
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ("client_id", "priority", "enqueued", "granted", "evicted")
+
+    def __init__(self, client_id: str, priority: str):
+        self.client_id = client_id
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.evicted = False
+
+
+class AdmissionController:
+    """Bounds concurrent analysis runs and queues the overflow.
+
+    Waiting runs are grouped by priority class (interactive before batch
+    before scheduled). Within a class, clients are served round-robin so
+    one client submitting fifty tickers cannot starve another submitting
+    one. A full queue makes room for higher-priority work by displacing the
+    newest lower-priority waiter. Otherwise, when the queue is full or a run
+    waits past the limit, the caller gets AdmissionRejected with a
+    Retry-After estimate instead of piling on and timing out with everyone
+    else.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_RUNS,
+        max_queued: int = MAX_QUEUED_RUNS,
+        max_wait: float = MAX_QUEUE_WAIT_SECONDS,
+        pool: str = None
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        # Metrics of a named pool carry a pool label; the default pool keeps
+        # the unlabelled names.
+        self._labels = {"pool": pool} if pool else {}
+        self.active = 0
+        self._cond = threading.Condition()
+        self._queues = {priority: OrderedDict() for priority in PRIORITIES}
+        self._queued = 0
+
+    def _retry_after(self) -> int:
+        run_seconds = metrics.percentile("analysis_run_seconds", 0.5, **self._labels) or DEFAULT_RUN_SECONDS
+        waves = (self._queued + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(run_seconds * waves))
+
+    def _report(self):
+        metrics.set_gauge("admission_active_runs", self.active, **self._labels)
+        for priority, clients in self._queues.items():
+            metrics.set_gauge("admission_queue_depth", sum(len(q) for q in clients.values()), priority=priority, **self._labels)
+
+    def _enqueue(self, ticket: _Ticket):
+        clients = self._queues[ticket.priority]
+        clients.setdefault(ticket.client_id, deque()).append(ticket)
+        self._queued += 1
+
+    def _remove(self, ticket: _Ticket):
+        clients = self._queues[ticket.priority]
+        queue = clients.get(ticket.client_id)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            self._queued -= 1
+            if not queue:
+                del clients[ticket.client_id]
+
+    def _evict_lower_than(self, priority: str) -> bool:
+        # Newest waiter of the lowest class below `priority` gives up its place.
+        for lower in sorted(PRIORITIES, key=PRIORITIES.get, reverse=True):
+            if PRIORITIES[lower] <= PRIORITIES[priority]:
+                return False
+            clients = self._queues[lower]
+            if clients:
+                victim = max((q[-1] for q in clients.values()), key=lambda t: t.enqueued)
+                self._remove(victim)
+                victim.evicted = True
+                self._cond.notify_all()
+                return True
+        return False
+
+    def _grant_next(self):
+        for priority in sorted(PRIORITIES, key=PRIORITIES.get):
+            clients = self._queues[priority]
+            if not clients:
+                continue
+            client_id, queue = next(iter(clients.items()))
+            ticket = queue.popleft()
+            self._queued -= 1
+            # Rotate the client to the back of its class.
+            del clients[client_id]
+            if queue:
+                clients[client_id] = queue
+            ticket.granted = True
+            self.active += 1
+            return
+
+    def acquire(self, client_id: str, priority: str = "interactive", run: RunContext = None):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        with self._cond:
+            if self.active < self.max_concurrent and self._queued == 0:
+                self.active += 1
+                metrics.observe("admission_wait_seconds", 0.0, priority=priority, **self._labels)
+                self._report()
+                return
+
+            if self._queued >= self.max_queued and not self._evict_lower_than(priority):
+                metrics.increment("admission_rejected", priority=priority, reason="queue_full", **self._labels)
+                raise AdmissionRejected("Analysis queue is full", self._retry_after())
+
+            ticket = _Ticket(client_id, priority)
+            self._enqueue(ticket)
+            self._report()
+
+            deadline = ticket.enqueued + self.max_wait
+            if run is not None and run.remaining() is not None:
+                deadline = min(deadline, ticket.enqueued + run.remaining())
+            while not ticket.granted:
+                if run is not None and run.cancelled:
+                    # Nobody is waiting for this result any more.
+                    self._remove(ticket)
+                    self._report()
+                    metrics.increment("admission_abandoned", priority=priority, reason=run.reason, **self._labels)
+                    raise RunCancelled(run.reason)
+                if ticket.evicted:
+                    metrics.increment("admission_rejected", priority=priority, reason="preempted", **self._labels)
+                    raise AdmissionRejected("Queued run displaced by higher-priority work", self._retry_after())
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._remove(ticket)
+                    self._report()
+                    metrics.increment("admission_rejected", priority=priority, reason="wait_timeout", **self._labels)
+                    raise AdmissionRejected("Timed out waiting for an analysis slot", self._retry_after())
+                self._cond.wait(min(remaining, 1.0) if run is not None else remaining)
+
+            metrics.observe("admission_wait_seconds", time.monotonic() - ticket.enqueued, priority=priority, **self._labels)
+            self._report()
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            if self.active < self.max_concurrent:
+                self._grant_next()
+            self._report()
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, client_id: str, priority: str = "interactive", run: RunContext = None):
+        self.acquire(client_id, priority, run)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics.observe("analysis_run_seconds", time.perf_counter() - start, **self._labels)
+            self.release()
+
+
+admission_controller = AdmissionController()
+# Quick runs make one LLM call, so they get their own wider pool instead of
+# queueing behind multi-minute full analyses.
+quick_admission_controller = AdmissionController(
+    max_concurrent=QUICK_MAX_CONCURRENT_RUNS,
+    max_wait=QUICK_MAX_QUEUE_WAIT_SECONDS,
+    pool="quick"
+)
+
+
+def admission_for(mode: str) -> AdmissionController:
+    return quick_admission_controller if mode == "quick" else admission_controller
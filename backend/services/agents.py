@@ -1,11 +1,15 @@
 from typing import Annotated, TypedDict, Sequence, Literal
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
-from backend.services.llm import get_research_llm, get_analyst_llm, get_writer_llm
+from backend.services.llm import invoke_llm, resolve_route
 from backend.services.research_agent_tools import research_tools
 from backend.services.analyst_agent_tools import analyst_tools
+from backend.services.synthesis import build_writer_digests
+from backend.services.tool_executor import ConcurrentToolNode
+from backend.services.cancellation import bind_run, get_run, check_run
+from backend.services.stage_results import StageResult
 import operator
+import time
 
 
 class AgentState(TypedDict):
@@ -17,9 +21,30 @@ class AgentState(TypedDict):
     report_complete: bool
     research_data: str
     analysis_data: str
+    holdings: list
+    run_id: str
     next_agent: str
 
 
+def _pending_tool_results(messages) -> bool:
+    return bool(messages) and isinstance(messages[-1], ToolMessage)
+
+
+def invoke_react_turn(agent: str, messages, tools, temperature: float):
+    # A turn that follows tool results is routed to the fast tier: most of
+    # them only plan the next tool calls. Any other turn goes to the report
+    # route. If the fast model answers without calling a tool it is trying
+    # to write the report, so that turn is re-run on the report route
+    # instead of shipping a small-model report.
+    turn = "tool" if _pending_tool_results(messages) else "report"
+    response = invoke_llm(agent, turn, messages, temperature=temperature, tools=tools)
+
+    if turn == "tool" and not response.tool_calls and resolve_route(agent, "tool") != resolve_route(agent, "report"):
+        response = invoke_llm(agent, "report", messages, temperature=temperature, tools=tools)
+
+    return response
+
+
 # ============================================================================
 # MARKET RESEARCHER AGENT - Uses ReAct Pattern
 # ============================================================================
@@ -29,6 +54,7 @@ def create_researcher_agent():
         messages: Annotated[Sequence[BaseMessage], operator.add]
         ticker: str
         company_name: str
+        run_id: str
     
     def researcher_node(state: ResearcherState):
         print("\n🔍 Market Researcher Agent - Reasoning...")
@@ -42,8 +68,9 @@ PHASE 1 - DATA GATHERING:
 Use ALL available tools to gather comprehensive market intelligence:
 1. get_company_profile - Company overview and fundamentals
 2. get_company_news - Recent developments and news
-3. get_analyst_recommendations - Professional analyst opinions
-4. get_price_target_consensus - Price target forecasts
+3. get_news_sentiment - Lexicon sentiment score and trend across all recent news
+4. get_analyst_recommendations - Professional analyst opinions
+5. get_price_target_consensus - Price target forecasts
 
 Call ALL tools with ticker: {ticker}
 
@@ -79,13 +106,12 @@ Begin by calling ALL the tools, then write your comprehensive analysis."""
 
         messages = [HumanMessage(content=system_prompt)] + list(state["messages"])
         
-        llm = get_research_llm()
-        llm_with_tools = llm.bind_tools(research_tools)
-        
-        response = llm_with_tools.invoke(messages)
+        with bind_run(get_run(state.get("run_id"))):
+            response = invoke_react_turn("research", messages, research_tools, temperature=0.7)
         return {"messages": [response]}
     
     def should_continue(state: ResearcherState) -> Literal["tools", "end"]:
+        check_run(state.get("run_id"))
         messages = state["messages"]
         last_message = messages[-1]
         
@@ -99,7 +125,7 @@ Begin by calling ALL the tools, then write your comprehensive analysis."""
     workflow = StateGraph(ResearcherState)
     
     workflow.add_node("agent", researcher_node)
-    workflow.add_node("tools", ToolNode(research_tools))
+    workflow.add_node("tools", ConcurrentToolNode(research_tools, "research"))
     
     workflow.set_entry_point("agent")
     
@@ -127,12 +153,19 @@ def create_analyst_agent():
         messages: Annotated[Sequence[BaseMessage], operator.add]
         ticker: str
         company_name: str
+        holdings: list
+        run_id: str
     
     def analyst_node(state: AnalystState):
         print("\n📊 Data Analyst Agent - Reasoning...")
         
         ticker = state["ticker"]
         company_name = state["company_name"]
+        holdings = ",".join(state.get("holdings") or [])
+        holdings_note = (
+            f'The client currently holds: {holdings}. Call get_portfolio_context with holdings="{holdings}".'
+            if holdings else "No client holdings were provided; call get_portfolio_context with the ticker only."
+        )
         
         system_prompt = f"""You are a senior financial analyst and CFA charterholder analyzing {company_name} ({ticker}).
 
@@ -140,10 +173,14 @@ PHASE 1 - DATA GATHERING:
 Use ALL available tools to gather comprehensive financial data:
 1. get_stock_quote - Current stock price and performance
 2. get_financial_metrics - Key financial metrics and KPIs
-3. get_historical_price_data - Historical price trends (6 months)
-4. calculate_technical_indicators - Technical analysis indicators
+3. get_fundamental_trends - Growth rates, CAGR, margin trends and valuation versus its own history
+4. get_historical_price_data - Historical price trends (6 months)
+5. calculate_technical_indicators - Technical analysis indicators
+6. get_portfolio_context - Beta, correlation and diversification impact versus the client's holdings
+7. backtest_technical_signals - Historical hit rate and forward returns of the RSI and trend signals
 
 Call ALL tools with ticker: {ticker}
+{holdings_note}
 
 PHASE 2 - ANALYSIS & REPORT WRITING:
 After gathering all data, write a comprehensive financial analysis report (minimum 1500 words).
@@ -162,7 +199,8 @@ CONTENT GUIDELINES (organize as you see fit):
 - Discuss valuation metrics and whether the stock is fairly valued
 - Analyze profitability, liquidity, and leverage metrics
 - Cover historical performance and price trends
-- Discuss technical indicators and trading signals
+- Discuss technical indicators and trading signals, citing their backtested hit rate versus the base rate
+- Place the stock in the context of the client's portfolio (beta, correlation, risk contribution)
 - Identify financial strengths and weaknesses
 - Assess growth trajectory and momentum
 - Highlight key risks from a financial perspective
@@ -180,13 +218,12 @@ Begin by calling ALL the tools, then write your comprehensive financial analysis
 
         messages = [HumanMessage(content=system_prompt)] + list(state["messages"])
         
-        llm = get_analyst_llm()
-        llm_with_tools = llm.bind_tools(analyst_tools)
-        
-        response = llm_with_tools.invoke(messages)
+        with bind_run(get_run(state.get("run_id"))):
+            response = invoke_react_turn("analyst", messages, analyst_tools, temperature=0.3)
         return {"messages": [response]}
     
     def should_continue(state: AnalystState) -> Literal["tools", "end"]:
+        check_run(state.get("run_id"))
         messages = state["messages"]
         last_message = messages[-1]
         
@@ -200,7 +237,7 @@ Begin by calling ALL the tools, then write your comprehensive financial analysis
     workflow = StateGraph(AnalystState)
     
     workflow.add_node("agent", analyst_node)
-    workflow.add_node("tools", ToolNode(analyst_tools))
+    workflow.add_node("tools", ConcurrentToolNode(analyst_tools, "analyst"))
     
     workflow.set_entry_point("agent")
     
@@ -230,14 +267,19 @@ def create_writer_agent():
         company_name: str
         research_data: str
         analysis_data: str
+        run_id: str
     
     def writer_node(state: WriterState):
         print("\n📝 Report Writer Agent - Creating Summary...")
         
         ticker = state["ticker"]
         company_name = state["company_name"]
-        research_data = state.get("research_data", "")
-        analysis_data = state.get("analysis_data", "")
+        with bind_run(get_run(state.get("run_id"))):
+            research_data, analysis_data = build_writer_digests(
+                ticker,
+                state.get("research_data", ""),
+                state.get("analysis_data", "")
+            )
         
         system_prompt = f"""You are a professional report writer summarizing financial analysis for {company_name} ({ticker}).
 
@@ -262,17 +304,17 @@ FORMATTING RULES:
 - Be concise but comprehensive
 
 Market Research Summary:
-{research_data[:1000]}...
+{research_data}
 
 Financial Analysis Summary:
-{analysis_data[:1000]}...
+{analysis_data}
 
 Provide your executive summary now (no tool calls needed)."""
 
         messages = [HumanMessage(content=system_prompt)]
         
-        llm = get_writer_llm()
-        response = llm.invoke(messages)
+        with bind_run(get_run(state.get("run_id"))):
+            response = invoke_llm("writer", "summary", messages, temperature=0.5)
         
         return {"messages": [response]}
     
@@ -288,6 +330,14 @@ Provide your executive summary now (no tool calls needed)."""
 # WRAPPER CLASSES - Maintain compatibility with existing code
 # ============================================================================
 
+def _release_messages(result: dict) -> list:
+    # Nothing from the agent's conversation outlives the stage: the inner
+    # message list (tool payloads, drafts) is released here and no
+    # breadcrumb is appended to the outer state.
+    result["messages"] = []
+    return []
+
+
 class MarketResearcherAgent:
     def __init__(self):
         self.agent = create_researcher_agent()
@@ -298,9 +348,11 @@ class MarketResearcherAgent:
         researcher_state = {
             "messages": [],
             "ticker": state["ticker"],
-            "company_name": state["company_name"]
+            "company_name": state["company_name"],
+            "run_id": state.get("run_id")
         }
         
+        start = time.perf_counter()
         result = self.agent.invoke(researcher_state)
         
         research_data = ""
@@ -310,10 +362,12 @@ class MarketResearcherAgent:
                     research_data += msg.content + "\n"
         
         print(f"✓ Extracted research data length: {len(research_data)} characters")
+        stage_result = StageResult.from_messages("research", result["messages"], research_data, time.perf_counter() - start)
         
         return {
             **state,
-            "messages": state["messages"] + [AIMessage(content=f"Market research completed for {state['ticker']}")],
+            "messages": _release_messages(result),
+            "stage_result": stage_result,
             "research_complete": True,
             "research_data": research_data,
             "next_agent": "analyst"
@@ -331,9 +385,12 @@ class DataAnalystAgent:
         analyst_state = {
             "messages": [],
             "ticker": state["ticker"],
-            "company_name": state["company_name"]
+            "company_name": state["company_name"],
+            "holdings": state.get("holdings", []),
+            "run_id": state.get("run_id")
         }
         
+        start = time.perf_counter()
         result = self.agent.invoke(analyst_state)
         
         analysis_data = ""
@@ -343,10 +400,12 @@ class DataAnalystAgent:
                     analysis_data += msg.content + "\n"
         
         print(f"✓ Extracted analysis data length: {len(analysis_data)} characters")
+        stage_result = StageResult.from_messages("analysis", result["messages"], analysis_data, time.perf_counter() - start)
         
         return {
             **state,
-            "messages": state["messages"] + [AIMessage(content=f"Financial analysis completed for {state['ticker']}")],
+            "messages": _release_messages(result),
+            "stage_result": stage_result,
             "analysis_complete": True,
             "analysis_data": analysis_data,
             "next_agent": "writer"
@@ -366,9 +425,11 @@ class ReportWriterAgent:
             "ticker": state["ticker"],
             "company_name": state["company_name"],
             "research_data": state.get("research_data", ""),
-            "analysis_data": state.get("analysis_data", "")
+            "analysis_data": state.get("analysis_data", ""),
+            "run_id": state.get("run_id")
         }
         
+        start = time.perf_counter()
         result = self.agent.invoke(writer_state)
         
         summary_text = ""
@@ -377,10 +438,12 @@ class ReportWriterAgent:
                 summary_text += msg.content + "\n"
         
         print(f"✓ Generated executive summary: {len(summary_text)} characters")
+        stage_result = StageResult.from_messages("report", result["messages"], summary_text, time.perf_counter() - start)
         
         return {
             **state,
-            "messages": state["messages"] + [AIMessage(content=f"Executive summary generated for {state['ticker']}")],
+            "messages": _release_messages(result),
+            "stage_result": stage_result,
             "report_complete": True,
             "summary": summary_text,
             "next_agent": "end"
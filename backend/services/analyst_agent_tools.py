@@ -1,8 +1,13 @@
 from langchain.tools import tool
 from typing import Dict, Any
-from backend.services.finnhub import finnhub_client
+from backend.services.finnhub import finnhub_client, extract_key_metrics
+from backend.services.quote_feed import get_cached_quote
+from backend.services.price_history import get_price_history
+from backend.services.portfolio import analyze_portfolio_context
+from backend.services.backtest import run_backtest
+from backend.services.fundamentals import fundamentals_store, fundamental_trends
 import json
-import yfinance as yf
+import os
 import pandas as pd
 
 
@@ -20,7 +25,7 @@ def get_stock_quote(ticker: str) -> str:
         JSON string containing quote data
     """
     try:
-        quote = finnhub_client.get_quote(ticker)
+        quote = get_cached_quote(ticker) or finnhub_client.get_quote(ticker)
         
         if not quote:
             return json.dumps({"error": "No quote data found"})
@@ -59,24 +64,10 @@ def get_financial_metrics(ticker: str) -> str:
             return json.dumps({"error": "No financial metrics found"})
         
         metrics = financials.get("metric", {})
+        # Keep the historical series this response carries for the trend tool.
+        fundamentals_store.ingest(ticker, financials)
         
-        key_metrics = {
-            "pe_ratio": metrics.get("peNormalizedAnnual", 0),
-            "eps": metrics.get("epsBasicExclExtraItemsTTM", 0),
-            "market_cap": metrics.get("marketCapitalization", 0),
-            "week_52_high": metrics.get("52WeekHigh", 0),
-            "week_52_low": metrics.get("52WeekLow", 0),
-            "beta": metrics.get("beta", 0),
-            "volume_avg_10d": metrics.get("10DayAverageTradingVolume", 0),
-            "dividend_yield": metrics.get("dividendYieldIndicatedAnnual", 0),
-            "profit_margin": metrics.get("netProfitMarginTTM", 0),
-            "roe": metrics.get("roeTTM", 0),
-            "roa": metrics.get("roaTTM", 0),
-            "debt_to_equity": metrics.get("totalDebt/totalEquityQuarterly", 0),
-            "current_ratio": metrics.get("currentRatioQuarterly", 0),
-            "revenue_per_share": metrics.get("revenuePerShareTTM", 0),
-            "book_value_per_share": metrics.get("bookValuePerShareQuarterly", 0)
-        }
+        key_metrics = extract_key_metrics(metrics)
         
         return json.dumps(key_metrics, indent=2)
     except Exception as e:
@@ -96,8 +87,7 @@ def get_historical_price_data(ticker: str, period: str = "6mo") -> str:
         JSON string containing historical price statistics
     """
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period=period)
+        hist = get_price_history(ticker, period=period)
         
         if hist.empty:
             return json.dumps({"error": "No historical data found"})
@@ -138,8 +128,7 @@ def calculate_technical_indicators(ticker: str) -> str:
         JSON string containing technical indicators
     """
     try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="3mo")
+        hist = get_price_history(ticker, period="3mo").copy()
         
         if hist.empty:
             return json.dumps({"error": "No data for technical indicators"})
@@ -174,9 +163,89 @@ def calculate_technical_indicators(ticker: str) -> str:
         return json.dumps({"error": str(e)})
 
 
+@tool
+def get_portfolio_context(ticker: str, holdings: str = "", benchmark: str = "SPY") -> str:
+    """
+    Place a stock in the context of a portfolio: correlation and covariance with
+    the holdings, full-period and rolling beta against a benchmark, and how adding
+    the stock would change portfolio volatility and diversification.
+    
+    Args:
+        ticker: Stock ticker symbol
+        holdings: Comma-separated tickers currently held (e.g. "MSFT,JPM,XOM")
+        benchmark: Benchmark ticker for beta (default SPY)
+        
+    Returns:
+        JSON string containing portfolio analytics
+    """
+    try:
+        symbols = [h.strip() for h in (holdings or os.getenv("PORTFOLIO_HOLDINGS", "")).split(",") if h.strip()]
+        context = analyze_portfolio_context(ticker, symbols, benchmark=benchmark)
+        return json.dumps(context, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+@tool
+def backtest_technical_signals(ticker: str, period: str = "5y", horizon: int = 5) -> str:
+    """
+    Backtest the RSI overbought/oversold and SMA20/SMA50 trend signals on this
+    stock's own history, so signals can be presented with evidence of whether
+    they have worked for it.
+    
+    Args:
+        ticker: Stock ticker symbol
+        period: History period to test over (1y, 2y, 5y, 10y)
+        horizon: Forward return horizon in trading days
+        
+    Returns:
+        JSON string with hit rate, average forward return, drawdown and turnover per signal
+    """
+    try:
+        result = run_backtest([ticker], period=period, horizon=horizon)
+        if result.get("error"):
+            return json.dumps({"error": result["error"]})
+        
+        signals = {
+            row["rule"]: {k: v for k, v in row.items() if k not in ("rule", "ticker")}
+            for row in result["results"]
+        }
+        return json.dumps({
+            "period": result["period"],
+            "horizon_days": result["horizon_days"],
+            "bars": result["bars"],
+            "signals": signals
+        }, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+@tool
+def get_fundamental_trends(ticker: str) -> str:
+    """
+    Summarize how the company's fundamentals have moved over time: revenue,
+    EPS and book value growth (YoY, QoQ, 3- and 5-year CAGR), gross, operating,
+    net and FCF margin trends, and where valuation, ROE and leverage sit
+    versus their own history (median and z-score).
+    
+    Args:
+        ticker: Stock ticker symbol
+        
+    Returns:
+        JSON string containing growth, margin and vs-history metrics
+    """
+    try:
+        return json.dumps(fundamental_trends(ticker), indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
 analyst_tools = [
     get_stock_quote,
     get_financial_metrics,
+    get_fundamental_trends,
     get_historical_price_data,
-    calculate_technical_indicators
+    calculate_technical_indicators,
+    get_portfolio_context,
+    backtest_technical_signals
 ]
\ No newline at end of file
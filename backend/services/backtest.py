@@ -0,0 +1,143 @@
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from backend.services.expressions import Expression
+from backend.services.indicators import indicator_panel
+from backend.services.price_history import get_price_histories
+
+
+TRADING_DAYS = 252
+# Periods yfinance serves daily history for.
+BACKTEST_PERIODS = ("1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max")
+
+
+class BacktestInputError(ValueError):
+    pass
+
+
+class BacktestNotFound(LookupError):
+    pass
+
+# The signals calculate_technical_indicators reports, as backtestable rules.
+BUILTIN_RULES = {
+    "rsi_oversold": {"expression": "rsi_14 < 30", "direction": "long"},
+    "rsi_overbought": {"expression": "rsi_14 > 70", "direction": "short"},
+    "sma_trend_bullish": {"expression": "sma_20 > sma_50", "direction": "long"},
+    "sma_trend_bearish": {"expression": "sma_20 < sma_50", "direction": "short"},
+}
+
+
+def _close_panel(tickers: List[str], period: str):
+    histories = get_price_histories(tickers, period=period)
+    if not histories:
+        return [], None, None
+
+    frames = {ticker: hist for ticker, hist in histories.items()}
+    close = pd.concat({t: f["Close"] for t, f in frames.items()}, axis=1).sort_index()
+    volume = pd.concat({t: f["Volume"] for t, f in frames.items()}, axis=1).reindex(close.index)
+    return list(close.columns), close.to_numpy(dtype=np.float64), volume.to_numpy(dtype=np.float64)
+
+
+def _max_drawdown(returns: np.ndarray) -> np.ndarray:
+    """Max drawdown along axis -2 of a (..., T, N) return array."""
+    equity = np.cumprod(1 + returns, axis=-2)
+    peaks = np.maximum.accumulate(equity, axis=-2)
+    return (equity / peaks - 1).min(axis=-2)
+
+
+def run_backtest(
+    tickers: List[str],
+    rules: Dict[str, Dict[str, str]] = None,
+    period: str = "5y",
+    horizon: int = 5
+) -> Dict[str, Any]:
+    """Evaluate every rule on every ticker in one vectorized pass.
+
+    A rule is a boolean expression over the indicator panel plus a direction.
+    A signal at the close of day t holds a position over day t+1 (no
+    look-ahead). Per rule and ticker this reports the hit rate and average
+    direction-adjusted `horizon`-day forward return on signal days against
+    the unconditional base rate, plus max drawdown, annualized turnover and
+    total return of holding the position while the signal is on.
+
+    Raises BacktestInputError for an unknown period or a horizon the
+    history is too short to measure.
+    """
+    if period not in BACKTEST_PERIODS:
+        raise BacktestInputError(f"Unknown period '{period}'; use one of {', '.join(BACKTEST_PERIODS)}")
+    rules = rules or BUILTIN_RULES
+    symbols, close, volume = _close_panel(tickers, period)
+    if not symbols:
+        return {"error": "No price history for the requested tickers", "results": []}
+    if horizon >= len(close):
+        raise BacktestInputError(f"A {horizon}-day horizon needs more than the {len(close)} bars in period '{period}'")
+
+    panel = indicator_panel(close, volume)
+    names = list(rules)
+    directions = np.array([-1.0 if rules[n].get("direction") == "short" else 1.0 for n in names])
+
+    # (R, T, N) signal cube. NaN indicators compare False, so warm-up bars
+    # never signal.
+    signals = np.stack([
+        np.broadcast_to(Expression(rules[n]["expression"]).evaluate(panel), close.shape)
+        for n in names
+    ]).astype(bool)
+
+    forward = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        forward[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    next_day = np.zeros(close.shape)
+    next_day[:-1] = np.nan_to_num(panel["return_1d"][1:])
+
+    valid = ~np.isnan(forward)
+    active = signals & valid
+    signed_forward = np.where(valid, forward, 0.0) * directions[:, None, None]
+
+    counts = active.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hit_rate = (active & (signed_forward > 0)).sum(axis=1) / counts
+        avg_forward = np.where(active, signed_forward, 0.0).sum(axis=1) / counts
+        base_counts = valid.sum(axis=0)
+        base_hit = (valid[None] & (signed_forward > 0)).sum(axis=1) / base_counts
+        base_forward = signed_forward.sum(axis=1) / base_counts
+
+    positions = signals * directions[:, None, None]
+    strategy = positions * next_day
+    drawdown = _max_drawdown(strategy)
+    total_return = np.prod(1 + strategy, axis=1) - 1
+    bars = np.maximum((~np.isnan(close)).sum(axis=0) - 1, 1)
+    turnover = np.abs(np.diff(positions, axis=1)).sum(axis=1) / bars * TRADING_DAYS
+
+    results = []
+    for r, name in enumerate(names):
+        for n, symbol in enumerate(symbols):
+            results.append({
+                "rule": name,
+                "ticker": symbol,
+                "expression": rules[name]["expression"],
+                "direction": rules[name].get("direction", "long"),
+                "signals": int(counts[r, n]),
+                "hit_rate": _round(hit_rate[r, n], 4),
+                "avg_forward_return_pct": _round(avg_forward[r, n] * 100, 3),
+                "base_hit_rate": _round(base_hit[r, n], 4),
+                "base_avg_forward_return_pct": _round(base_forward[r, n] * 100, 3),
+                "max_drawdown_pct": _round(drawdown[r, n] * 100, 2),
+                "total_return_pct": _round(total_return[r, n] * 100, 2),
+                "annual_turnover": _round(turnover[r, n], 2),
+            })
+
+    return {
+        "tickers": symbols,
+        "missing_tickers": [t.upper() for t in tickers if t.upper() not in symbols],
+        "period": period,
+        "horizon_days": horizon,
+        "bars": int(len(close)),
+        "results": results,
+    }
+
+
+def _round(value, digits: int):
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
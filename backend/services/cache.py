@@ -0,0 +1,48 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Small thread-safe cache with a time-to-live per entry."""
+
+    def __init__(self, ttl: float, max_entries: int = 4096):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.time():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float = None):
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Drop the entry closest to expiry to make room.
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float = None) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl=ttl)
+        return value
+
+    def invalidate(self, match: Callable[[Hashable], bool] = None):
+        with self._lock:
+            if match is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if match(k)]:
+                del self._entries[key]
@@ -0,0 +1,146 @@
+import contextvars
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+ANALYSIS_DEADLINE_SECONDS = float(os.getenv("ANALYSIS_DEADLINE_SECONDS", "300"))
+
+
+class RunCancelled(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"Run cancelled: {reason}")
+        self.reason = reason
+
+
+class RunContext:
+    """Cancellation flag and deadline for one analysis run.
+
+    The route owns it and cancels it when the client disconnects; every
+    layer below calls check() between units of work and sizes its own
+    timeouts from remaining().
+    """
+
+    def __init__(self, run_id: str = None, timeout: float = ANALYSIS_DEADLINE_SECONDS):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.deadline = time.time() + timeout if timeout else None
+        self.reason = None
+        # Token accounting for the run (token_usage.RunTokens), when tracked.
+        self.tokens = None
+        # Analysis mode; "deep" routes every LLM turn to the large model.
+        self.mode = "standard"
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None and time.time() >= self.deadline:
+            self.cancel("deadline_exceeded")
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    def check(self):
+        if self.cancelled:
+            raise RunCancelled(self.reason)
+
+    def sleep(self, seconds: float) -> bool:
+        """Sleep up to `seconds`, waking early on cancellation. Returns True
+        if the run was cancelled."""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self._event.wait(seconds)
+        return self.cancelled
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.time(), 0.0)
+
+    @classmethod
+    def for_request(cls, run_id: str = None, deadline_seconds: float = None) -> "RunContext":
+        """A run with the client's deadline, which can only shorten
+        ANALYSIS_DEADLINE_SECONDS."""
+        deadline = deadline_seconds or ANALYSIS_DEADLINE_SECONDS
+        if ANALYSIS_DEADLINE_SECONDS:
+            deadline = min(deadline, ANALYSIS_DEADLINE_SECONDS)
+        return cls(run_id=run_id, timeout=deadline)
+
+
+_current_run = contextvars.ContextVar("current_run", default=None)
+_runs: Dict[str, RunContext] = {}
+_runs_lock = threading.Lock()
+
+
+def register_run(run: RunContext) -> RunContext:
+    with _runs_lock:
+        _runs[run.run_id] = run
+    return run
+
+
+def unregister_run(run: RunContext):
+    with _runs_lock:
+        _runs.pop(run.run_id, None)
+
+
+def get_run(run_id: str) -> Optional[RunContext]:
+    if not run_id:
+        return None
+    with _runs_lock:
+        return _runs.get(run_id)
+
+
+def check_run(run_id: str):
+    run = get_run(run_id)
+    if run is not None:
+        run.check()
+
+
+def current_run() -> Optional[RunContext]:
+    return _current_run.get()
+
+
+@contextmanager
+def bind_run(run: Optional[RunContext]):
+    """Make `run` the current run for this thread of execution.
+
+    Graph nodes may execute on executor threads that do not inherit
+    context variables, so nodes re-bind from the run_id in their state.
+    """
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+def check_cancelled():
+    run = _current_run.get()
+    if run is not None:
+        run.check()
+
+
+def sleep_unless_cancelled(seconds: float):
+    run = _current_run.get()
+    if run is None:
+        time.sleep(seconds)
+    elif run.sleep(seconds):
+        raise RunCancelled(run.reason)
+
+
+def remaining_timeout(default: float = None) -> Optional[float]:
+    run = _current_run.get()
+    remaining = run.remaining() if run is not None else None
+    if remaining is None:
+        return default
+    return remaining if default is None else min(default, remaining)
@@ -0,0 +1,102 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+CHECKPOINT_STORE_PATH = os.getenv("CHECKPOINT_STORE_PATH", "data/checkpoints.sqlite3")
+CHECKPOINT_MAX_AGE_SECONDS = float(os.getenv("CHECKPOINT_MAX_AGE_SECONDS", "86400"))
+
+# State keys worth persisting between attempts. Messages are left out: each
+# agent starts its own conversation, so only the stage outputs carry over.
+CHECKPOINT_KEYS = (
+    "ticker",
+    "mode",
+    "company_name",
+    "holdings",
+    "current_stage",
+    "status",
+    "error",
+    "completed_stages",
+    "research_data",
+    "analysis_data",
+    "report_data",
+)
+
+
+class StageCheckpointer:
+    """Where the analysis graph keeps completed stage outputs per run id.
+
+    Subclass and pass to create_analysis_graph() to store checkpoints
+    somewhere other than the local sqlite file.
+    """
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def save(self, run_id: str, state: Dict[str, Any]):
+        raise NotImplementedError
+
+    def delete(self, run_id: str):
+        raise NotImplementedError
+
+
+class SqliteStageCheckpointer(StageCheckpointer):
+    """Checkpoints in a sqlite file, so a retry handled by another worker
+    process (or after a restart) still resumes."""
+
+    def __init__(self, path: str = CHECKPOINT_STORE_PATH, max_age: float = CHECKPOINT_MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "run_id TEXT PRIMARY KEY, updated_at REAL NOT NULL, state TEXT NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT updated_at, state FROM checkpoints WHERE run_id = ?",
+                (run_id,)
+            ).fetchone()
+        if row is None or time.time() - row[0] > self.max_age:
+            return None
+        return json.loads(row[1])
+
+    def save(self, run_id: str, state: Dict[str, Any]):
+        payload = json.dumps({key: state.get(key) for key in CHECKPOINT_KEYS}, default=str)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, updated_at, state) VALUES (?, ?, ?)",
+                (run_id, now, payload)
+            )
+            conn.execute("DELETE FROM checkpoints WHERE updated_at < ?", (now - self.max_age,))
+
+    def delete(self, run_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+
+stage_checkpointer = SqliteStageCheckpointer()
@@ -0,0 +1,186 @@
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage
+
+from backend.services.cancellation import RunCancelled, bind_run, get_run, check_cancelled
+from backend.services.llm import invoke_llm
+from backend.services.metrics import metrics
+from backend.services.quick_analysis import gather_facts_many
+
+load_dotenv()
+
+
+COMPARE_FETCH_TIMEOUT_SECONDS = float(os.getenv("COMPARE_FETCH_TIMEOUT_SECONDS", "8"))
+COMPARE_SUMMARY_WORDS = int(os.getenv("COMPARE_SUMMARY_WORDS", "600"))
+
+# (table, [(metric, label, direction)]). Direction 1 means higher is better,
+# -1 lower is better, 0 no leader (size, or mixed like RSI).
+COMPARE_TABLES = [
+    ("Valuation & Fundamentals", [
+        ("market_cap", "Market cap ($M)", 0),
+        ("pe_ratio", "P/E", -1),
+        ("eps", "EPS", 1),
+        ("profit_margin", "Net margin %", 1),
+        ("roe", "ROE %", 1),
+        ("debt_to_equity", "Debt / equity", -1),
+        ("dividend_yield", "Dividend yield %", 1),
+        ("beta", "Beta", -1),
+    ]),
+    ("Price Action", [
+        ("price", "Price", 0),
+        ("change_today_pct", "Today %", 1),
+        ("change_1m_pct", "1M %", 1),
+        ("change_3m_pct", "3M %", 1),
+        ("change_1y_pct", "1Y %", 1),
+        ("vs_sma_200_pct", "vs 200-day SMA %", 1),
+        ("rsi_14", "RSI 14", 0),
+        ("volatility_annual_pct", "Volatility %", -1),
+    ]),
+    ("Sentiment & Analysts", [
+        ("sentiment_score", "News sentiment", 1),
+        ("articles", "Articles (7d)", 0),
+        ("analyst_buy_pct", "Analyst buy %", 1),
+        ("target_upside_pct", "Target upside %", 1),
+    ]),
+]
+
+
+def _flat_metrics(facts: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """One ticker's fact sheet as a flat metric -> value map, with the
+    derived ratios the tables compare."""
+    technicals = facts.get("technicals") or {}
+    news = facts.get("news") or {}
+    values = {**(facts.get("fundamentals") or {}), **technicals}
+    values["price"] = facts.get("price")
+    values["change_today_pct"] = facts.get("change_today_pct")
+    values["sentiment_score"] = news.get("sentiment_score")
+    values["articles"] = news.get("articles")
+
+    sma_200, close = technicals.get("sma_200"), technicals.get("last_close")
+    values["vs_sma_200_pct"] = round((close / sma_200 - 1) * 100, 2) if sma_200 and close else None
+
+    analysts = facts.get("analysts") or {}
+    ratings = [analysts.get(k) or 0 for k in ("strongBuy", "buy", "hold", "sell", "strongSell")]
+    values["analyst_buy_pct"] = round(sum(ratings[:2]) / sum(ratings) * 100, 1) if sum(ratings) else None
+
+    target = (facts.get("price_target") or {}).get("targetMean")
+    values["target_upside_pct"] = round((target / values["price"] - 1) * 100, 2) if target and values["price"] else None
+    return values
+
+
+def comparison_tables(facts: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Side-by-side tables: one row per metric with every ticker's value
+    and the leading ticker where the metric has a better direction."""
+    tickers = list(facts)
+    flat = {ticker: _flat_metrics(facts[ticker]) for ticker in tickers}
+
+    tables = []
+    for title, rows in COMPARE_TABLES:
+        table_rows = []
+        for metric, label, direction in rows:
+            values = {ticker: flat[ticker].get(metric) for ticker in tickers}
+            present = {t: v for t, v in values.items() if v is not None}
+            if not present:
+                continue
+            leader = None
+            if direction and len(present) > 1:
+                best = max(v * direction for v in present.values())
+                leaders = [t for t, v in present.items() if v * direction == best]
+                # A tie has no leader.
+                leader = leaders[0] if len(leaders) == 1 else None
+            table_rows.append({"metric": metric, "label": label, "values": values, "leader": leader})
+        if table_rows:
+            tables.append({"title": title, "rows": table_rows})
+    return tables
+
+
+def tables_markdown(tables: List[Dict[str, Any]], tickers: List[str]) -> str:
+    blocks = []
+    for table in tables:
+        lines = [
+            f"### {table['title']}",
+            "| Metric | " + " | ".join(tickers) + " | Leader |",
+            "|---" * (len(tickers) + 2) + "|",
+        ]
+        for row in table["rows"]:
+            cells = ["n/a" if row["values"][t] is None else f"{row['values'][t]:,}" for t in tickers]
+            lines.append(f"| {row['label']} | " + " | ".join(cells) + f" | {row['leader'] or '-'} |")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def compare_prompt(facts: Dict[str, Dict[str, Any]], tables_md: str) -> str:
+    tickers = list(facts)
+    context = {
+        ticker: {
+            "company": f["company"],
+            "industry": f.get("industry"),
+            "headlines": (f.get("news") or {}).get("headlines", []),
+            "unavailable": f.get("unavailable", []),
+        }
+        for ticker, f in facts.items()
+    }
+    return f"""You are a senior equity analyst comparing {', '.join(tickers)} for an investor choosing between them.
+
+Write about {COMPARE_SUMMARY_WORDS} words in markdown using only the tables and context below:
+## Verdict - rank the stocks and name the one you prefer, in two or three sentences
+## Valuation & Quality
+## Momentum & Risk
+## Sentiment & Street View
+## Which Suits Whom - one line per stock on the kind of investor it fits
+
+Compare the stocks against each other in every section rather than describing them one by one. Cite the numbers you rely on. Note missing data instead of guessing.
+
+TABLES:
+{tables_md}
+
+CONTEXT:
+{json.dumps(context, separators=(',', ':'), default=str)}"""
+
+
+def run_comparison(
+    tickers: List[str],
+    company_names: Dict[str, str] = None,
+    run_id: str = None
+) -> Dict[str, Any]:
+    """Compare 2-5 tickers: one shared data gathering for all of them,
+    local per-ticker metrics (computed in parallel while fetching), and a
+    single writer call over side-by-side tables."""
+    tickers = [t.upper() for t in tickers]
+    result = {
+        "tickers": tickers,
+        "facts": {},
+        "tables": [],
+        "report_text": "",
+        "status": "in_progress",
+        "error": "",
+    }
+
+    with bind_run(get_run(run_id)):
+        start = time.perf_counter()
+        try:
+            check_cancelled()
+            facts = gather_facts_many(tickers, company_names, timeout=COMPARE_FETCH_TIMEOUT_SECONDS)
+            metrics.observe("compare_fetch_seconds", time.perf_counter() - start, tickers=len(tickers))
+
+            tables = comparison_tables(facts)
+            tables_md = tables_markdown(tables, tickers)
+            response = invoke_llm("compare", "synthesis", [HumanMessage(content=compare_prompt(facts, tables_md))],
+                                  temperature=0.4)
+
+            result["facts"] = facts
+            result["tables"] = tables
+            result["report_text"] = f"{response.content.strip()}\n\n## Side-by-Side\n\n{tables_md}"
+            result["status"] = "completed"
+        except RunCancelled as e:
+            result["error"] = f"Comparison cancelled: {e.reason}"
+            result["status"] = "cancelled"
+        except Exception as e:
+            result["error"] = f"Comparison error: {str(e)}"
+            result["status"] = "error"
+
+    return result
@@ -0,0 +1,138 @@
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from backend.services.cache import TTLCache
+from backend.services.indicators import indicator_panel
+from backend.services.price_history import get_price_history, PRICE_CACHE_TTL
+
+
+DEFAULT_OVERLAYS = ("sma_50", "sma_200")
+
+# Downsampled series are cheap to rebuild but requested on every chart
+# render, so they share the price-history TTL.
+_series_cache = TTLCache(ttl=PRICE_CACHE_TTL, max_entries=2048)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-triangle-three-buckets: indices of `threshold` points that
+    keep the visual shape of the (x, y) line.
+
+    The first and last points are always kept. Every bucket in between
+    keeps the point forming the largest triangle with the previously kept
+    point and the average of the next bucket.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    selected[-1] = n - 1
+    return selected
+
+
+def ohlc_buckets(hist: pd.DataFrame, points: int) -> Dict[str, np.ndarray]:
+    """Aggregate bars into at most `points` contiguous candles.
+
+    Each candle opens at its first bar, closes at its last, spans the
+    high/low of all its bars and sums their volume. `index` is the last bar
+    of each candle, where overlays are sampled.
+    """
+    n = len(hist)
+    starts = np.unique(np.floor(np.linspace(0, n, min(points, n), endpoint=False)).astype(np.int64))
+    ends = np.append(starts[1:], n) - 1
+
+    return {
+        "start": starts,
+        "index": ends,
+        "open": hist["Open"].to_numpy(dtype=np.float64)[starts],
+        "high": np.maximum.reduceat(hist["High"].to_numpy(dtype=np.float64), starts),
+        "low": np.minimum.reduceat(hist["Low"].to_numpy(dtype=np.float64), starts),
+        "close": hist["Close"].to_numpy(dtype=np.float64)[ends],
+        "volume": np.add.reduceat(hist["Volume"].to_numpy(dtype=np.float64), starts),
+    }
+
+
+def _values(array: np.ndarray, decimals: int = 4) -> List:
+    rounded = np.round(array.astype(np.float64), decimals)
+    return [None if np.isnan(v) else float(v) for v in rounded]
+
+
+def _dates(index: pd.Index, positions: np.ndarray) -> List[str]:
+    return [ts.strftime("%Y-%m-%d") for ts in index[positions]]
+
+
+def build_price_series(
+    ticker: str,
+    period: str = "1y",
+    points: int = 500,
+    mode: str = "line",
+    overlays: List[str] = DEFAULT_OVERLAYS
+) -> Dict[str, Any]:
+    if mode not in ("line", "ohlc"):
+        raise ValueError(f"Unknown mode: {mode}")
+
+    key = (ticker.upper(), period, points, mode, tuple(overlays))
+    cached = _series_cache.get(key)
+    if cached is not None:
+        return cached
+
+    hist = get_price_history(ticker, period=period)
+    if hist.empty:
+        return {"error": f"No price history for {ticker.upper()}"}
+
+    close = hist["Close"].to_numpy(dtype=np.float64)
+    volume = hist["Volume"].to_numpy(dtype=np.float64)
+
+    # Overlays are computed on the full series and then sampled, so a
+    # 200-day average is still a 200-day average after downsampling.
+    panel = indicator_panel(close, volume)
+    unknown = [name for name in overlays if name not in panel]
+    if unknown:
+        raise ValueError(f"Unknown overlay(s): {', '.join(unknown)}. Available: {', '.join(sorted(panel))}")
+
+    series = {
+        "ticker": ticker.upper(),
+        "period": period,
+        "mode": mode,
+        "source_points": len(hist),
+    }
+
+    if mode == "line":
+        picked = lttb(np.arange(len(close)), close, points)
+        series["timestamps"] = _dates(hist.index, picked)
+        series["close"] = _values(close[picked])
+    else:
+        candles = ohlc_buckets(hist, points)
+        picked = candles["index"]
+        series["timestamps"] = _dates(hist.index, candles["start"])
+        for field in ("open", "high", "low", "close"):
+            series[field] = _values(candles[field])
+        series["volume"] = _values(candles["volume"], decimals=0)
+
+    series["points"] = len(picked)
+    series["overlays"] = {name: _values(panel[name][picked]) for name in overlays}
+
+    _series_cache.set(key, series)
+    return series
@@ -0,0 +1,274 @@
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+
+from dotenv import load_dotenv
+
+from backend.services.metrics import metrics
+
+load_dotenv()
+
+
+EARNINGS_CALENDAR_PATH = os.getenv("EARNINGS_CALENDAR_PATH", "data/earnings.json")
+EARNINGS_LOOKAHEAD_DAYS = int(os.getenv("EARNINGS_LOOKAHEAD_DAYS", "30"))
+EARNINGS_REFRESH_SECONDS = float(os.getenv("EARNINGS_REFRESH_SECONDS", "21600"))
+# Within this many hours of a release, cached data keeps its normal TTL.
+EARNINGS_WINDOW_HOURS = float(os.getenv("EARNINGS_WINDOW_HOURS", "48"))
+# Outside it, TTLs are multiplied by this factor (never past the next release).
+EARNINGS_QUIET_TTL_FACTOR = float(os.getenv("EARNINGS_QUIET_TTL_FACTOR", "6"))
+EARNINGS_CHECK_SECONDS = float(os.getenv("EARNINGS_CHECK_SECONDS", "300"))
+
+# Approximate UTC release hour for Finnhub's `hour` field: before the open,
+# during market hours, after the close. Unknown times count as after the close.
+_RELEASE_HOUR_UTC = {"bmo": 12, "dmh": 16, "amc": 21}
+_DEFAULT_RELEASE_HOUR_UTC = 21
+
+# Cached Finnhub data that changes when a company reports.
+EARNINGS_SENSITIVE_KEYS = ("financials", "price_target", "recommendations")
+
+_KEY_SPLIT_RE = re.compile(r"[:@+]")
+
+
+def _release_time(date: str, hour: str) -> float:
+    day = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return (day + timedelta(hours=_RELEASE_HOUR_UTC.get(hour or "", _DEFAULT_RELEASE_HOUR_UTC))).timestamp()
+
+
+class EarningsCalendar:
+    """Upcoming and recent earnings releases, used to time cache expiry.
+
+    Release times are kept in one sorted list (for "who reported since the
+    last sweep") and per symbol (for "when does this ticker report next").
+    Refreshes build new lists and swap them in whole. While no calendar is
+    loaded, every TTL is left unchanged.
+    """
+
+    def __init__(self, path: str = EARNINGS_CALENDAR_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.refreshed_at = None
+        self.covers_until = None
+        # Re-check recent releases on startup: stored reports may predate them.
+        self._swept_until = time.time() - EARNINGS_WINDOW_HOURS * 3600
+        self._swap([])
+        self._load()
+
+    def _swap(self, events: List[Dict[str, Any]]):
+        events = sorted(events, key=lambda e: e["at"])
+        by_symbol: Dict[str, List[float]] = {}
+        for event in events:
+            by_symbol.setdefault(event["symbol"], []).append(event["at"])
+        # One tuple assignment so readers never see lists from two snapshots.
+        self._data = ([e["at"] for e in events], [e["symbol"] for e in events], by_symbol, events)
+
+    def __len__(self) -> int:
+        return len(self._data[0])
+
+    @property
+    def loaded(self) -> bool:
+        return self.covers_until is not None
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+            self._swap(snapshot["events"])
+            self.covers_until = snapshot["covers_until"]
+            self.refreshed_at = snapshot["refreshed_at"]
+            print(f"Loaded earnings calendar with {len(self)} events")
+        except Exception as e:
+            print(f"Error loading earnings calendar: {e}")
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "refreshed_at": self.refreshed_at,
+                "covers_until": self.covers_until,
+                "events": self._data[3],
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def stale(self) -> bool:
+        return self.refreshed_at is None or time.time() - self.refreshed_at > EARNINGS_REFRESH_SECONDS
+
+    def refresh(self) -> Dict[str, Any]:
+        from backend.services.finnhub import finnhub_client
+
+        with self._lock:
+            if self._refreshing:
+                return {"status": "already_running"}
+            self._refreshing = True
+
+        try:
+            start = time.perf_counter()
+            today = datetime.now(timezone.utc).date()
+            # Keep the past window too, so a restart still sees releases
+            # that stored reports may predate.
+            first = today - timedelta(hours=EARNINGS_WINDOW_HOURS) - timedelta(days=1)
+            last = today + timedelta(days=EARNINGS_LOOKAHEAD_DAYS)
+            rows = finnhub_client.get_earnings_calendar(first.isoformat(), last.isoformat())
+            if not rows:
+                # Keep the current calendar rather than wiping it on an outage.
+                return {"status": "empty_response"}
+
+            events = []
+            for row in rows:
+                if not row.get("symbol") or not row.get("date"):
+                    continue
+                events.append({
+                    "symbol": row["symbol"].upper(),
+                    "date": row["date"],
+                    "hour": row.get("hour") or "",
+                    "at": _release_time(row["date"], row.get("hour")),
+                    "eps_estimate": row.get("epsEstimate"),
+                    "eps_actual": row.get("epsActual"),
+                    "revenue_estimate": row.get("revenueEstimate"),
+                })
+
+            self._swap(events)
+            self.covers_until = datetime(last.year, last.month, last.day, tzinfo=timezone.utc).timestamp()
+            self.refreshed_at = time.time()
+            self._save()
+
+            elapsed = time.perf_counter() - start
+            print(f"Earnings calendar refreshed: {len(self)} events in {elapsed:.1f}s")
+            return {"status": "completed", "events": len(self), "seconds": round(elapsed, 2)}
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def next_release(self, ticker: str, now: float = None) -> Optional[float]:
+        times = self._data[2].get(ticker.upper(), [])
+        i = bisect_right(times, now or time.time())
+        return times[i] if i < len(times) else None
+
+    def last_release(self, ticker: str, now: float = None) -> Optional[float]:
+        times = self._data[2].get(ticker.upper(), [])
+        i = bisect_right(times, now or time.time())
+        return times[i - 1] if i else None
+
+    def ttl_for(self, ticker: str, base_ttl: float, now: float = None) -> float:
+        """TTL for earnings-sensitive data about `ticker` cached now.
+
+        Near a release the base TTL applies, and data cached before a
+        release expires when it is due. Between releases the TTL is
+        stretched by EARNINGS_QUIET_TTL_FACTOR."""
+        if not self.loaded:
+            return base_ttl
+        now = now or time.time()
+        window = EARNINGS_WINDOW_HOURS * 3600
+        upcoming = self.next_release(ticker, now)
+        recent = self.last_release(ticker, now)
+
+        ttl = base_ttl
+        horizon = upcoming if upcoming is not None else self.covers_until
+        if (recent is None or now - recent > window) and horizon - now > window:
+            ttl = base_ttl * EARNINGS_QUIET_TTL_FACTOR
+        if upcoming is not None:
+            ttl = min(ttl, upcoming - now)
+        return max(ttl, 1.0)
+
+    def max_age_for(self, ticker: str, base_max_age: float, extend: bool = True, now: float = None) -> float:
+        """Oldest stored result for `ticker` still worth serving: like
+        ttl_for (or `base_max_age` as given when not `extend`), but never
+        older than the ticker's last release."""
+        now = now or time.time()
+        max_age = self.ttl_for(ticker, base_max_age, now) if extend else base_max_age
+        recent = self.last_release(ticker, now)
+        if recent is not None:
+            max_age = min(max_age, now - recent)
+        return max_age
+
+    def released_between(self, start: float, end: float) -> Dict[str, float]:
+        """Symbols with a release in (start, end], with the latest release time."""
+        times, symbols = self._data[:2]
+        released = {}
+        for i in range(bisect_right(times, start), bisect_right(times, end)):
+            released[symbols[i]] = times[i]
+        return released
+
+    def upcoming(self, days: float = 7, tickers: List[str] = None) -> List[Dict[str, Any]]:
+        now = time.time()
+        times, _, _, events = self._data
+        window = events[bisect_left(times, now):bisect_right(times, now + days * 86400)]
+        if tickers:
+            wanted = {t.upper() for t in tickers}
+            window = [e for e in window if e["symbol"] in wanted]
+        return window
+
+    def sweep(self) -> List[str]:
+        """Drop cached data and stored reports for tickers that reported
+        since the last sweep, and queue watchlist symbols whose stored
+        reports were dropped for regeneration. Returns the tickers handled.
+
+        Every worker re-checks the recent window on startup, so only a
+        report that predates the release triggers regeneration; a restart
+        finds those already gone and queues nothing."""
+        from backend.services.finnhub import finnhub_client
+        from backend.services.report_store import report_store
+        from backend.services.scheduler import scheduler
+
+        now = time.time()
+        released = self.released_between(self._swept_until, now)
+        self._swept_until = now
+        stale = []
+        for symbol, released_at in released.items():
+            finnhub_client.invalidate(symbol, kinds=EARNINGS_SENSITIVE_KEYS)
+            removed = report_store.invalidate_matching(
+                lambda key: symbol in _KEY_SPLIT_RE.split(key), before=released_at
+            )
+            metrics.increment("earnings_invalidations")
+            if removed:
+                stale.append(symbol)
+                print(f"[EARNINGS] {symbol} reported; cleared cached fundamentals and {removed} stored report(s)")
+
+        if stale and scheduler is not None:
+            scheduler.queue_symbols(stale, reason="earnings")
+        return list(released)
+
+
+earnings_calendar = EarningsCalendar()
+
+_watch_stop = threading.Event()
+_watch_thread = None
+
+
+def _watch():
+    while not _watch_stop.is_set():
+        try:
+            if earnings_calendar.stale():
+                # Another worker may have refreshed the shared file already.
+                earnings_calendar._load()
+            if earnings_calendar.stale():
+                earnings_calendar.refresh()
+            earnings_calendar.sweep()
+        except Exception as e:
+            print(f"Error in earnings watch: {e}")
+        _watch_stop.wait(EARNINGS_CHECK_SECONDS)
+
+
+def start_earnings_watch():
+    global _watch_thread
+    if _watch_thread is not None:
+        return
+    _watch_stop.clear()
+    _watch_thread = threading.Thread(target=_watch, name="earnings-watch", daemon=True)
+    _watch_thread.start()
+
+
+def stop_earnings_watch():
+    global _watch_thread
+    _watch_stop.set()
+    _watch_thread = None
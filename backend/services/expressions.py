@@ -0,0 +1,100 @@
+import ast
+import operator
+from typing import Dict, Set
+
+import numpy as np
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+
+class Expression:
+    """A boolean/arithmetic expression over named columns, e.g.
+    `rsi_14 < 30 and close > sma_50 * 1.02`.
+
+    Parsed with Python's `ast` and evaluated against a whitelist of node
+    types only: names, numbers, comparisons, + - * /, and/or/not. Evaluation
+    is elementwise over NumPy arrays, so one call covers every row.
+    """
+
+    def __init__(self, text: str):
+        self.text = text.strip()
+        if not self.text:
+            raise ExpressionError("Empty expression")
+        try:
+            self.tree = ast.parse(self.text, mode="eval").body
+        except SyntaxError as e:
+            raise ExpressionError(f"Invalid expression '{self.text}': {e.msg}")
+        self.names = self._validate(self.tree)
+
+    def _validate(self, node) -> Set[str]:
+        if isinstance(node, ast.Name):
+            return {node.id}
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ExpressionError(f"Only numeric constants are allowed: {node.value!r}")
+            return set()
+        if isinstance(node, ast.BoolOp):
+            return set().union(*(self._validate(v) for v in node.values))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            return self._validate(node.operand)
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            return self._validate(node.left) | self._validate(node.right)
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+            return set().union(self._validate(node.left), *(self._validate(c) for c in node.comparators))
+        raise ExpressionError(f"Unsupported syntax in '{self.text}': {type(node).__name__}")
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        unknown = self.names - set(columns)
+        if unknown:
+            raise ExpressionError(
+                f"Unknown field(s) {', '.join(sorted(unknown))}; available: {', '.join(sorted(columns))}"
+            )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._eval(self.tree, columns)
+
+    def _eval(self, node, columns):
+        if isinstance(node, ast.Name):
+            return columns[node.id]
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.BoolOp):
+            values = [np.asarray(self._eval(v, columns), dtype=bool) for v in node.values]
+            reducer = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return reducer.reduce(values)
+        if isinstance(node, ast.UnaryOp):
+            operand = self._eval(node.operand, columns)
+            if isinstance(node.op, ast.Not):
+                return np.logical_not(operand)
+            return -operand
+        if isinstance(node, ast.BinOp):
+            return _ARITHMETIC[type(node.op)](self._eval(node.left, columns), self._eval(node.right, columns))
+
+        # Chained comparisons (a < b < c) are and-ed pairwise. NaN compares
+        # False, so rows with missing data never match.
+        left = self._eval(node.left, columns)
+        result = None
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self._eval(comparator, columns)
+            step = _COMPARISONS[type(op)](left, right)
+            result = step if result is None else np.logical_and(result, step)
+            left = right
+        return result
@@ -3,10 +3,42 @@ from dotenv import load_dotenv
 import os
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+from backend.services.news import rank_news
+from backend.services.cache import TTLCache
+from backend.services.earnings import earnings_calendar
+from backend.services.resilience import upstream
 
 load_dotenv()
 
 
+FINNHUB_CACHE_TTL = float(os.getenv("FINNHUB_CACHE_TTL", "3600"))
+FINNHUB_NEWS_CACHE_TTL = float(os.getenv("FINNHUB_NEWS_CACHE_TTL", "300"))
+
+
+# Output field -> Finnhub `metric` key for the headline KPIs.
+KEY_METRIC_FIELDS = {
+    "pe_ratio": "peNormalizedAnnual",
+    "eps": "epsBasicExclExtraItemsTTM",
+    "market_cap": "marketCapitalization",
+    "week_52_high": "52WeekHigh",
+    "week_52_low": "52WeekLow",
+    "beta": "beta",
+    "volume_avg_10d": "10DayAverageTradingVolume",
+    "dividend_yield": "dividendYieldIndicatedAnnual",
+    "profit_margin": "netProfitMarginTTM",
+    "roe": "roeTTM",
+    "roa": "roaTTM",
+    "debt_to_equity": "totalDebt/totalEquityQuarterly",
+    "current_ratio": "currentRatioQuarterly",
+    "revenue_per_share": "revenuePerShareTTM",
+    "book_value_per_share": "bookValuePerShareQuarterly",
+}
+
+
+def extract_key_metrics(metric: Dict[str, Any], default: Any = 0) -> Dict[str, Any]:
+    return {field: metric.get(key, default) for field, key in KEY_METRIC_FIELDS.items()}
+
+
 class FinnhubClient:
     def __init__(self):
         api_key = os.getenv("FINNHUB_API_KEY")
@@ -14,10 +46,29 @@ class FinnhubClient:
             raise ValueError("FINNHUB_API_KEY not found in environment variables")
         
         self.client = finnhub.Client(api_key=api_key)
+        self.cache = TTLCache(ttl=FINNHUB_CACHE_TTL)
+    
+    def _cached(self, key: tuple, fetch, ttl: float = None):
+        value = self.cache.get(key)
+        if value is None:
+            value = fetch()
+            # Empty responses are not cached so the next call retries.
+            if value:
+                self.cache.set(key, value, ttl=ttl)
+        return value
+    
+    def invalidate(self, ticker: str = None, kinds: tuple = None):
+        if ticker is None:
+            self.cache.invalidate()
+        else:
+            self.cache.invalidate(lambda key: key[1] == ticker.upper() and (kinds is None or key[0] in kinds))
     
     def get_company_profile(self, ticker: str) -> Dict[str, Any]:
         try:
-            profile = self.client.company_profile2(symbol=ticker)
+            profile = self._cached(
+                ("profile", ticker.upper()),
+                lambda: upstream.call("finnhub.profile", lambda: self.client.company_profile2(symbol=ticker))
+            )
             return profile
         except Exception as e:
             print(f"Error fetching company profile: {e}")
@@ -25,30 +76,64 @@ class FinnhubClient:
     
     def get_quote(self, ticker: str) -> Dict[str, Any]:
         try:
-            quote = self.client.quote(ticker)
+            quote = upstream.call("finnhub.quote", lambda: self.client.quote(ticker))
             return quote
         except Exception as e:
             print(f"Error fetching quote: {e}")
             return {}
     
-    def get_company_news(self, ticker: str, days: int = 7) -> List[Dict[str, Any]]:
+    def get_company_news(
+        self,
+        ticker: str,
+        days: int = 7,
+        limit: int = 10,
+        company_name: str = None
+    ) -> List[Dict[str, Any]]:
         try:
             to_date = datetime.now()
             from_date = to_date - timedelta(days=days)
             
-            news = self.client.company_news(
-                ticker,
-                _from=from_date.strftime("%Y-%m-%d"),
-                to=to_date.strftime("%Y-%m-%d")
+            news = self._cached(
+                ("news", ticker.upper(), days),
+                lambda: upstream.call("finnhub.news", lambda: self.client.company_news(
+                    ticker,
+                    _from=from_date.strftime("%Y-%m-%d"),
+                    to=to_date.strftime("%Y-%m-%d")
+                )),
+                ttl=FINNHUB_NEWS_CACHE_TTL
             )
-            return news[:10]  
+            return rank_news(news, ticker, company_name=company_name, limit=limit)
         except Exception as e:
             print(f"Error fetching news: {e}")
             return []
     
+    def get_stock_symbols(self, exchange: str = "US") -> List[Dict[str, Any]]:
+        # Tens of thousands of rows; the symbol index keeps its own copy on
+        # disk, so this is not cached here.
+        try:
+            return upstream.call("finnhub.symbols", lambda: self.client.stock_symbols(exchange)) or []
+        except Exception as e:
+            print(f"Error fetching stock symbols: {e}")
+            return []
+    
+    def get_earnings_calendar(self, from_date: str, to_date: str, ticker: str = "") -> List[Dict[str, Any]]:
+        # Not cached here; the earnings calendar keeps its own index on disk.
+        try:
+            calendar = upstream.call("finnhub.earnings", lambda: self.client.earnings_calendar(
+                _from=from_date, to=to_date, symbol=ticker, international=False
+            ))
+            return (calendar or {}).get("earningsCalendar") or []
+        except Exception as e:
+            print(f"Error fetching earnings calendar: {e}")
+            return []
+    
     def get_basic_financials(self, ticker: str) -> Dict[str, Any]:
         try:
-            financials = self.client.company_basic_financials(ticker, 'all')
+            financials = self._cached(
+                ("financials", ticker.upper()),
+                lambda: upstream.call("finnhub.financials", lambda: self.client.company_basic_financials(ticker, 'all')),
+                ttl=earnings_calendar.ttl_for(ticker, FINNHUB_CACHE_TTL)
+            )
             return financials
         except Exception as e:
             print(f"Error fetching financials: {e}")
@@ -56,7 +141,11 @@ class FinnhubClient:
     
     def get_recommendation_trends(self, ticker: str) -> List[Dict[str, Any]]:
         try:
-            recommendations = self.client.recommendation_trends(ticker)
+            recommendations = self._cached(
+                ("recommendations", ticker.upper()),
+                lambda: upstream.call("finnhub.recommendations", lambda: self.client.recommendation_trends(ticker)),
+                ttl=earnings_calendar.ttl_for(ticker, FINNHUB_CACHE_TTL)
+            )
             return recommendations
         except Exception as e:
             print(f"Error fetching recommendations: {e}")
@@ -64,7 +153,11 @@ class FinnhubClient:
     
     def get_price_target(self, ticker: str) -> Dict[str, Any]:
         try:
-            target = self.client.price_target(ticker)
+            target = self._cached(
+                ("price_target", ticker.upper()),
+                lambda: upstream.call("finnhub.price_target", lambda: self.client.price_target(ticker)),
+                ttl=earnings_calendar.ttl_for(ticker, FINNHUB_CACHE_TTL)
+            )
             return target
         except Exception as e:
             print(f"Error fetching price target: {e}")
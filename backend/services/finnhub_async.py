@@ -0,0 +1,335 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Iterable, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from backend.services.cache import TTLCache
+from backend.services.earnings import earnings_calendar
+from backend.services.finnhub import finnhub_client, FINNHUB_CACHE_TTL, FINNHUB_NEWS_CACHE_TTL
+from backend.services.metrics import metrics
+from backend.services.news import rank_news
+from backend.services.resilience import upstream, UPSTREAM_BACKOFF_SECONDS
+
+load_dotenv()
+
+
+FINNHUB_BASE_URL = os.getenv("FINNHUB_BASE_URL", "https://finnhub.io/api/v1")
+FINNHUB_HTTP2 = os.getenv("FINNHUB_HTTP2", "on").lower() not in ("off", "false", "0")
+FINNHUB_MAX_CONNECTIONS = int(os.getenv("FINNHUB_MAX_CONNECTIONS", "20"))
+FINNHUB_RATE_PER_SECOND = float(os.getenv("FINNHUB_RATE_PER_SECOND", "25"))
+
+# Endpoint name -> (path, empty value). Names match the resilience
+# policies used by the synchronous client.
+ENDPOINTS = {
+    "profile": ("/stock/profile2", {}),
+    "quote": ("/quote", {}),
+    "news": ("/company-news", []),
+    "financials": ("/stock/metric", {}),
+    "recommendations": ("/stock/recommendation", []),
+    "price_target": ("/stock/price-target", {}),
+}
+
+
+class AsyncRateLimiter:
+    """Token bucket for coroutines: at most `rate` requests per second."""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.interval = 1.0 / rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * self.interval)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class AsyncFinnhubClient:
+    """Awaitable Finnhub client on one keep-alive httpx connection pool.
+
+    Mirrors FinnhubClient's methods and shares its cache keys, so passing
+    finnhub_client.cache lets both clients serve each other's responses.
+    Requests multiplex over HTTP/2 when `h2` is installed. Concurrency is
+    bounded by a token bucket sized to Finnhub's rate limit rather than by
+    the number of sockets.
+    """
+
+    def __init__(self, cache: TTLCache = None, max_connections: int = FINNHUB_MAX_CONNECTIONS,
+                 rate_per_second: float = FINNHUB_RATE_PER_SECOND):
+        api_key = os.getenv("FINNHUB_API_KEY")
+        if not api_key:
+            raise ValueError("FINNHUB_API_KEY not found in environment variables")
+
+        self.api_key = api_key
+        self.cache = cache if cache is not None else TTLCache(ttl=FINNHUB_CACHE_TTL)
+        self.http2 = FINNHUB_HTTP2 and _http2_available()
+        self.max_connections = max_connections
+        self.rate_per_second = rate_per_second
+        self.in_flight = 0
+        self._client = None
+        self._limiter = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so the pool binds to the loop that first uses it.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=FINNHUB_BASE_URL,
+                headers={"X-Finnhub-Token": self.api_key},
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60
+                ),
+                timeout=httpx.Timeout(10.0, connect=5.0)
+            )
+            self._limiter = AsyncRateLimiter(self.rate_per_second)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncFinnhubClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    def invalidate(self, ticker: str = None, kinds: tuple = None):
+        if ticker is None:
+            self.cache.invalidate()
+        else:
+            self.cache.invalidate(lambda key: key[1] == ticker.upper() and (kinds is None or key[0] in kinds))
+
+    def _connection_counts(self) -> Optional[tuple]:
+        # httpx has no public pool introspection, so this reads httpcore's
+        # pool and gives up (None) when its layout is not the expected one.
+        if self._client is None:
+            return 0, 0
+        try:
+            connections = list(self._client._transport._pool.connections)
+            return len(connections), sum(1 for conn in connections if conn.is_idle())
+        except Exception:
+            return None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Pool size and use. `connections` and `idle_connections` are None
+        when the installed httpx does not expose them."""
+        counts = self._connection_counts()
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "in_flight": self.in_flight,
+            "connections": counts[0] if counts else None,
+            "idle_connections": counts[1] if counts else None,
+        }
+
+    def _report_pool(self):
+        for name, value in self.pool_stats().items():
+            if name != "http2" and value is not None:
+                metrics.set_gauge(f"finnhub_pool_{name}", value)
+
+    async def _request(self, endpoint: str, params: Dict[str, Any]):
+        policy = upstream.policy(f"finnhub.{endpoint}")
+        path = ENDPOINTS[endpoint][0]
+        client = self._get_client()
+        labels = {"endpoint": f"finnhub.{endpoint}"}
+
+        for attempt in range(1, policy.attempts + 1):
+            await self._limiter.acquire()
+            self.in_flight += 1
+            self._report_pool()
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, params=params, timeout=policy.timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise httpx.HTTPStatusError(
+                        f"Finnhub returned {response.status_code}", request=response.request, response=response
+                    )
+                response.raise_for_status()
+                payload = response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                transient = status is None or status == 429 or status >= 500
+                outcome = "timeout" if isinstance(e, httpx.TimeoutException) else ("transient_error" if transient else "error")
+                metrics.increment("upstream_calls", outcome=outcome, **labels)
+                if not transient or attempt == policy.attempts:
+                    raise
+                metrics.increment("upstream_retries", **labels)
+                await asyncio.sleep(UPSTREAM_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+                continue
+            finally:
+                self.in_flight -= 1
+                self._report_pool()
+
+            metrics.increment("upstream_calls", outcome="ok", **labels)
+            metrics.observe("upstream_latency_seconds", time.perf_counter() - start, **labels)
+            return payload
+
+    async def _fetch(self, endpoint: str, ticker: str, params: Dict[str, Any], key: Optional[tuple] = None,
+                     ttl: float = None):
+        empty = ENDPOINTS[endpoint][1]
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        try:
+            value = await self._request(endpoint, params)
+        except Exception as e:
+            print(f"Error fetching {endpoint} for {ticker}: {e}")
+            return type(empty)()
+        # Empty responses are not cached so the next call retries.
+        if key is not None and value:
+            self.cache.set(key, value, ttl=ttl)
+        return value or type(empty)()
+
+    async def get_company_profile(self, ticker: str) -> Dict[str, Any]:
+        return await self._fetch("profile", ticker, {"symbol": ticker}, ("profile", ticker.upper()))
+
+    async def get_quote(self, ticker: str) -> Dict[str, Any]:
+        return await self._fetch("quote", ticker, {"symbol": ticker})
+
+    async def get_company_news(
+        self,
+        ticker: str,
+        days: int = 7,
+        limit: int = 10,
+        company_name: str = None
+    ) -> List[Dict[str, Any]]:
+        to_date = datetime.now()
+        from_date = to_date - timedelta(days=days)
+        news = await self._fetch(
+            "news",
+            ticker,
+            {"symbol": ticker, "from": from_date.strftime("%Y-%m-%d"), "to": to_date.strftime("%Y-%m-%d")},
+            ("news", ticker.upper(), days),
+            ttl=FINNHUB_NEWS_CACHE_TTL
+        )
+        try:
+            return rank_news(news, ticker, company_name=company_name, limit=limit)
+        except Exception as e:
+            print(f"Error ranking news: {e}")
+            return []
+
+    async def get_basic_financials(self, ticker: str) -> Dict[str, Any]:
+        return await self._fetch("financials", ticker, {"symbol": ticker, "metric": "all"}, ("financials", ticker.upper()),
+                                 ttl=earnings_calendar.ttl_for(ticker, FINNHUB_CACHE_TTL))
+
+    async def get_recommendation_trends(self, ticker: str) -> List[Dict[str, Any]]:
+        return await self._fetch("recommendations", ticker, {"symbol": ticker}, ("recommendations", ticker.upper()),
+                                 ttl=earnings_calendar.ttl_for(ticker, FINNHUB_CACHE_TTL))
+
+    async def get_price_target(self, ticker: str) -> Dict[str, Any]:
+        return await self._fetch("price_target", ticker, {"symbol": ticker}, ("price_target", ticker.upper()),
+                                 ttl=earnings_calendar.ttl_for(ticker, FINNHUB_CACHE_TTL))
+
+    # ------------------------------------------------------------------
+    # Bulk helpers
+    # ------------------------------------------------------------------
+
+    async def get_quotes(self, tickers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        quotes = await asyncio.gather(*(self.get_quote(t) for t in tickers))
+        return dict(zip(tickers, quotes))
+
+    async def fetch_many(
+        self,
+        tickers: Iterable[str],
+        endpoints: Iterable[str] = ("profile", "financials", "recommendations", "price_target", "news")
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch several endpoints for several tickers concurrently.
+
+        Returns {ticker: {endpoint: data}}. Failed calls come back empty,
+        like the single-ticker methods.
+        """
+        methods = {
+            "profile": self.get_company_profile,
+            "quote": self.get_quote,
+            "news": self.get_company_news,
+            "financials": self.get_basic_financials,
+            "recommendations": self.get_recommendation_trends,
+            "price_target": self.get_price_target,
+        }
+        endpoints = list(endpoints)
+        unknown = [e for e in endpoints if e not in methods]
+        if unknown:
+            raise ValueError(f"Unknown Finnhub endpoint(s): {', '.join(unknown)}")
+
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        jobs = [(t, e) for t in tickers for e in endpoints]
+        results = await asyncio.gather(*(methods[e](t) for t, e in jobs))
+
+        out = {t: {} for t in tickers}
+        for (ticker, endpoint), value in zip(jobs, results):
+            out[ticker][endpoint] = value
+        return out
+
+
+async_finnhub_client = AsyncFinnhubClient(cache=finnhub_client.cache)
+
+# One long-lived loop thread owns async_finnhub_client, so its connection
+# pool and rate limiter stay warm across synchronous callers.
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _client_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="finnhub-async", daemon=True).start()
+        return _loop
+
+
+def run_on_client_loop(coro, timeout: float = None):
+    """Run a coroutine using async_finnhub_client from synchronous code
+    (worker threads, scripts) and wait for its result."""
+    future = asyncio.run_coroutine_threadsafe(coro, _client_loop())
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+def fetch_many_sync(tickers: Iterable[str], endpoints: Iterable[str], timeout: float = None) -> Dict[str, Dict[str, Any]]:
+    """Run fetch_many on the shared client from synchronous code."""
+    return run_on_client_loop(async_finnhub_client.fetch_many(tickers, endpoints), timeout)
+
+
+def close_async_finnhub_client():
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(async_finnhub_client.aclose(), loop).result(5)
+    except Exception as e:
+        print(f"Error closing async Finnhub client: {e}")
+    loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,299 @@
+import os
+import re
+import threading
+import time
+import warnings
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from backend.services.earnings import earnings_calendar
+from backend.services.metrics import metrics
+
+load_dotenv()
+
+
+FUNDAMENTALS_STORE_DIR = os.getenv("FUNDAMENTALS_STORE_DIR", "data/fundamentals")
+# Stored series are refetched after this long, or once the company reports.
+FUNDAMENTALS_MAX_AGE_SECONDS = float(os.getenv("FUNDAMENTALS_MAX_AGE_SECONDS", str(7 * 86400)))
+
+FREQUENCIES = ("quarterly", "annual")
+
+# Output name -> Finnhub series key, per section of the trend summary.
+GROWTH_SERIES = {"sales_per_share": "salesPerShare", "eps": "eps", "book_value": "bookValue"}
+MARGIN_SERIES = {"gross": "grossMargin", "operating": "operatingMargin", "net": "netMargin", "fcf": "fcfMargin"}
+HISTORY_SERIES = {
+    "pe": "peTTM",
+    "pb": "pb",
+    "ps": "psTTM",
+    "roe": "roeTTM",
+    "debt_to_equity": "totalDebtToEquity",
+    "current_ratio": "currentRatio",
+}
+
+MIN_HISTORY_POINTS = 8
+# Margin slope per quarter below this counts as stable.
+STABLE_SLOPE = 0.002
+
+_FILENAME_RE = re.compile(r"[^A-Z0-9.\-]")
+
+
+class FundamentalSeries:
+    """One ticker's metric history at one frequency: a metrics x periods
+    matrix (NaN where a value is missing), periods ascending."""
+
+    def __init__(self, metrics: np.ndarray, periods: np.ndarray, values: np.ndarray):
+        self.metrics = metrics
+        self.periods = periods
+        self.values = values
+        self._rows = {name: i for i, name in enumerate(metrics.tolist())}
+
+    @classmethod
+    def empty(cls) -> "FundamentalSeries":
+        return cls(np.array([], dtype=str), np.array([], dtype="datetime64[D]"), np.empty((0, 0)))
+
+    @classmethod
+    def from_finnhub(cls, series: Dict[str, List[Dict[str, Any]]]) -> "FundamentalSeries":
+        points = [
+            (name, np.datetime64(point["period"], "D"), point["v"])
+            for name, rows in series.items()
+            for point in rows or []
+            if point.get("period") and point.get("v") is not None
+        ]
+        if not points:
+            return cls.empty()
+        names, periods, values = zip(*points)
+        metric_index = np.array(sorted(set(names)))
+        period_index = np.unique(np.array(periods))
+        matrix = np.full((len(metric_index), len(period_index)), np.nan)
+        matrix[np.searchsorted(metric_index, names), np.searchsorted(period_index, periods)] = values
+        return cls(metric_index, period_index, matrix)
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def merge(self, newer: "FundamentalSeries") -> "FundamentalSeries":
+        """Union of both histories; values in `newer` win where present."""
+        if not len(self):
+            return newer
+        if not len(newer):
+            return self
+        metric_index = np.union1d(self.metrics, newer.metrics)
+        period_index = np.union1d(self.periods, newer.periods)
+        matrix = np.full((len(metric_index), len(period_index)), np.nan)
+        for part in (self, newer):
+            rows = np.searchsorted(metric_index, part.metrics)[:, None]
+            cols = np.searchsorted(period_index, part.periods)[None, :]
+            present = ~np.isnan(part.values)
+            target = matrix[rows, cols]
+            matrix[rows, cols] = np.where(present, part.values, target)
+        return FundamentalSeries(metric_index, period_index, matrix)
+
+    def rows(self, names: Dict[str, str]) -> Tuple[List[str], np.ndarray]:
+        """Output names and their value rows (all-NaN rows for metrics the
+        series lacks), in `names` order."""
+        matrix = np.full((len(names), len(self)), np.nan)
+        for i, key in enumerate(names.values()):
+            row = self._rows.get(key)
+            if row is not None:
+                matrix[i] = self.values[row]
+        return list(names), matrix
+
+
+class FundamentalsStore:
+    """Per-ticker history of Finnhub's quarterly and annual metric series,
+    one .npz file per ticker. New downloads are merged into what is on disk,
+    so periods Finnhub stops returning are kept."""
+
+    def __init__(self, directory: str = FUNDAMENTALS_STORE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.directory, _FILENAME_RE.sub("_", ticker.upper()) + ".npz")
+
+    def load(self, ticker: str) -> Tuple[Dict[str, FundamentalSeries], Optional[float]]:
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return {freq: FundamentalSeries.empty() for freq in FREQUENCIES}, None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                series = {
+                    freq: FundamentalSeries(data[f"{freq}_metrics"], data[f"{freq}_periods"], data[f"{freq}_values"])
+                    for freq in FREQUENCIES
+                }
+                return series, float(data["updated_at"])
+        except Exception as e:
+            print(f"Error loading fundamentals for {ticker}: {e}")
+            return {freq: FundamentalSeries.empty() for freq in FREQUENCIES}, None
+
+    def ingest(self, ticker: str, financials: Dict[str, Any]) -> Dict[str, FundamentalSeries]:
+        """Merge the `series` of a basic-financials response into the store."""
+        downloaded = (financials or {}).get("series") or {}
+        if not any(downloaded.get(freq) for freq in FREQUENCIES):
+            return self.load(ticker)[0]
+
+        with self._lock:
+            stored, _ = self.load(ticker)
+            merged = {
+                freq: stored[freq].merge(FundamentalSeries.from_finnhub(downloaded.get(freq) or {}))
+                for freq in FREQUENCIES
+            }
+            columns = {"updated_at": np.float64(time.time())}
+            for freq, series in merged.items():
+                columns[f"{freq}_metrics"] = series.metrics
+                columns[f"{freq}_periods"] = series.periods
+                columns[f"{freq}_values"] = series.values
+            path = self._path(ticker)
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(tmp_path, **columns)
+            os.replace(tmp_path, path)
+        metrics.increment("fundamentals_ingested")
+        return merged
+
+    def stale(self, ticker: str, updated_at: Optional[float]) -> bool:
+        if updated_at is None or time.time() - updated_at > FUNDAMENTALS_MAX_AGE_SECONDS:
+            return True
+        released = earnings_calendar.last_release(ticker)
+        return released is not None and updated_at < released
+
+    def get(self, ticker: str) -> Dict[str, FundamentalSeries]:
+        """Stored series for `ticker`, downloading only when they are missing
+        or older than the company's last release."""
+        series, updated_at = self.load(ticker)
+        if not self.stale(ticker, updated_at):
+            metrics.increment("fundamentals_lookups", source="store")
+            return series
+
+        from backend.services.finnhub import finnhub_client
+
+        metrics.increment("fundamentals_lookups", source="finnhub")
+        financials = finnhub_client.get_basic_financials(ticker)
+        return self.ingest(ticker, financials) if financials else series
+
+
+fundamentals_store = FundamentalsStore()
+
+
+def _change(latest: np.ndarray, earlier: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (latest - earlier) / np.abs(earlier)
+
+
+def _lagged(matrix: np.ndarray, lag: int) -> np.ndarray:
+    """Column `lag` periods before the latest, per row."""
+    if matrix.shape[1] <= lag:
+        return np.full(matrix.shape[0], np.nan)
+    return matrix[:, -1 - lag]
+
+
+def cagr(matrix: np.ndarray, years: int) -> np.ndarray:
+    """Compound annual growth over `years` for every row of an annual
+    matrix; NaN unless both ends are positive."""
+    latest, start = _lagged(matrix, 0), _lagged(matrix, years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (latest / start) ** (1.0 / years) - 1
+    return np.where((latest > 0) & (start > 0), growth, np.nan)
+
+
+def trend_slope(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Least-squares slope per period over the last `window` columns of
+    every row, ignoring missing values. NaN with fewer than 3 points."""
+    recent = matrix[:, -window:]
+    present = ~np.isnan(recent)
+    counts = present.sum(axis=1)
+    x = np.broadcast_to(np.arange(recent.shape[1], dtype=np.float64), recent.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = np.where(present, x, 0).sum(axis=1) / counts
+        y_mean = np.nansum(recent, axis=1) / counts
+        dx = np.where(present, x - x_mean[:, None], 0)
+        dy = np.where(present, recent - y_mean[:, None], 0)
+        slope = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+    return np.where(counts >= 3, slope, np.nan)
+
+
+def history_zscores(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Latest value, historical median and z-score of the latest value
+    against the row's full history, per row."""
+    latest = np.full(matrix.shape[0], np.nan)
+    if matrix.shape[1]:
+        # Latest non-missing value per row.
+        present = ~np.isnan(matrix)
+        last = matrix.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+        latest = np.where(present.any(axis=1), matrix[np.arange(matrix.shape[0]), last], np.nan)
+    counts = (~np.isnan(matrix)).sum(axis=1)
+    if not matrix.shape[1]:
+        return latest, latest, latest
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        # All-NaN rows (metrics the series lacks) are expected.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(matrix, axis=1)
+        z = (latest - np.nanmean(matrix, axis=1)) / np.nanstd(matrix, axis=1)
+    enough = counts >= MIN_HISTORY_POINTS
+    return latest, np.where(enough, median, np.nan), np.where(enough, z, np.nan)
+
+
+def _clean(value, digits: int = 4):
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def _present(section: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    # Metrics the company does not report are left out rather than sent as nulls.
+    return {name: values for name, values in section.items() if any(v is not None for v in values.values())}
+
+
+def fundamental_trends(ticker: str) -> Dict[str, Any]:
+    """Growth, margin trends, CAGR and valuation versus history from the
+    stored series. Every metric of a section is computed in one pass over
+    its metrics x periods matrix."""
+    series = fundamentals_store.get(ticker)
+    quarterly, annual = series["quarterly"], series["annual"]
+    if not len(quarterly) and not len(annual):
+        return {"ticker": ticker.upper(), "error": "No historical fundamentals available"}
+
+    result = {
+        "ticker": ticker.upper(),
+        "as_of": str(quarterly.periods[-1]) if len(quarterly) else str(annual.periods[-1]),
+        "quarters": len(quarterly),
+        "years": len(annual),
+    }
+
+    names, q_growth = quarterly.rows(GROWTH_SERIES)
+    _, a_growth = annual.rows(GROWTH_SERIES)
+    q_latest = _lagged(q_growth, 0)
+    yoy, qoq = _change(q_latest, _lagged(q_growth, 4)), _change(q_latest, _lagged(q_growth, 1))
+    cagr_3y, cagr_5y = cagr(a_growth, 3), cagr(a_growth, 5)
+    result["growth"] = _present({
+        name: {"yoy": _clean(yoy[i]), "qoq": _clean(qoq[i]), "cagr_3y": _clean(cagr_3y[i]), "cagr_5y": _clean(cagr_5y[i])}
+        for i, name in enumerate(names)
+    })
+
+    names, margins = quarterly.rows(MARGIN_SERIES)
+    latest = _lagged(margins, 0)
+    recent = margins[:, -4:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_4q = np.nansum(recent, axis=1) / (~np.isnan(recent)).sum(axis=1)
+    change_yoy = latest - _lagged(margins, 4)
+    slope = trend_slope(margins, 8)
+    direction = np.where(slope > STABLE_SLOPE, "expanding", np.where(slope < -STABLE_SLOPE, "contracting", "stable"))
+    result["margins"] = _present({
+        name: {
+            "latest": _clean(latest[i]),
+            "avg_4q": _clean(avg_4q[i]),
+            "change_yoy": _clean(change_yoy[i]),
+            "slope_8q": _clean(slope[i], 5),
+            "trend": str(direction[i]) if np.isfinite(slope[i]) else None,
+        }
+        for i, name in enumerate(names)
+    })
+
+    names, history = quarterly.rows(HISTORY_SERIES)
+    latest, median, z = history_zscores(history)
+    result["vs_history"] = _present({
+        name: {"latest": _clean(latest[i]), "median": _clean(median[i]), "z_score": _clean(z[i], 2)}
+        for i, name in enumerate(names)
+    })
+    return result
@@ -2,13 +2,37 @@ from typing import TypedDict, Literal, Annotated, Sequence
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage
 from backend.services.agents import get_researcher_agent, get_analyst_agent, get_writer_agent
+from backend.services.cancellation import RunCancelled, bind_run, get_run, check_cancelled, sleep_unless_cancelled
+from backend.services.checkpoints import StageCheckpointer, stage_checkpointer
+from backend.services.metrics import metrics
+from backend.services.resilience import is_retryable_failure
+from dotenv import load_dotenv
 import operator
+import os
+import random
+
+load_dotenv()
+
+
+STAGE_MAX_ATTEMPTS = int(os.getenv("STAGE_MAX_ATTEMPTS", "3"))
+# Attempts per stage, overridable with STAGE_MAX_ATTEMPTS_<STAGE>. Only
+# failures that may go away (timeouts, rate limits, 5xx) are retried.
+STAGE_ATTEMPTS = {
+    stage: int(os.getenv(f"STAGE_MAX_ATTEMPTS_{stage.upper()}", STAGE_MAX_ATTEMPTS))
+    for stage in ("research", "analysis", "report")
+}
+STAGE_RETRY_BACKOFF_SECONDS = float(os.getenv("STAGE_RETRY_BACKOFF_SECONDS", "2"))
 
 
 class AnalysisState(TypedDict):
     ticker: str
+    mode: str
     company_name: str
+    holdings: list
+    run_id: str
     current_stage: str
+    completed_stages: list
+    stage_results: dict
     research_data: dict
     analysis_data: dict
     report_data: dict
@@ -21,10 +45,11 @@ def research_stage(state: AnalysisState) -> AnalysisState:
     print(f"[STAGE 1/3] Starting Market Research for {state['ticker']}...")
     
     try:
+        check_cancelled()
         researcher = get_researcher_agent()
         
         agent_state = {
-            "messages": state.get("messages", []),
+            "messages": [],
             "ticker": state["ticker"],
             "company_name": state.get("company_name", state["ticker"]),
             "research_complete": False,
@@ -32,6 +57,7 @@ def research_stage(state: AnalysisState) -> AnalysisState:
             "report_complete": False,
             "research_data": "",
             "analysis_data": "",
+            "run_id": state.get("run_id"),
             "next_agent": "analyst"
         }
         
@@ -42,12 +68,19 @@ def research_stage(state: AnalysisState) -> AnalysisState:
         state["research_data"] = {"summary": research_summary}
         state["current_stage"] = "analysis"
         state["messages"] = result.get("messages", [])
+        state["stage_results"] = {**(state.get("stage_results") or {}), "research": result.get("stage_result")}
         
         print(f"[STAGE 1/3] Market Research completed ✓")
         
+    except RunCancelled as e:
+        state["error"] = f"Research stage cancelled: {e.reason}"
+        state["status"] = "cancelled"
+        print(f"[STAGE 1/3] Market Research cancelled: {e.reason}")
+        
     except Exception as e:
         state["error"] = f"Research stage error: {str(e)}"
         state["status"] = "error"
+        state["retryable"] = is_retryable_failure(e)
         print(f"[STAGE 1/3] Market Research failed: {str(e)}")
     
     return state
@@ -57,10 +90,11 @@ def analysis_stage(state: AnalysisState) -> AnalysisState:
     print(f"[STAGE 2/3] Starting Data Analysis for {state['ticker']}...")
     
     try:
+        check_cancelled()
         analyst = get_analyst_agent()
         
         agent_state = {
-            "messages": state.get("messages", []),
+            "messages": [],
             "ticker": state["ticker"],
             "company_name": state.get("company_name", state["ticker"]),
             "research_complete": True,
@@ -68,6 +102,8 @@ def analysis_stage(state: AnalysisState) -> AnalysisState:
             "report_complete": False,
             "research_data": state.get("research_data", {}).get("summary", ""),
             "analysis_data": "",
+            "holdings": state.get("holdings", []),
+            "run_id": state.get("run_id"),
             "next_agent": "writer"
         }
         
@@ -78,12 +114,19 @@ def analysis_stage(state: AnalysisState) -> AnalysisState:
         state["analysis_data"] = {"summary": analysis_summary}
         state["current_stage"] = "report"
         state["messages"] = result.get("messages", [])
+        state["stage_results"] = {**(state.get("stage_results") or {}), "analysis": result.get("stage_result")}
         
         print(f"[STAGE 2/3] Data Analysis completed ✓")
         
+    except RunCancelled as e:
+        state["error"] = f"Analysis stage cancelled: {e.reason}"
+        state["status"] = "cancelled"
+        print(f"[STAGE 2/3] Data Analysis cancelled: {e.reason}")
+        
     except Exception as e:
         state["error"] = f"Analysis stage error: {str(e)}"
         state["status"] = "error"
+        state["retryable"] = is_retryable_failure(e)
         print(f"[STAGE 2/3] Data Analysis failed: {str(e)}")
     
     return state
@@ -93,13 +136,14 @@ def report_stage(state: AnalysisState) -> AnalysisState:
     print(f"[STAGE 3/3] Starting Executive Summary Generation for {state['ticker']}...")
     
     try:
+        check_cancelled()
         writer = get_writer_agent()
         
         research_summary = state.get("research_data", {}).get("summary", "No research data available")
         analysis_summary = state.get("analysis_data", {}).get("summary", "No analysis data available")
         
         agent_state = {
-            "messages": state.get("messages", []),
+            "messages": [],
             "ticker": state["ticker"],
             "company_name": state.get("company_name", state["ticker"]),
             "research_complete": True,
@@ -107,6 +151,7 @@ def report_stage(state: AnalysisState) -> AnalysisState:
             "report_complete": False,
             "research_data": research_summary,
             "analysis_data": analysis_summary,
+            "run_id": state.get("run_id"),
             "next_agent": "end"
         }
         
@@ -118,22 +163,29 @@ def report_stage(state: AnalysisState) -> AnalysisState:
         state["current_stage"] = "completed"
         state["status"] = "completed"
         state["messages"] = result.get("messages", [])
+        state["stage_results"] = {**(state.get("stage_results") or {}), "report": result.get("stage_result")}
         
         print(f"[STAGE 3/3] Executive Summary completed ✓")
         print(f"\n{'='*80}")
         print(f"Financial Analysis Complete for {state['ticker']}")
         print(f"{'='*80}\n")
         
+    except RunCancelled as e:
+        state["error"] = f"Report stage cancelled: {e.reason}"
+        state["status"] = "cancelled"
+        print(f"[STAGE 3/3] Executive Summary cancelled: {e.reason}")
+        
     except Exception as e:
         state["error"] = f"Report stage error: {str(e)}"
         state["status"] = "error"
+        state["retryable"] = is_retryable_failure(e)
         print(f"[STAGE 3/3] Executive Summary failed: {str(e)}")
     
     return state
 
 
 def should_continue(state: AnalysisState) -> Literal["analysis", "report", "end"]:
-    if state.get("status") == "error":
+    if state.get("status") in ("error", "cancelled"):
         return "end"
     
     current_stage = state.get("current_stage", "research")
@@ -146,20 +198,67 @@ def should_continue(state: AnalysisState) -> Literal["analysis", "report", "end"
         return "end"
 
 
-def create_analysis_graph():
+def _stage_node(name: str, stage, checkpointer: StageCheckpointer):
+    """Wrap a stage with resume, retry and checkpointing.
+
+    A stage already recorded in the run's checkpoint is skipped. An attempt
+    that failed transiently is retried with exponential backoff and jitter,
+    up to the stage's STAGE_ATTEMPTS; other failures and cancellation are
+    never retried. The outcome of every stage is checkpointed under the
+    run id, so progress can be polled and a later request with the same id
+    picks up after the last completed stage.
+    """
+    def run_stage(state: AnalysisState) -> AnalysisState:
+        if name in (state.get("completed_stages") or []):
+            print(f"[{name.upper()}] Restored from checkpoint, skipping")
+            metrics.increment("stage_resumed", stage=name)
+            # Nothing changed; returning the state would re-append `messages`.
+            return {}
+        
+        # Nodes can run on executor threads that do not inherit the caller's
+        # context, so each stage re-binds the run from the id in its state.
+        with bind_run(get_run(state.get("run_id"))):
+            max_attempts = STAGE_ATTEMPTS.get(name, STAGE_MAX_ATTEMPTS)
+            for attempt in range(1, max_attempts + 1):
+                result = stage(dict(state))
+                retryable = result.pop("retryable", False)
+                if result.get("status") != "error" or not retryable or attempt == max_attempts:
+                    break
+                delay = STAGE_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                print(f"[{name.upper()}] Attempt {attempt} failed, retrying in {delay:.1f}s")
+                metrics.increment("stage_retries", stage=name)
+                try:
+                    sleep_unless_cancelled(delay)
+                except RunCancelled as e:
+                    result["error"] = f"{result['error']} (retry cancelled: {e.reason})"
+                    result["status"] = "cancelled"
+                    break
+        
+        if result.get("status") not in ("error", "cancelled"):
+            result["completed_stages"] = list(state.get("completed_stages") or []) + [name]
+        if state.get("run_id"):
+            checkpointer.save(state["run_id"], result)
+        return result
+    return run_stage
+
+
+def create_analysis_graph(checkpointer: StageCheckpointer = stage_checkpointer):
     workflow = StateGraph(AnalysisState)
     
-    workflow.add_node("research", research_stage)
-    workflow.add_node("analysis", analysis_stage)
-    workflow.add_node("report", report_stage)
+    workflow.add_node("research", _stage_node("research", research_stage, checkpointer))
+    workflow.add_node("analysis", _stage_node("analysis", analysis_stage, checkpointer))
+    workflow.add_node("report", _stage_node("report", report_stage, checkpointer))
     
     workflow.set_entry_point("research")
     
+    # A resumed run skips its completed stages, so research may hand over
+    # straight to the report.
     workflow.add_conditional_edges(
         "research",
         should_continue,
         {
             "analysis": "analysis",
+            "report": "report",
             "end": END
         }
     )
@@ -183,11 +282,36 @@ def create_analysis_graph():
 analysis_graph = create_analysis_graph()
 
 
-def run_financial_analysis(ticker: str, company_name: str = None) -> dict:
+def _restore_checkpoint(state: AnalysisState, checkpointer: StageCheckpointer = stage_checkpointer):
+    checkpoint = checkpointer.load(state["run_id"]) if state.get("run_id") else None
+    if (
+        not checkpoint
+        or checkpoint.get("ticker") != state["ticker"]
+        or checkpoint.get("holdings") != state["holdings"]
+        # Another mode runs other stages (quick has no research stage).
+        or checkpoint.get("mode") != state["mode"]
+    ):
+        return state
+    
+    completed = checkpoint.get("completed_stages") or []
+    print(f"Resuming run {state['run_id']} after: {', '.join(completed) or 'nothing'}")
+    restored = {key: value for key, value in checkpoint.items() if value is not None}
+    # A failed or cancelled attempt is retried from its last completed stage.
+    status = "completed" if restored.get("status") == "completed" else "in_progress"
+    return {**state, **restored, "status": status, "error": ""}
+
+
+def run_financial_analysis(ticker: str, company_name: str = None, holdings: list = None, run_id: str = None,
+                           mode: str = "standard") -> dict:
     initial_state = {
         "ticker": ticker.upper(),
+        "mode": mode,
         "company_name": company_name or ticker.upper(),
+        "holdings": [h.upper() for h in holdings or []],
+        "run_id": run_id,
         "current_stage": "research",
+        "completed_stages": [],
+        "stage_results": {},
         "research_data": {},
         "analysis_data": {},
         "report_data": {},
@@ -200,6 +324,6 @@ def run_financial_analysis(ticker: str, company_name: str = None) -> dict:
     print(f"Starting Financial Analysis for {ticker.upper()}")
     print(f"{'='*80}\n")
     
-    result = analysis_graph.invoke(initial_state)
+    result = analysis_graph.invoke(_restore_checkpoint(initial_state))
     
     return result
\ No newline at end of file
@@ -0,0 +1,59 @@
+from typing import Dict
+
+import numpy as np
+
+
+# NumPy versions of the indicators in calculate_technical_indicators, over
+# a T x N panel of closes (one column per ticker, NaN where a ticker has no
+# bar). Windows containing a NaN produce NaN, like pandas rolling().mean().
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return out
+
+    missing = np.isnan(values)
+    filled = np.where(missing, 0.0, values)
+    pad = np.zeros((1,) + values.shape[1:])
+    csum = np.concatenate([pad, np.cumsum(filled, axis=0)])
+    cmiss = np.concatenate([pad, np.cumsum(missing, axis=0)])
+
+    sums = csum[window:] - csum[:-window]
+    gaps = cmiss[window:] - cmiss[:-window]
+    out[window - 1:] = np.where(gaps > 0, np.nan, sums / window)
+    return out
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Simple-moving-average RSI, matching calculate_technical_indicators."""
+    delta = np.full(close.shape, np.nan)
+    delta[1:] = close[1:] - close[:-1]
+    gain = rolling_mean(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), window)
+    loss = rolling_mean(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+
+def daily_returns(close: np.ndarray) -> np.ndarray:
+    out = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = close[1:] / close[:-1] - 1
+    return out
+
+
+def indicator_panel(close: np.ndarray, volume: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """Named indicator arrays usable in rule and screen expressions."""
+    panel = {
+        "close": close,
+        "sma_20": rolling_mean(close, 20),
+        "sma_50": rolling_mean(close, 50),
+        "sma_200": rolling_mean(close, 200),
+        "rsi_14": rsi(close, 14),
+        "return_1d": daily_returns(close),
+    }
+    if volume is not None:
+        panel["volume"] = volume
+        panel["volume_avg_20"] = rolling_mean(volume, 20)
+    return panel
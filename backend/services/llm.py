@@ -1,34 +1,236 @@
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
+from typing import Callable, Optional, Tuple
+from backend.services.metrics import metrics
+from backend.services.cancellation import RunCancelled, check_cancelled, current_run, remaining_timeout
+from backend.services.token_usage import record_run_tokens
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import contextvars
 import os
+import time
 
 load_dotenv()
 
 
-def get_llm(temperature: float = 0.7, model: str = None):
+# Default route per (agent, turn type). Tool-planning turns and short
+# summaries go to the fast tier; long-form report turns use the large one.
+# Override any route with LLM_ROUTE_<AGENT>_<TURN>, set to a tier name
+# ("fast" / "large") or a literal model id.
+DEFAULT_ROUTES = {
+    ("research", "tool"): "fast",
+    ("research", "report"): "large",
+    ("analyst", "tool"): "fast",
+    ("analyst", "report"): "large",
+    ("writer", "summary"): "fast",
+    ("summarizer", "map"): "fast",
+    ("quick", "summary"): "fast",
+    ("compare", "synthesis"): "large",
+}
+
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "16"))
+# How often a caller waiting on an in-flight call checks its run.
+LLM_CANCEL_POLL_SECONDS = 0.2
+
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="llm")
+
+TURN_MAX_TOKENS = {
+    "tool": 1024,
+    "report": 8192,
+    "summary": 1024,
+    "map": 1024,
+    "synthesis": 2048,
+}
+
+
+def get_llm(temperature: float = 0.7, model: str = None, max_tokens: int = 8192, timeout: float = None):
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         raise ValueError("GROQ_API_KEY not found in environment variables")
-    
+
     model_name = model or os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
-    
+
     llm = ChatGroq(
         groq_api_key=api_key,
         model_name=model_name,
         temperature=temperature,
-        max_tokens=8192 
+        max_tokens=max_tokens,
+        request_timeout=timeout
     )
-    
+
     return llm
 
 
-def get_research_llm(temperature: float = 0.7):
-    return get_llm(temperature=temperature)
+def _tier_model(tier: str) -> str:
+    if tier == "large":
+        return os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+    if tier == "fast":
+        return os.getenv("LLM_FAST_MODEL", "llama-3.1-8b-instant")
+    return tier
+
+
+def resolve_route(agent: str, turn: str) -> Tuple[str, int]:
+    run = current_run()
+    if os.getenv("LLM_ROUTING", "on").lower() in ("off", "false", "0") or (run is not None and run.mode == "deep"):
+        target = "large"
+    else:
+        target = os.getenv(
+            f"LLM_ROUTE_{agent.upper()}_{turn.upper()}",
+            DEFAULT_ROUTES.get((agent, turn), "large")
+        )
+    return _tier_model(target), TURN_MAX_TOKENS.get(turn, 8192)
+
+
+def extract_token_usage(message) -> Tuple[int, int]:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+    metadata = getattr(message, "response_metadata", None) or {}
+    usage = metadata.get("token_usage") or metadata.get("usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+def invoke_llm(agent: str, turn: str, messages, temperature: float = 0.7, tools=None):
+    # Never start a call for a cancelled run, never let one outlive the
+    # run's deadline, and stop waiting on one once the run is cancelled.
+    check_cancelled()
+    model, max_tokens = resolve_route(agent, turn)
+    timeout = max(remaining_timeout(LLM_REQUEST_TIMEOUT), 1.0)
+    llm = get_llm(temperature=temperature, model=model, max_tokens=max_tokens, timeout=timeout)
+    if tools:
+        llm = llm.bind_tools(tools)
+
+    labels = {"agent": agent, "turn": turn, "model": model}
+    start = time.perf_counter()
+    try:
+        response = _invoke_abandonable(agent, labels, lambda: llm.invoke(messages))
+    except RunCancelled:
+        raise
+    except Exception:
+        metrics.increment("llm_errors", **labels)
+        raise
+
+    return _finish_call(agent, labels, response, start)
+
+
+def _invoke_abandonable(agent: str, labels: dict, call: Callable):
+    """Run `call` on the LLM pool and wait for it, but give up as soon as
+    the current run is cancelled. The abandoned request runs on to its own
+    timeout; its tokens are still accounted to the run when it returns."""
+    run = current_run()
+    if run is None:
+        return call()
+
+    future = _llm_executor.submit(contextvars.copy_context().run, call)
+    while True:
+        try:
+            return future.result(timeout=LLM_CANCEL_POLL_SECONDS)
+        except FutureTimeout:
+            if run.cancelled:
+                metrics.increment("llm_calls_abandoned", **labels)
+                future.add_done_callback(lambda f: _account_abandoned(f, run, agent, labels))
+                raise RunCancelled(run.reason)
+
+
+def _account_abandoned(future, run, agent: str, labels: dict):
+    if future.cancelled() or future.exception() is not None:
+        return
+    prompt_tokens, completion_tokens = extract_token_usage(future.result())
+    metrics.increment("llm_prompt_tokens", prompt_tokens, **labels)
+    metrics.increment("llm_completion_tokens", completion_tokens, **labels)
+    record_run_tokens(run, agent, prompt_tokens, completion_tokens)
+
+
+def _usage_from_chunk(chunk) -> Optional[Tuple[int, int]]:
+    # Groq reports usage once, on the last chunk, under `x_groq`. Newer
+    # langchain-groq releases pass it on in the chunk's metadata; older
+    # ones drop it.
+    metadata = getattr(chunk, "response_metadata", None) or {}
+    usage = (metadata.get("x_groq") or {}).get("usage")
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    usage = extract_token_usage(chunk)
+    return usage if any(usage) else None
+
+
+def estimate_token_usage(messages, response) -> Tuple[int, int]:
+    """Rough (prompt, completion) token counts at ~4 characters a token,
+    for responses that came back without usage."""
+    prompt_chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    return max(prompt_chars // 4, 1), max(len(str(response.content)) // 4, 1)
+
+
+def stream_llm(agent: str, turn: str, messages, temperature: float = 0.7, on_token: Callable[[str], None] = None):
+    """Like invoke_llm, but streams the completion, passing each text chunk
+    to `on_token` as it arrives. Returns the complete message.
+
+    Usage is taken from the chunk metadata when the installed langchain-groq
+    passes it on; otherwise it is estimated, so the run's token budget
+    still sees the call."""
+    check_cancelled()
+    model, max_tokens = resolve_route(agent, turn)
+    timeout = max(remaining_timeout(LLM_REQUEST_TIMEOUT), 1.0)
+    llm = get_llm(temperature=temperature, model=model, max_tokens=max_tokens, timeout=timeout)
+
+    labels = {"agent": agent, "turn": turn, "model": model}
+    start = time.perf_counter()
+    response = None
+    usage = None
+    try:
+        for chunk in llm.stream(messages):
+            usage = _usage_from_chunk(chunk) or usage
+            if response is None:
+                metrics.observe("llm_first_token_seconds", time.perf_counter() - start, **labels)
+            response = chunk if response is None else response + chunk
+            if chunk.content and on_token is not None:
+                on_token(chunk.content)
+            check_cancelled()
+    except RunCancelled:
+        raise
+    except Exception:
+        metrics.increment("llm_errors", **labels)
+        raise
+
+    if response is None:
+        raise ValueError(f"Empty streamed response from {model}")
+    if usage is None:
+        metrics.increment("llm_usage_estimated", **labels)
+        usage = estimate_token_usage(messages, response)
+    return _finish_call(agent, labels, response, start, usage)
+
+
+def _finish_call(agent: str, labels: dict, response, start: float, usage: Tuple[int, int] = None):
+    prompt_tokens, completion_tokens = usage or extract_token_usage(response)
+    metrics.increment("llm_calls", **labels)
+    metrics.increment("llm_prompt_tokens", prompt_tokens, **labels)
+    metrics.increment("llm_completion_tokens", completion_tokens, **labels)
+    metrics.observe("llm_latency_seconds", time.perf_counter() - start, **labels)
+    record_run_tokens(current_run(), agent, prompt_tokens, completion_tokens)
+
+    # The client may have gone away while this call was in flight, or the
+    # call may have taken the run over its token budget.
+    check_cancelled()
+
+    return response
+
+
+
+def get_research_llm(temperature: float = 0.7, turn: str = "report"):
+    model, max_tokens = resolve_route("research", turn)
+    return get_llm(temperature=temperature, model=model, max_tokens=max_tokens)
+
+
+def get_analyst_llm(temperature: float = 0.3, turn: str = "report"):
+    model, max_tokens = resolve_route("analyst", turn)
+    return get_llm(temperature=temperature, model=model, max_tokens=max_tokens)
 
 
-def get_analyst_llm(temperature: float = 0.3):
-    return get_llm(temperature=temperature)
+def get_writer_llm(temperature: float = 0.5, turn: str = "summary"):
+    model, max_tokens = resolve_route("writer", turn)
+    return get_llm(temperature=temperature, model=model, max_tokens=max_tokens)
 
 
-def get_writer_llm(temperature: float = 0.5):
-    return get_llm(temperature=temperature)
\ No newline at end of file
+def get_summarizer_llm(temperature: float = 0.2, turn: str = "map"):
+    model, max_tokens = resolve_route("summarizer", turn)
+    return get_llm(temperature=temperature, model=model, max_tokens=max_tokens)
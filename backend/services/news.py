@@ -0,0 +1,168 @@
+import re
+import time
+import zlib
+from typing import Dict, Any, List
+
+import numpy as np
+
+
+SOURCE_WEIGHTS = {
+    "reuters": 1.0,
+    "bloomberg": 1.0,
+    "wsj": 0.95,
+    "financial times": 0.95,
+    "cnbc": 0.85,
+    "marketwatch": 0.8,
+    "barrons": 0.8,
+    "seekingalpha": 0.65,
+    "yahoo": 0.6,
+    "benzinga": 0.55,
+    "finnhub": 0.5,
+}
+DEFAULT_SOURCE_WEIGHT = 0.5
+
+RECENCY_HALF_LIFE_HOURS = 24.0
+RECENCY_WEIGHT = 0.45
+SOURCE_WEIGHT = 0.25
+RELEVANCE_WEIGHT = 0.30
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+LSH_BANDS = 16
+DUPLICATE_THRESHOLD = 0.6
+
+# Multiply-shift hash family: h(x) = (a * x + b) >> 32 with odd 64-bit `a`,
+# which avoids a modulo over the whole shingle x permutation matrix.
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(0, 2 ** 63 - 1, size=NUM_PERM, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+_PERM_B = _rng.randint(0, 2 ** 63 - 1, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _shingles(text: str) -> List[int]:
+    # Signatures are only compared within one call, so the process-salted
+    # built-in hash is fine and much cheaper than a checksum per shingle.
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return [hash(tuple(words)) & 0xFFFFFFFF] if words else []
+    return [
+        hash(shingle) & 0xFFFFFFFF
+        for shingle in zip(*(words[i:] for i in range(SHINGLE_SIZE)))
+    ]
+
+
+def minhash_signatures(texts: List[str]) -> np.ndarray:
+    """MinHash signatures of word shingles, one row per text."""
+    hashes = []
+    lengths = np.empty(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        # Texts without words get a shingle of their own so they never match.
+        shingles = _shingles(text) or [zlib.crc32(f"empty-{i}".encode())]
+        hashes.extend(shingles)
+        lengths[i] = len(shingles)
+
+    values = np.asarray(hashes, dtype=np.uint64)
+    permuted = ((values[:, None] * _PERM_A + _PERM_B) >> np.uint64(32)).astype(np.uint32)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.minimum.reduceat(permuted, offsets, axis=0)
+
+
+def duplicate_clusters(signatures: np.ndarray) -> np.ndarray:
+    """Cluster label per row, joining rows whose estimated Jaccard similarity
+    is above DUPLICATE_THRESHOLD. Candidates come from LSH banding so the
+    cost stays close to linear in the number of articles."""
+    n = len(signatures)
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rows_per_band = NUM_PERM // LSH_BANDS
+    mixers = _PERM_A[:rows_per_band]
+    for band in range(LSH_BANDS):
+        block = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        # Collisions only add candidates; they are verified below.
+        keys = (block.astype(np.uint64) * mixers).sum(axis=1)
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = np.flatnonzero(counts[inverse] > 1)
+        if not len(shared):
+            continue
+        order = shared[np.argsort(inverse[shared], kind="stable")]
+        boundaries = np.flatnonzero(np.diff(inverse[order])) + 1
+        for bucket in np.split(order, boundaries):
+            head = bucket[0]
+            similarity = (signatures[bucket[1:]] == signatures[head]).mean(axis=1)
+            for member in bucket[1:][similarity >= DUPLICATE_THRESHOLD]:
+                root_a, root_b = find(head), find(member)
+                if root_a != root_b:
+                    parent[root_b] = root_a
+
+    return np.array([find(i) for i in range(n)])
+
+
+def _source_weight(source: str) -> float:
+    source = (source or "").lower()
+    for name, weight in SOURCE_WEIGHTS.items():
+        if name in source:
+            return weight
+    return DEFAULT_SOURCE_WEIGHT
+
+
+def _relevance(article: Dict[str, Any], ticker: str, company_name: str = None) -> float:
+    related = [s.strip().upper() for s in (article.get("related") or "").split(",") if s.strip()]
+    score = 0.0
+    if ticker in related:
+        # Articles tagged with many symbols are usually market wraps.
+        score += 0.6 if len(related) <= 3 else 0.3
+
+    headline = article.get("headline") or ""
+    if re.search(rf"\b{re.escape(ticker)}\b", headline):
+        score += 0.4
+    elif company_name and company_name.split()[0].lower() in headline.lower():
+        score += 0.4
+    return min(score, 1.0)
+
+
+def rank_news(
+    articles: List[Dict[str, Any]],
+    ticker: str,
+    company_name: str = None,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """Collapse syndicated near-duplicates and return the top distinct
+    articles by recency, source weight and ticker relevance."""
+    if not articles:
+        return []
+
+    ticker = ticker.upper()
+    texts = [f"{a.get('headline', '')} {a.get('summary', '')}" for a in articles]
+    clusters = duplicate_clusters(minhash_signatures(texts))
+
+    now = time.time()
+    published = np.array([float(a.get("datetime") or 0) for a in articles])
+    age_hours = np.clip(now - published, 0, None) / 3600.0
+    recency = np.power(0.5, age_hours / RECENCY_HALF_LIFE_HOURS)
+    source = np.array([_source_weight(a.get("source")) for a in articles])
+    relevance = np.array([_relevance(a, ticker, company_name) for a in articles])
+    scores = RECENCY_WEIGHT * recency + SOURCE_WEIGHT * source + RELEVANCE_WEIGHT * relevance
+
+    cluster_sizes = np.bincount(clusters, minlength=len(articles))
+
+    # Keep the best-scored article of each cluster, then take the top N.
+    order = np.lexsort((-scores, clusters))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = clusters[order][1:] != clusters[order][:-1]
+    representatives = order[first]
+    representatives = representatives[np.argsort(-scores[representatives], kind="stable")][:limit]
+
+    ranked = []
+    for i in representatives:
+        article = dict(articles[i])
+        article["duplicate_count"] = int(cluster_sizes[clusters[i]] - 1)
+        article["relevance_score"] = round(float(scores[i]), 4)
+        ranked.append(article)
+    return ranked
@@ -0,0 +1,167 @@
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.price_history import get_price_histories
+
+
+TRADING_DAYS = 252
+MAX_MISSING_FRACTION = 0.1
+
+
+def aligned_returns(tickers: List[str], period: str = "2y") -> Tuple[pd.DatetimeIndex, List[str], np.ndarray]:
+    """Daily log returns for the tickers on a common calendar.
+
+    Names missing more than 10% of the shared dates are dropped, short gaps
+    are forward-filled, and rows before every remaining name has traded are
+    removed. Returns (dates, symbols, T x N return matrix).
+    """
+    histories = get_price_histories(tickers, period=period)
+    if not histories:
+        return pd.DatetimeIndex([]), [], np.empty((0, 0))
+
+    closes = pd.concat(
+        {ticker: hist["Close"] for ticker, hist in histories.items()},
+        axis=1
+    ).sort_index()
+    closes.index = closes.index.normalize()
+    closes = closes[~closes.index.duplicated(keep="last")]
+
+    closes = closes.loc[:, closes.isna().mean() <= MAX_MISSING_FRACTION]
+    closes = closes.ffill().dropna()
+
+    prices = closes.to_numpy(dtype=np.float64)
+    returns = np.diff(np.log(prices), axis=0)
+    return closes.index[1:], list(closes.columns), returns
+
+
+def covariance_matrix(returns: np.ndarray) -> np.ndarray:
+    return np.cov(returns, rowvar=False) * TRADING_DAYS
+
+
+def correlation_matrix(cov: np.ndarray) -> np.ndarray:
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    return np.nan_to_num(corr)
+
+
+def betas(returns: np.ndarray, benchmark: np.ndarray) -> np.ndarray:
+    demeaned = returns - returns.mean(axis=0)
+    bench = benchmark - benchmark.mean()
+    return demeaned.T @ bench / (bench @ bench)
+
+
+def rolling_beta(returns: np.ndarray, benchmark: np.ndarray, window: int = 63) -> np.ndarray:
+    """Rolling OLS beta of every column against the benchmark.
+
+    Uses cumulative sums so the whole T x N panel is one pass; rows before
+    the first full window are NaN.
+    """
+    t = len(benchmark)
+    out = np.full(returns.shape, np.nan)
+    if t < window:
+        return out
+
+    def window_sums(values):
+        csum = np.cumsum(values, axis=0)
+        csum = np.concatenate([np.zeros((1,) + values.shape[1:]), csum])
+        return csum[window:] - csum[:-window]
+
+    sum_x = window_sums(benchmark)
+    sum_xx = window_sums(benchmark * benchmark)
+    sum_y = window_sums(returns)
+    sum_xy = window_sums(returns * benchmark[:, None])
+
+    cov_xy = sum_xy - sum_y * sum_x[:, None] / window
+    var_x = sum_xx - sum_x * sum_x / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[window - 1:] = cov_xy / var_x[:, None]
+    return out
+
+
+def risk_contributions(cov: np.ndarray, weights: np.ndarray) -> Dict[str, Any]:
+    """Share of portfolio variance from each name and the diversification ratio."""
+    marginal = cov @ weights
+    variance = float(weights @ marginal)
+    volatility = float(np.sqrt(max(variance, 0.0)))
+    contributions = weights * marginal / variance if variance > 0 else np.zeros_like(weights)
+    weighted_vol = float(weights @ np.sqrt(np.diag(cov)))
+    return {
+        "volatility": volatility,
+        "contributions": contributions,
+        "diversification_ratio": weighted_vol / volatility if volatility > 0 else 0.0,
+    }
+
+
+def analyze_portfolio_context(
+    ticker: str,
+    holdings: List[str],
+    benchmark: str = "SPY",
+    period: str = "2y",
+    window: int = 63
+) -> Dict[str, Any]:
+    """Place one ticker in the context of a set of holdings.
+
+    Holdings are equal-weighted. The candidate is evaluated as an additional
+    equal-weight position so its effect on volatility and diversification
+    can be compared with the current portfolio.
+    """
+    ticker = ticker.upper()
+    benchmark = benchmark.upper()
+    holdings = [h.upper() for h in holdings if h.strip() and h.upper() not in (ticker, benchmark)]
+
+    dates, symbols, returns = aligned_returns([ticker, benchmark] + holdings, period=period)
+    if ticker not in symbols or benchmark not in symbols:
+        return {"error": f"Insufficient price history for {ticker} or benchmark {benchmark}"}
+    if len(returns) < window + 1:
+        return {"error": f"Only {len(returns)} aligned trading days, need more than {window}"}
+
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    held = [h for h in holdings if h in index]
+    bench_returns = returns[:, index[benchmark]]
+
+    asset_cols = [index[ticker]] + [index[h] for h in held]
+    asset_returns = returns[:, asset_cols]
+    cov = covariance_matrix(asset_returns)
+    corr = correlation_matrix(cov)
+    full_betas = betas(asset_returns, bench_returns)
+    rolling = rolling_beta(asset_returns[:, :1], bench_returns, window=window)[:, 0]
+
+    result = {
+        "ticker": ticker,
+        "benchmark": benchmark,
+        "period": period,
+        "start_date": dates[0].strftime("%Y-%m-%d"),
+        "end_date": dates[-1].strftime("%Y-%m-%d"),
+        "trading_days": int(len(returns)),
+        "annualized_volatility": round(float(np.sqrt(cov[0, 0])), 4),
+        "beta": round(float(full_betas[0]), 3),
+        "rolling_beta_window": window,
+        "rolling_beta_latest": round(float(rolling[-1]), 3),
+        "rolling_beta_min": round(float(np.nanmin(rolling)), 3),
+        "rolling_beta_max": round(float(np.nanmax(rolling)), 3),
+        "correlation_with_benchmark": round(float(np.corrcoef(asset_returns[:, 0], bench_returns)[0, 1]), 3),
+        "holdings_used": held,
+        "holdings_missing_data": [h for h in holdings if h not in index],
+    }
+
+    if not held:
+        return result
+
+    correlations = corr[0, 1:]
+    order = np.argsort(-correlations)
+    result["correlation_with_holdings"] = {held[i]: round(float(correlations[i]), 3) for i in order}
+    result["average_correlation_with_holdings"] = round(float(correlations.mean()), 3)
+    result["holding_betas"] = {h: round(float(b), 3) for h, b in zip(held, full_betas[1:])}
+
+    current = risk_contributions(cov[1:, 1:], np.full(len(held), 1.0 / len(held)))
+    proposed = risk_contributions(cov, np.full(len(asset_cols), 1.0 / len(asset_cols)))
+    result["portfolio_volatility_current"] = round(current["volatility"], 4)
+    result["portfolio_volatility_with_ticker"] = round(proposed["volatility"], 4)
+    result["diversification_ratio_current"] = round(current["diversification_ratio"], 3)
+    result["diversification_ratio_with_ticker"] = round(proposed["diversification_ratio"], 3)
+    result["ticker_risk_contribution_pct"] = round(float(proposed["contributions"][0]) * 100, 2)
+
+    return result
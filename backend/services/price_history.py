@@ -0,0 +1,54 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import pandas as pd
+import yfinance as yf
+from dotenv import load_dotenv
+
+from backend.services.cache import TTLCache
+from backend.services.resilience import upstream
+
+load_dotenv()
+
+
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "900"))
+
+_price_cache = TTLCache(ttl=PRICE_CACHE_TTL)
+
+
+def _download(ticker: str, period: str) -> pd.DataFrame:
+    try:
+        hist = upstream.call("yfinance.history", lambda: yf.Ticker(ticker).history(period=period))
+    except Exception as e:
+        print(f"Error fetching price history for {ticker}: {e}")
+        return None
+    return hist if not hist.empty else None
+
+
+def get_price_history(ticker: str, period: str = "6mo") -> pd.DataFrame:
+    """Daily OHLCV bars for a ticker, served from an in-process cache."""
+    ticker = ticker.upper()
+    hist = _price_cache.get_or_load((ticker, period), lambda: _download(ticker, period))
+    return hist if hist is not None else pd.DataFrame()
+
+
+def get_price_histories(tickers: List[str], period: str = "1y", max_workers: int = 8) -> Dict[str, pd.DataFrame]:
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Each download runs in a copy of the caller's context so it stays
+        # bound to the caller's run (deadline, cancellation, token budget).
+        futures = [
+            executor.submit(contextvars.copy_context().run, get_price_history, ticker, period)
+            for ticker in tickers
+        ]
+        frames = [future.result() for future in futures]
+    return {ticker: hist for ticker, hist in zip(tickers, frames) if not hist.empty}
+
+
+def invalidate_price_history(ticker: str = None):
+    if ticker is None:
+        _price_cache.invalidate()
+    else:
+        _price_cache.invalidate(lambda key: key[0] == ticker.upper())
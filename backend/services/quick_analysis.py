@@ -0,0 +1,254 @@
+import contextvars
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage
+
+from backend.services.cancellation import RunCancelled, bind_run, get_run, check_cancelled
+from backend.services.checkpoints import stage_checkpointer
+from backend.services.finnhub import finnhub_client, extract_key_metrics
+from backend.services.finnhub_async import fetch_many_sync
+from backend.services.indicators import indicator_panel
+from backend.services.llm import stream_llm
+from backend.services.metrics import metrics
+from backend.services.price_history import get_price_history
+from backend.services.quote_feed import get_cached_quote
+from backend.services.sentiment import ticker_sentiment
+from backend.services.stage_results import StageResult
+
+load_dotenv()
+
+
+QUICK_FETCH_TIMEOUT_SECONDS = float(os.getenv("QUICK_FETCH_TIMEOUT_SECONDS", "2.5"))
+QUICK_SUMMARY_WORDS = int(os.getenv("QUICK_SUMMARY_WORDS", "300"))
+
+QUICK_METRICS = ["pe_ratio", "eps", "market_cap", "week_52_high", "week_52_low", "beta",
+                 "dividend_yield", "profit_margin", "roe", "debt_to_equity"]
+
+
+def _round(value, digits: int = 2):
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(value) else round(value, digits)
+
+
+def _price_facts(ticker: str) -> Dict[str, Any]:
+    hist = get_price_history(ticker, period="1y")
+    if hist.empty:
+        return {}
+
+    close = hist["Close"].to_numpy(dtype=np.float64)
+    panel = indicator_panel(close[:, None])
+    facts = {field: _round(panel[field][-1, 0]) for field in ("sma_20", "sma_50", "sma_200", "rsi_14")}
+    for label, days in (("change_1m_pct", 21), ("change_3m_pct", 63), ("change_1y_pct", len(close) - 1)):
+        if len(close) > days > 0:
+            facts[label] = _round((close[-1] / close[-1 - days] - 1) * 100)
+    returns = np.diff(close) / close[:-1]
+    facts["volatility_annual_pct"] = _round(returns[-63:].std() * np.sqrt(252) * 100) if len(returns) > 1 else None
+    facts["last_close"] = _round(close[-1])
+    return facts
+
+
+def gather_facts_many(
+    tickers: List[str],
+    company_names: Dict[str, str] = None,
+    timeout: float = QUICK_FETCH_TIMEOUT_SECONDS
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch everything a short summary needs for several tickers at once
+    and reduce each to a compact fact sheet. Finnhub data for all tickers
+    comes from one batched fetch; news and prices are fetched per ticker in
+    parallel. Sources that miss `timeout` are left out rather than holding
+    up the summary. Quotes come from the streamed quote table when it has
+    them."""
+    tickers = [t.upper() for t in tickers]
+    company_names = company_names or {}
+    quotes = {ticker: get_cached_quote(ticker) for ticker in tickers}
+    endpoints = ["profile", "financials", "recommendations", "price_target"]
+    if not all(quotes.values()):
+        endpoints.append("quote")
+
+    # Each run gets a thread per job, so jobs of other runs that outlived
+    # their timeout can never starve it. Workers carry the run's context.
+    executor = ThreadPoolExecutor(max_workers=1 + 2 * len(tickers), thread_name_prefix="quick")
+
+    def submit(fn, *args):
+        return executor.submit(contextvars.copy_context().run, fn, *args)
+
+    try:
+        finnhub_job = submit(fetch_many_sync, tickers, endpoints)
+        jobs = {
+            ticker: {
+                "news": submit(finnhub_client.get_company_news, ticker, 7, 1000, company_names.get(ticker)),
+                "prices": submit(_price_facts, ticker),
+            }
+            for ticker in tickers
+        }
+        wait([finnhub_job] + [f for futures in jobs.values() for f in futures.values()], timeout=timeout)
+    finally:
+        executor.shutdown(wait=False)
+
+    def result(name: str, future) -> Tuple[Any, bool]:
+        if future.done() and future.exception() is None:
+            return future.result(), True
+        metrics.increment("quick_sources_missing", source=name)
+        return None, False
+
+    batch, finnhub_ok = result("finnhub", finnhub_job)
+    facts = {}
+    for ticker in tickers:
+        news, news_ok = result("news", jobs[ticker]["news"])
+        prices, prices_ok = result("prices", jobs[ticker]["prices"])
+        missing = [name for name, ok in (("finnhub", finnhub_ok), ("news", news_ok), ("prices", prices_ok)) if not ok]
+        data = dict((batch or {}).get(ticker, {}))
+        if quotes[ticker]:
+            data["quote"] = quotes[ticker]
+        facts[ticker] = _build_facts(ticker, company_names.get(ticker), data, news or [], prices or {}, missing)
+    return facts
+
+
+def gather_quick_facts(ticker: str, company_name: str = None) -> Dict[str, Any]:
+    return gather_facts_many([ticker], {ticker.upper(): company_name})[ticker.upper()]
+
+
+def _build_facts(ticker: str, company_name: Optional[str], data: Dict[str, Any], news: List[Dict[str, Any]],
+                 prices: Dict[str, Any], missing: List[str]) -> Dict[str, Any]:
+    profile = data.get("profile") or {}
+    quote = data.get("quote") or {}
+    metric = (data.get("financials") or {}).get("metric") or {}
+    recommendations = data.get("recommendations") or []
+    target = data.get("price_target") or {}
+
+    facts = {
+        "ticker": ticker,
+        "company": profile.get("name") or company_name or ticker,
+        "industry": profile.get("finnhubIndustry"),
+        "price": _round(quote.get("c")),
+        "change_today_pct": _round(quote.get("dp")),
+        "fundamentals": {k: _round(v) for k, v in extract_key_metrics(metric, default=None).items() if k in QUICK_METRICS},
+        "technicals": prices,
+    }
+    if recommendations:
+        latest = recommendations[0]
+        facts["analysts"] = {k: latest.get(k) for k in ("period", "strongBuy", "buy", "hold", "sell", "strongSell")}
+    if target.get("targetMean"):
+        facts["price_target"] = {k: _round(target.get(k)) for k in ("targetMean", "targetHigh", "targetLow")}
+    if news:
+        sentiment = ticker_sentiment(ticker, news, top=2)
+        facts["news"] = {
+            "articles": sentiment.get("articles"),
+            "sentiment_score": sentiment.get("score"),
+            "sentiment_trend": sentiment.get("trend", {}).get("direction"),
+            "headlines": [a.get("headline", "") for a in news[:3]],
+        }
+    if missing:
+        facts["unavailable"] = missing
+    return facts
+
+
+def quick_prompt(facts: Dict[str, Any]) -> str:
+    return f"""You are an equity analyst giving a fast take on {facts['company']} ({facts['ticker']}).
+
+Write about {QUICK_SUMMARY_WORDS} words in markdown using only the facts below:
+## Bottom Line - one or two sentences with a clear stance (bullish / neutral / bearish)
+## Fundamentals & Valuation
+## Price Action & Technicals
+## Sentiment & Analysts
+## Key Risks
+
+Cite the numbers you rely on. Skip any section whose facts are missing instead of guessing.
+
+FACTS:
+{json.dumps(facts, separators=(',', ':'), default=str)}"""
+
+
+def _facts_markdown(facts: Dict[str, Any]) -> str:
+    lines = [f"**{facts['company']} ({facts['ticker']})** - {facts.get('industry') or 'n/a'}"]
+    if facts.get("price") is not None:
+        lines.append(f"- Price: ${facts['price']} ({facts.get('change_today_pct')}% today)")
+    for section in ("fundamentals", "technicals"):
+        values = {k: v for k, v in (facts.get(section) or {}).items() if v is not None}
+        if values:
+            lines.append(f"- {section.title()}: " + ", ".join(f"{k} {v}" for k, v in values.items()))
+    if facts.get("news"):
+        news = facts["news"]
+        lines.append(f"- News: {news['articles']} articles, sentiment {news['sentiment_score']} ({news['sentiment_trend']})")
+    return "\n".join(lines)
+
+
+def run_quick_analysis(
+    ticker: str,
+    company_name: str = None,
+    holdings: List[str] = None,
+    run_id: str = None,
+    on_token: Optional[Callable[[str], None]] = None
+) -> dict:
+    """Single-pass analysis: parallel data fetch, local indicators and
+    sentiment, then one streamed LLM call for a short summary.
+
+    Returns the same shape as run_financial_analysis. Holdings are not used;
+    portfolio context needs the full analyst pipeline.
+    """
+    state = {
+        "ticker": ticker.upper(),
+        "mode": "quick",
+        "company_name": company_name or ticker.upper(),
+        "holdings": [h.upper() for h in holdings or []],
+        "run_id": run_id,
+        "current_stage": "report",
+        "completed_stages": [],
+        "stage_results": {},
+        "research_data": {},
+        "analysis_data": {},
+        "report_data": {},
+        "status": "in_progress",
+        "error": "",
+    }
+
+    with bind_run(get_run(run_id)):
+        start = time.perf_counter()
+        try:
+            check_cancelled()
+            facts = gather_quick_facts(ticker, company_name)
+            fetched = time.perf_counter()
+            metrics.observe("quick_fetch_seconds", fetched - start)
+
+            first_token = []
+
+            def forward(text: str):
+                if not first_token:
+                    first_token.append(time.perf_counter())
+                    metrics.observe("quick_first_token_seconds", first_token[0] - start)
+                if on_token is not None:
+                    on_token(text)
+
+            response = stream_llm("quick", "summary", [HumanMessage(content=quick_prompt(facts))],
+                                  temperature=0.3, on_token=forward)
+            summary = response.content
+
+            state["analysis_data"] = {"summary": _facts_markdown(facts), "facts": facts}
+            state["report_data"] = {"report_text": summary}
+            state["stage_results"] = {
+                "report": StageResult.from_messages("report", [response], summary, time.perf_counter() - fetched)
+            }
+            state["completed_stages"] = ["analysis", "report"]
+            state["current_stage"] = "completed"
+            state["status"] = "completed"
+        except RunCancelled as e:
+            state["error"] = f"Quick analysis cancelled: {e.reason}"
+            state["status"] = "cancelled"
+        except Exception as e:
+            state["error"] = f"Quick analysis error: {str(e)}"
+            state["status"] = "error"
+
+    if run_id:
+        stage_checkpointer.save(run_id, state)
+    return state
@@ -0,0 +1,512 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Any, List, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+QUOTE_FEED_LOCK_PATH = os.getenv("QUOTE_FEED_LOCK_PATH", "data/quote_feed.lock")
+# Trading day boundaries follow the listing exchange's local midnight.
+QUOTE_FEED_SESSION_TZ = ZoneInfo(os.getenv("QUOTE_FEED_SESSION_TZ", "America/New_York"))
+QUOTE_FEED_TAKEOVER_SECONDS = float(os.getenv("QUOTE_FEED_TAKEOVER_SECONDS", "15"))
+
+# Fixed row layout shared by every worker process. `seq` is a per-row
+# sequence lock: the writer makes it odd while a row is being updated and
+# even once the row is consistent again, so readers never see torn rows.
+QUOTE_DTYPE = np.dtype([
+    ("seq", np.uint64),
+    ("price", np.float64),
+    ("change", np.float64),
+    ("percent_change", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("open", np.float64),
+    ("previous_close", np.float64),
+    ("timestamp", np.int64),
+    ("updated", np.float64),
+])
+
+# Block header, ahead of the rows. `magic` is written last, once the owner
+# has laid the table out for the symbol list `symbols_hash` identifies, and
+# cleared before the block is unlinked so attached readers move on.
+HEADER_DTYPE = np.dtype([
+    ("magic", np.uint64),
+    ("symbols_hash", np.uint64),
+    ("rows", np.uint64),
+    ("owner_pid", np.int64),
+])
+_MAGIC = 0x51554F5445544231  # "QUOTETB1"
+
+
+def parse_symbols(raw: str) -> List[str]:
+    return sorted({s.strip().upper() for s in raw.split(",") if s.strip()})
+
+
+def _symbols_hash(symbols: List[str]) -> int:
+    digest = hashlib.blake2b("\n".join(symbols).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def session_start(timestamp: float) -> float:
+    """Start of the trading day containing `timestamp`, as a Unix time."""
+    day = datetime.fromtimestamp(timestamp, QUOTE_FEED_SESSION_TZ).date()
+    return datetime(day.year, day.month, day.day, tzinfo=QUOTE_FEED_SESSION_TZ).timestamp()
+
+
+class QuoteTable:
+    """Last-quote table kept in a named shared memory block.
+
+    Every process derives the same symbol -> row mapping from the sorted
+    symbol list, so a lookup is a dict hit plus one row read. The header
+    carries a hash of that list, and processes configured with another
+    list refuse to attach. The owner (the one process writing quotes) is
+    whoever holds the lock file; the lock dies with its holder, so a
+    standby process can take over a block left behind by a crash. Readers
+    re-attach when the header names a new owner or the block is retired.
+    """
+
+    def __init__(self, name: str, symbols: List[str], lock_path: str = QUOTE_FEED_LOCK_PATH):
+        self.name = name
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.symbols_hash = _symbols_hash(self.symbols)
+        self.size = HEADER_DTYPE.itemsize + QUOTE_DTYPE.itemsize * max(len(self.symbols), 1)
+        self.lock_path = lock_path
+        self.owner = False
+        self._lock_file = None
+        self.shm = self.header = self.rows = None
+        # Owner the attached block was last seen with, and the lock readers
+        # take to swap blocks.
+        self._owner_pid = 0
+        self._attach_lock = threading.Lock()
+        # Start of the trading day trades currently fall in, and its end.
+        self._session = (0.0, 0.0)
+
+        if self._acquire_owner_lock():
+            self._open_as_owner()
+        else:
+            self._attach()
+
+    def _acquire_owner_lock(self) -> bool:
+        import fcntl
+
+        directory = os.path.dirname(self.lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock_file = open(self.lock_path, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _bind(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+        self.rows = np.ndarray(
+            (len(self.symbols),), dtype=QUOTE_DTYPE, buffer=shm.buf, offset=HEADER_DTYPE.itemsize
+        )
+        self._owner_pid = int(self.header["owner_pid"])
+
+    def _release(self):
+        # The views must go before the mapping can be closed.
+        shm, self.shm = self.shm, None
+        self.header = self.rows = None
+        if shm is None:
+            return
+        try:
+            shm.close()
+        except BufferError:
+            # A concurrent reader still holds a row; the mapping is freed
+            # once that view is gone.
+            pass
+
+    @staticmethod
+    def _retire(shm: shared_memory.SharedMemory):
+        # Clearing the magic tells attached readers the block is going away.
+        shm.buf[:8] = bytes(8)
+
+    def _open_as_owner(self):
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=self.size)
+        except FileExistsError:
+            # Left behind by an owner that died: nobody else holds the lock.
+            shm = shared_memory.SharedMemory(name=self.name)
+            if shm.size < self.size:
+                self._retire(shm)
+                shm.unlink()
+                shm.close()
+                shm = shared_memory.SharedMemory(name=self.name, create=True, size=self.size)
+        self._bind(shm)
+
+        keep_rows = int(self.header["magic"]) == _MAGIC and int(self.header["symbols_hash"]) == self.symbols_hash
+        if not keep_rows:
+            self.header["magic"] = 0
+            self.rows[:] = np.zeros(len(self.symbols), dtype=QUOTE_DTYPE)
+            self.header["symbols_hash"] = self.symbols_hash
+            self.header["rows"] = len(self.symbols)
+        self.header["owner_pid"] = os.getpid()
+        self._owner_pid = os.getpid()
+        self.header["magic"] = _MAGIC
+        self.owner = True
+
+    def _attach(self, wait: float = 5.0):
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                shm = shared_memory.SharedMemory(name=self.name)
+                break
+            except FileNotFoundError:
+                # The owner holds the lock but has not created the block yet.
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        # Attaching processes must not unlink the block when they exit.
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+        if shm.size < self.size:
+            shm.close()
+            raise ValueError(
+                f"Shared quote table '{self.name}' has {shm.size} bytes, expected {self.size}; "
+                "QUOTE_FEED_SYMBOLS differs between processes"
+            )
+        self._bind(shm)
+        while int(self.header["magic"]) != _MAGIC and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if int(self.header["symbols_hash"]) != self.symbols_hash:
+            raise ValueError(
+                f"Shared quote table '{self.name}' holds another symbol list; "
+                "QUOTE_FEED_SYMBOLS differs between processes"
+            )
+
+    def take_over(self) -> bool:
+        """Become the owner if the current one is gone. Returns True if this
+        process owns the table afterwards."""
+        if self.owner:
+            return True
+        if not self._acquire_owner_lock():
+            return False
+        # Drop the reader mapping first; the block may have been unlinked by
+        # an owner that shut down cleanly, and a fresh one created instead.
+        with self._attach_lock:
+            self._release()
+            self._open_as_owner()
+        print(f"Took over shared quote table '{self.name}'")
+        return True
+
+    def _attached(self) -> bool:
+        header = self.header
+        return header is not None and int(header["magic"]) == _MAGIC and int(header["owner_pid"]) == self._owner_pid
+
+    def _reattach(self) -> bool:
+        """Re-open the block by name after its owner retired it or another
+        process took it over. Returns False while no usable block exists."""
+        with self._attach_lock:
+            if self._attached():
+                return True
+            self._release()
+            try:
+                self._attach(wait=0)
+            except (FileNotFoundError, ValueError):
+                self._release()
+                return False
+            return self._attached()
+
+    def get(self, ticker: str, max_age: float = None) -> Optional[Dict[str, Any]]:
+        i = self.index.get(ticker.upper())
+        if i is None:
+            return None
+        if not self.owner and not self._attached() and not self._reattach():
+            return None
+
+        rows, header = self.rows, self.header
+        if rows is None or int(header["symbols_hash"]) != self.symbols_hash:
+            return None
+
+        row = rows[i]
+        for _ in range(100):
+            seq = int(row["seq"])
+            if seq % 2:
+                continue
+            snapshot = row.copy()
+            if int(row["seq"]) == seq:
+                break
+        else:
+            return None
+
+        if snapshot["seq"] == 0:
+            return None
+        if max_age is not None and time.time() - float(snapshot["updated"]) > max_age:
+            return None
+
+        return {
+            "c": float(snapshot["price"]),
+            "d": float(snapshot["change"]),
+            "dp": float(snapshot["percent_change"]),
+            "h": float(snapshot["high"]),
+            "l": float(snapshot["low"]),
+            "o": float(snapshot["open"]),
+            "pc": float(snapshot["previous_close"]),
+            "t": int(snapshot["timestamp"]),
+        }
+
+    def seed(self, ticker: str, quote: Dict[str, Any]):
+        """Load a REST quote into the row. A quote older than the row's last
+        trade only corrects the session fields: open, previous close, range."""
+        i = self.index.get(ticker.upper())
+        if i is None or not quote:
+            return
+
+        row = self.rows[i:i + 1]
+        quote_timestamp = int(quote.get("t") or 0)
+        last_timestamp = int(row["timestamp"][0])
+
+        row["seq"] += 1
+        if quote_timestamp >= last_timestamp:
+            row["price"] = quote.get("c", 0)
+            row["change"] = quote.get("d", 0) or 0
+            row["percent_change"] = quote.get("dp", 0) or 0
+            row["high"] = quote.get("h", 0)
+            row["low"] = quote.get("l", 0)
+            row["open"] = quote.get("o", 0)
+            row["previous_close"] = quote.get("pc", 0)
+            row["timestamp"] = quote_timestamp
+        else:
+            if quote_timestamp < self._session_of(last_timestamp):
+                # REST has not seen this session yet; its last price is the close.
+                previous_close = quote.get("c", 0) or 0
+            else:
+                previous_close = quote.get("pc", 0) or 0
+                row["open"] = quote.get("o", 0) or row["open"]
+                high, low = float(row["high"][0]), float(row["low"][0])
+                row["high"] = max(high, quote.get("h", 0) or 0)
+                if quote.get("l"):
+                    row["low"] = min(low, quote["l"]) if low else quote["l"]
+            if previous_close:
+                price = float(row["price"][0])
+                row["previous_close"] = previous_close
+                row["change"] = price - previous_close
+                row["percent_change"] = (price - previous_close) / previous_close * 100
+        row["updated"] = time.time()
+        row["seq"] += 1
+
+    def _session_of(self, timestamp: float) -> float:
+        start, end = self._session
+        if not start <= timestamp < end:
+            start = session_start(timestamp)
+            # Next local midnight; 26h covers DST changes.
+            end = session_start(start + 26 * 3600)
+            self._session = (start, end)
+        return start
+
+    def apply_trade(self, ticker: str, price: float, timestamp_ms: int) -> bool:
+        """Fold one trade into the row. A trade from a later trading day
+        than the row's last quote first rolls the row over: the last price
+        becomes the previous close and the trade opens the new session.
+        Returns True when the row rolled over."""
+        i = self.index.get(ticker.upper())
+        if i is None:
+            return False
+
+        row = self.rows[i:i + 1]
+        timestamp = int(timestamp_ms // 1000)
+        last_timestamp = int(row["timestamp"][0])
+        rolled = bool(last_timestamp) and last_timestamp < self._session_of(timestamp) <= timestamp
+
+        if rolled:
+            previous_close = float(row["price"][0])
+            high = low = 0.0
+        else:
+            previous_close = float(row["previous_close"][0])
+            high = float(row["high"][0])
+            low = float(row["low"][0])
+
+        row["seq"] += 1
+        if rolled:
+            row["previous_close"] = previous_close
+            row["open"] = price
+        row["price"] = price
+        row["high"] = max(high, price) if high else price
+        row["low"] = min(low, price) if low else price
+        if previous_close:
+            row["change"] = price - previous_close
+            row["percent_change"] = (price - previous_close) / previous_close * 100
+        row["timestamp"] = timestamp
+        row["updated"] = time.time()
+        row["seq"] += 1
+        return rolled
+
+    def close(self):
+        shm = self.shm
+        if self.owner and shm is not None:
+            self._retire(shm)
+        self._release()
+        if self.owner and shm is not None:
+            shm.unlink()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+class QuoteIngester(threading.Thread):
+    """Background thread that feeds the quote table from a trade websocket.
+
+    Speaks the Finnhub websocket protocol, so any local stand-in that sends
+    `{"type": "trade", "data": [{"s", "p", "t"}]}` frames can replace it.
+    """
+
+    def __init__(self, table: QuoteTable, url: str, seed_quote=None):
+        super().__init__(name="quote-ingester", daemon=True)
+        self.table = table
+        self.url = url
+        self.seed_quote = seed_quote
+        self._stop_event = threading.Event()
+        self._connection = None
+        # Symbols that rolled into a new session and await a REST reseed.
+        self._reseed = queue.Queue()
+
+    def run(self):
+        if self.seed_quote:
+            for symbol in self.table.symbols:
+                self.table.seed(symbol, self.seed_quote(symbol))
+            threading.Thread(target=self._reseed_loop, name="quote-reseed", daemon=True).start()
+
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                self._consume()
+                backoff = 1.0
+            except Exception as e:
+                print(f"Quote feed error: {e}")
+            if self._stop_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, 60.0)
+
+    def _consume(self):
+        import websocket
+
+        self._connection = websocket.create_connection(self.url, timeout=30)
+        try:
+            for symbol in self.table.symbols:
+                self._connection.send(json.dumps({"type": "subscribe", "symbol": symbol}))
+            print(f"Quote feed subscribed to {len(self.table.symbols)} symbols")
+
+            while not self._stop_event.is_set():
+                try:
+                    frame = self._connection.recv()
+                except websocket.WebSocketTimeoutException:
+                    continue
+                if not frame:
+                    return
+                self.handle_message(frame)
+        finally:
+            self._connection.close()
+            self._connection = None
+
+    def handle_message(self, frame: str):
+        message = json.loads(frame)
+        if message.get("type") != "trade":
+            return
+
+        for trade in message.get("data") or []:
+            if self.table.apply_trade(trade["s"], float(trade["p"]), int(trade.get("t", 0))) and self.seed_quote:
+                self._reseed.put(trade["s"])
+
+    def _reseed_loop(self):
+        # REST calls stay off the websocket thread.
+        while True:
+            symbol = self._reseed.get()
+            if symbol is None or self._stop_event.is_set():
+                return
+            try:
+                self.table.seed(symbol, self.seed_quote(symbol))
+            except Exception as e:
+                print(f"Error reseeding quote for {symbol}: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+        self._reseed.put(None)
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+
+
+def create_quote_table() -> Optional[QuoteTable]:
+    symbols = parse_symbols(os.getenv("QUOTE_FEED_SYMBOLS", ""))
+    if not symbols:
+        return None
+
+    name = os.getenv("QUOTE_FEED_SHM_NAME", "financial_agent_quotes")
+    try:
+        return QuoteTable(name, symbols)
+    except Exception as e:
+        print(f"Error opening shared quote table: {e}")
+        return None
+
+
+QUOTE_FEED_MAX_AGE = float(os.getenv("QUOTE_FEED_MAX_AGE", "120"))
+
+quote_table = create_quote_table()
+_ingester = None
+_standby_stop = threading.Event()
+
+
+def _start_ingester():
+    global _ingester
+    from backend.services.finnhub import finnhub_client
+
+    url = os.getenv("QUOTE_FEED_URL") or f"wss://ws.finnhub.io?token={os.getenv('FINNHUB_API_KEY', '')}"
+    _ingester = QuoteIngester(quote_table, url, seed_quote=finnhub_client.get_quote)
+    _ingester.start()
+
+
+def _standby():
+    # Non-owners wait for the owner's lock to be released, then take over.
+    while not _standby_stop.wait(QUOTE_FEED_TAKEOVER_SECONDS):
+        try:
+            if quote_table.take_over():
+                _start_ingester()
+                return
+        except Exception as e:
+            print(f"Error taking over shared quote table: {e}")
+
+
+def start_quote_feed():
+    if quote_table is None or _ingester is not None:
+        return
+    _standby_stop.clear()
+    if quote_table.owner:
+        _start_ingester()
+    else:
+        threading.Thread(target=_standby, name="quote-feed-standby", daemon=True).start()
+
+
+def stop_quote_feed():
+    global _ingester, quote_table
+    _standby_stop.set()
+    if _ingester is not None:
+        _ingester.stop()
+        _ingester = None
+    if quote_table is not None:
+        quote_table.close()
+        quote_table = None
+
+
+def get_cached_quote(ticker: str) -> Optional[Dict[str, Any]]:
+    if quote_table is None:
+        return None
+    return quote_table.get(ticker, max_age=QUOTE_FEED_MAX_AGE)
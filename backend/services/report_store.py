@@ -0,0 +1,82 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+REPORT_STORE_PATH = os.getenv("REPORT_STORE_PATH", "data/reports.sqlite3")
+REPORT_MAX_AGE_SECONDS = float(os.getenv("REPORT_MAX_AGE_SECONDS", "3600"))
+
+
+class ReportStore:
+    """Latest completed report per ticker, shared by every worker process
+    through a small sqlite file."""
+
+    def __init__(self, path: str = REPORT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "ticker TEXT PRIMARY KEY, generated_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save(self, ticker: str, payload: Dict[str, Any], generated_at: float = None):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reports (ticker, generated_at, payload) VALUES (?, ?, ?)",
+                (ticker.upper(), generated_at or time.time(), json.dumps(payload, default=str))
+            )
+
+    def get(self, ticker: str, max_age: float = REPORT_MAX_AGE_SECONDS) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT generated_at, payload FROM reports WHERE ticker = ?",
+                (ticker.upper(),)
+            ).fetchone()
+        if row is None or time.time() - row[0] > max_age:
+            return None
+        return json.loads(row[1])
+
+    def age(self, ticker: str) -> Optional[float]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT generated_at FROM reports WHERE ticker = ?",
+                (ticker.upper(),)
+            ).fetchone()
+        return time.time() - row[0] if row else None
+
+    def invalidate(self, ticker: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM reports WHERE ticker = ?", (ticker.upper(),))
+
+    def invalidate_matching(self, match: Callable[[str], bool], before: float = None) -> int:
+        """Delete reports whose key satisfies `match`, optionally only those
+        generated before `before`. Returns how many were removed."""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute("SELECT ticker, generated_at FROM reports").fetchall()
+            keys = [(key,) for key, generated_at in rows if match(key) and (before is None or generated_at < before)]
+            conn.executemany("DELETE FROM reports WHERE ticker = ?", keys)
+        return len(keys)
+
+
+report_store = ReportStore()
@@ -1,6 +1,7 @@
 from langchain.tools import tool
 from typing import Dict, Any, List
 from backend.services.finnhub import finnhub_client
+from backend.services.sentiment import ticker_sentiment
 import json
 
 
@@ -28,7 +29,8 @@ def get_company_news(ticker: str) -> str:
                 "summary": article.get("summary", ""),
                 "source": article.get("source", ""),
                 "url": article.get("url", ""),
-                "datetime": article.get("datetime", "")
+                "datetime": article.get("datetime", ""),
+                "duplicate_count": article.get("duplicate_count", 0)
             })
         
         return json.dumps({"news": formatted_news}, indent=2)
@@ -36,6 +38,30 @@ def get_company_news(ticker: str) -> str:
         return json.dumps({"error": str(e), "news": []})
 
 
+@tool
+def get_news_sentiment(ticker: str) -> str:
+    """
+    Score sentiment across all recent news for a stock with a finance lexicon.
+    
+    Args:
+        ticker: Stock ticker symbol
+        
+    Returns:
+        JSON string with the overall score (-1 to 1), counts of positive,
+        negative and neutral articles, the recent vs. baseline trend, daily
+        scores, and the most positive and negative headlines
+    """
+    try:
+        news = finnhub_client.get_company_news(ticker, days=7, limit=1000)
+        
+        if not news:
+            return json.dumps({"error": "No news found", "ticker": ticker.upper()})
+        
+        return json.dumps(ticker_sentiment(ticker, news), indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
 @tool
 def get_analyst_recommendations(ticker: str) -> str:
     """
@@ -116,6 +142,7 @@ def get_company_profile(ticker: str) -> str:
 
 research_tools = [
     get_company_news,
+    get_news_sentiment,
     get_analyst_recommendations,
     get_price_target_consensus,
     get_company_profile
@@ -0,0 +1,248 @@
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+from backend.services.cancellation import check_cancelled, remaining_timeout, sleep_unless_cancelled
+from backend.services.metrics import metrics
+
+load_dotenv()
+
+
+UPSTREAM_WORKERS = int(os.getenv("UPSTREAM_WORKERS", "32"))
+UPSTREAM_ATTEMPTS = int(os.getenv("UPSTREAM_ATTEMPTS", "3"))
+UPSTREAM_BACKOFF_SECONDS = float(os.getenv("UPSTREAM_BACKOFF_SECONDS", "0.5"))
+UPSTREAM_HEDGING = os.getenv("UPSTREAM_HEDGING", "on").lower() not in ("off", "false", "0")
+HEDGE_MIN_SAMPLES = int(os.getenv("UPSTREAM_HEDGE_MIN_SAMPLES", "20"))
+# Calls one upstream (finnhub, yfinance) may have running on the pool,
+# counting attempts the caller already gave up on.
+UPSTREAM_MAX_IN_FLIGHT = int(os.getenv("UPSTREAM_MAX_IN_FLIGHT", str(max(UPSTREAM_WORKERS // 2, 1))))
+
+T = TypeVar("T")
+
+
+class UpstreamTimeout(TimeoutError):
+    def __init__(self, endpoint: str, timeout: float):
+        super().__init__(f"{endpoint} did not answer within {timeout:.1f}s")
+        self.endpoint = endpoint
+
+
+class UpstreamSaturated(RuntimeError):
+    def __init__(self, endpoint: str):
+        super().__init__(f"Too many {endpoint.split('.', 1)[0]} calls still running; not starting {endpoint}")
+        self.endpoint = endpoint
+
+
+class EmptyResponse(Exception):
+    def __init__(self, endpoint: str):
+        super().__init__(f"{endpoint} returned an empty result")
+        self.endpoint = endpoint
+
+
+class CallPolicy:
+    __slots__ = ("timeout", "attempts", "hedge", "retry_empty")
+
+    def __init__(self, timeout: float, attempts: int = UPSTREAM_ATTEMPTS, hedge: bool = False,
+                 retry_empty: bool = False):
+        self.timeout = timeout
+        self.attempts = attempts
+        self.hedge = hedge
+        # Treat an empty result as a transient failure (yfinance reports
+        # errors as an empty DataFrame).
+        self.retry_empty = retry_empty
+
+
+# Per-endpoint timeouts. Hedging is limited to the cheap reads sitting on
+# the agents' critical path; duplicating every call would double upstream
+# rate-limit usage. Override a timeout with UPSTREAM_TIMEOUT_<ENDPOINT>,
+# e.g. UPSTREAM_TIMEOUT_FINNHUB_QUOTE=2.
+DEFAULT_POLICIES = {
+    "finnhub.quote": CallPolicy(timeout=3, hedge=True),
+    "finnhub.profile": CallPolicy(timeout=8, hedge=True),
+    "finnhub.news": CallPolicy(timeout=10),
+    "finnhub.financials": CallPolicy(timeout=10, hedge=True),
+    "finnhub.recommendations": CallPolicy(timeout=8),
+    "finnhub.price_target": CallPolicy(timeout=8),
+    "finnhub.symbols": CallPolicy(timeout=30),
+    "finnhub.earnings": CallPolicy(timeout=20),
+    "yfinance.history": CallPolicy(timeout=20, hedge=True, retry_empty=True),
+}
+DEFAULT_POLICY = CallPolicy(timeout=10)
+
+
+def _env_timeout(endpoint: str) -> Optional[float]:
+    value = os.getenv("UPSTREAM_TIMEOUT_" + endpoint.upper().replace(".", "_"))
+    return float(value) if value else None
+
+
+def _is_empty(result) -> bool:
+    empty = getattr(result, "empty", None)
+    return bool(empty) if empty is not None else not result
+
+
+def is_transient(error: Exception) -> bool:
+    # Timeouts and connection failures (requests' exceptions are OSErrors),
+    # plus rate limiting and server-side errors from the Finnhub client.
+    if isinstance(error, (OSError, EmptyResponse)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+def is_retryable_failure(error: Exception) -> bool:
+    """Whether rerunning the work that raised `error` may succeed: timeouts,
+    rate limits and 5xx from any upstream, including the LLM API. Auth,
+    configuration and bad-input errors fail the same way again."""
+    import httpx
+
+    try:
+        from groq import APIConnectionError as LLMConnectionError
+    except ImportError:
+        LLMConnectionError = ()
+
+    return is_transient(error) or isinstance(
+        error, (UpstreamSaturated, httpx.TransportError, LLMConnectionError)
+    )
+
+
+class ResilientCaller:
+    """Runs blocking upstream calls with a timeout, retries and hedging.
+
+    Each attempt runs on a shared worker pool so the caller can stop
+    waiting at the endpoint's timeout (or the run's deadline, whichever is
+    sooner). Transient failures are retried with jittered exponential
+    backoff. For hedged endpoints, once enough latencies have been seen, a
+    duplicate request is fired if the first has not answered by the
+    endpoint's p95, and whichever answers first wins.
+
+    Abandoned attempts keep their thread until the upstream answers, so
+    each upstream may only hold `max_in_flight` pool threads: further
+    attempts wait for one to free up (within their timeout), and hedges
+    are skipped when none is free or the pool is fully busy.
+    """
+
+    def __init__(self, policies: Dict[str, CallPolicy] = None, max_workers: int = UPSTREAM_WORKERS,
+                 max_in_flight: int = UPSTREAM_MAX_IN_FLIGHT):
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upstream")
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
+        self._running = 0
+
+    def policy(self, endpoint: str) -> CallPolicy:
+        policy = self.policies.get(endpoint, DEFAULT_POLICY)
+        timeout = _env_timeout(endpoint)
+        if timeout is not None:
+            policy = CallPolicy(timeout=timeout, attempts=policy.attempts, hedge=policy.hedge,
+                                retry_empty=policy.retry_empty)
+        return policy
+
+    def _hedge_delay(self, endpoint: str, policy: CallPolicy) -> Optional[float]:
+        if not (UPSTREAM_HEDGING and policy.hedge):
+            return None
+        if metrics.samples("upstream_latency_seconds", endpoint=endpoint) < HEDGE_MIN_SAMPLES:
+            return None
+        return metrics.percentile("upstream_latency_seconds", 0.95, endpoint=endpoint)
+
+    def _upstream_slots(self, endpoint: str) -> threading.BoundedSemaphore:
+        upstream_name = endpoint.split(".", 1)[0]
+        with self._slots_lock:
+            slots = self._slots.get(upstream_name)
+            if slots is None:
+                slots = self._slots[upstream_name] = threading.BoundedSemaphore(self.max_in_flight)
+            return slots
+
+    def _release(self, slots: threading.BoundedSemaphore):
+        with self._slots_lock:
+            self._running -= 1
+        slots.release()
+
+    def _submit(self, endpoint: str, fn: Callable[[], T], wait_for_slot: float = 0):
+        """Start `fn` on the pool, holding one of its upstream's slots until
+        it returns, however long after the caller stopped waiting. None if
+        no slot frees up within `wait_for_slot` seconds."""
+        slots = self._upstream_slots(endpoint)
+        if not slots.acquire(timeout=wait_for_slot):
+            return None
+        with self._slots_lock:
+            self._running += 1
+        future = self._executor.submit(contextvars.copy_context().run, fn)
+        future.add_done_callback(lambda _: self._release(slots))
+        return future
+
+    def _attempt(self, endpoint: str, policy: CallPolicy, fn: Callable[[], T], timeout: float) -> T:
+        deadline = time.monotonic() + timeout
+        primary = self._submit(endpoint, fn, wait_for_slot=timeout)
+        if primary is None:
+            metrics.increment("upstream_saturated", endpoint=endpoint)
+            raise UpstreamSaturated(endpoint)
+        pending = {primary}
+        hedge_delay = self._hedge_delay(endpoint, policy)
+        error = None
+
+        if hedge_delay is not None and hedge_delay < deadline - time.monotonic():
+            done, _ = wait(pending, timeout=hedge_delay)
+            if not done:
+                hedge = None if self._running >= self.max_workers else self._submit(endpoint, fn)
+                if hedge is None:
+                    metrics.increment("upstream_hedges_skipped", endpoint=endpoint)
+                else:
+                    metrics.increment("upstream_hedges", endpoint=endpoint)
+                    pending.add(hedge)
+
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                elif policy.retry_empty and _is_empty(future.result()):
+                    error = error or EmptyResponse(endpoint)
+                else:
+                    if future is not primary:
+                        metrics.increment("upstream_hedge_wins", endpoint=endpoint)
+                    return future.result()
+
+        # Stragglers keep running on the pool, holding their upstream's
+        # slots; their results are dropped.
+        if error is not None and not pending:
+            raise error
+        raise UpstreamTimeout(endpoint, timeout)
+
+    def call(self, endpoint: str, fn: Callable[[], T]) -> T:
+        policy = self.policy(endpoint)
+        for attempt in range(1, policy.attempts + 1):
+            check_cancelled()
+            timeout = remaining_timeout(policy.timeout)
+            start = time.perf_counter()
+            try:
+                result = self._attempt(endpoint, policy, fn, max(timeout, 0.1))
+            except Exception as e:
+                transient = is_transient(e)
+                if isinstance(e, TimeoutError):
+                    outcome = "timeout"
+                elif isinstance(e, EmptyResponse):
+                    outcome = "empty"
+                else:
+                    outcome = "transient_error" if transient else "error"
+                metrics.increment("upstream_calls", endpoint=endpoint, outcome=outcome)
+                if not transient or attempt == policy.attempts:
+                    raise
+                metrics.increment("upstream_retries", endpoint=endpoint)
+                sleep_unless_cancelled(UPSTREAM_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+                continue
+
+            metrics.increment("upstream_calls", endpoint=endpoint, outcome="ok")
+            metrics.observe("upstream_latency_seconds", time.perf_counter() - start, endpoint=endpoint)
+            return result
+
+
+upstream = ResilientCaller()
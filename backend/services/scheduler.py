@@ -0,0 +1,372 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from backend.services.metrics import metrics
+
+load_dotenv()
+
+
+SCHEDULER_CONFIG = os.getenv("SCHEDULER_CONFIG", "")
+SCHEDULER_LOCK_PATH = os.getenv("SCHEDULER_LOCK_PATH", "data/scheduler.lock")
+FINNHUB_RATE_PER_MINUTE = float(os.getenv("SCHEDULER_FINNHUB_RATE_PER_MINUTE", "30"))
+REPORT_RATE_PER_MINUTE = float(os.getenv("SCHEDULER_REPORT_RATE_PER_MINUTE", "2"))
+
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+# Days per month in a common year; a schedule must fire in every year.
+_MONTH_DAYS = {1: 31, 2: 28, 3: 31, 4: 30, 5: 31, 6: 30, 7: 31, 8: 31, 9: 30, 10: 31, 11: 30, 12: 31}
+
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Supports `*`, lists, ranges and steps (`*/15`, `1-5`, `0,30`, `9-16/2`).
+    Day-of-week is 0-6 with 0 = Sunday (7 is accepted as Sunday too).
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, _FIELD_RANGES)
+        )
+        self.weekdays = {day % 7 for day in self.weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+        # Only day-of-month alone can rule out every date (e.g. `30 2`, or
+        # `29 2`, which fires in leap years only); next_after looks one year ahead.
+        if not self._any_day and self._any_weekday and not any(
+            day <= _MONTH_DAYS[month] for month in self.months for day in self.days
+        ):
+            raise ValueError(f"Cron expression does not fire every year: '{expression}'")
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(v) for v in part.split("-", 1))
+            else:
+                start = end = int(part)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def matches(self, moment: datetime) -> bool:
+        if moment.minute not in self.minutes or moment.hour not in self.hours or moment.month not in self.months:
+            return False
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        # Standard cron: when both day fields are restricted, either may match.
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if self.matches(candidate):
+                return candidate
+            candidate += timedelta(minutes=1)
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+
+class RateLimiter:
+    """Token bucket spreading calls evenly at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.interval = 60.0 / rate_per_minute
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop_event: threading.Event = None) -> bool:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) * self.interval
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class ScheduledJob:
+    def __init__(self, name: str, cron: str, symbols: List[str], actions: List[str], timezone: str = None):
+        from zoneinfo import ZoneInfo
+
+        unknown = set(actions) - {"warm", "pregenerate"}
+        if unknown:
+            raise ValueError(f"Unknown scheduler action(s) for job '{name}': {', '.join(sorted(unknown))}")
+
+        self.name = name
+        self.schedule = CronSchedule(cron)
+        self.symbols = [s.strip().upper() for s in symbols if s.strip()]
+        self.actions = actions
+        self.tz = ZoneInfo(timezone) if timezone else None
+        self.next_run = self.schedule.next_after(self._now())
+
+    def _now(self) -> datetime:
+        return datetime.now(self.tz).replace(tzinfo=None) if self.tz else datetime.now()
+
+    def due(self) -> bool:
+        return self._now() >= self.next_run
+
+    def advance(self):
+        self.next_run = self.schedule.next_after(self._now())
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "cron": self.schedule.expression,
+            "timezone": str(self.tz) if self.tz else "local",
+            "symbols": self.symbols,
+            "actions": self.actions,
+            "next_run": self.next_run.isoformat(),
+        }
+
+
+def warm_symbol(symbol: str, limiter: RateLimiter, stop_event: threading.Event):
+    from backend.services.finnhub import finnhub_client
+    from backend.services.price_history import get_price_history
+
+    fetches = [
+        finnhub_client.get_company_profile,
+        finnhub_client.get_basic_financials,
+        finnhub_client.get_recommendation_trends,
+        finnhub_client.get_price_target,
+        finnhub_client.get_company_news,
+    ]
+    for fetch in fetches:
+        if not limiter.acquire(stop_event):
+            return
+        fetch(symbol)
+    for period in ("3mo", "6mo"):
+        get_price_history(symbol, period=period)
+
+
+def pregenerate_report(symbol: str) -> str:
+    from backend.interactors.analysis import AnalysisInteractor
+    from backend.schemas.analysis import AnalysisRequest
+
+    from backend.services.admission import admission_controller
+
+    interactor = AnalysisInteractor()
+    request = AnalysisRequest(ticker=symbol, priority="scheduled")
+    if interactor.get_stored_report(request) is not None:
+        return "fresh"
+
+    with admission_controller.admit("scheduler", "scheduled"):
+        response = interactor.execute_analysis(request.model_copy(update={"max_age_seconds": 0}), client_id="scheduler")
+    if response.status != "completed":
+        raise RuntimeError(response.error or f"status {response.status}")
+    return "generated"
+
+
+class Scheduler:
+    """In-process cron scheduler for cache warming and report pregeneration.
+
+    Jobs run one at a time on a single worker thread. Finnhub calls and
+    report runs each go through their own token bucket so a 100-name
+    watchlist is spread out instead of hitting the upstream APIs at once.
+    Only the process holding the lock file runs jobs when several workers
+    share a host.
+    """
+
+    def __init__(self, jobs: List[ScheduledJob]):
+        self.jobs = {job.name: job for job in jobs}
+        self.history = deque(maxlen=200)
+        self.finnhub_limiter = RateLimiter(FINNHUB_RATE_PER_MINUTE)
+        self.report_limiter = RateLimiter(REPORT_RATE_PER_MINUTE)
+        self._stop_event = threading.Event()
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._lock_file = None
+
+    @classmethod
+    def from_config(cls, path: str) -> "Scheduler":
+        with open(path) as f:
+            config = json.load(f)
+        timezone = config.get("timezone")
+        jobs = []
+        for job in config.get("jobs", []):
+            # Skip a bad job rather than losing the whole schedule.
+            try:
+                jobs.append(ScheduledJob(
+                    name=job["name"],
+                    cron=job["cron"],
+                    symbols=job.get("symbols", []),
+                    actions=job.get("actions", ["warm", "pregenerate"]),
+                    timezone=job.get("timezone", timezone)
+                ))
+            except Exception as e:
+                print(f"Skipping scheduled job {job.get('name', '?')!r}: {e}")
+        return cls(jobs)
+
+    def _acquire_process_lock(self) -> bool:
+        import fcntl
+
+        directory = os.path.dirname(SCHEDULER_LOCK_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(SCHEDULER_LOCK_PATH, "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+
+    def start(self):
+        if self._thread is not None or not self.jobs:
+            return
+        if not self._acquire_process_lock():
+            print("Scheduler lock held by another worker; jobs will not run in this process")
+            return
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+        print(f"Scheduler started with {len(self.jobs)} job(s)")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @property
+    def running(self) -> bool:
+        """Whether this process runs the jobs (it holds the lock file)."""
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def trigger(self, name: str) -> bool:
+        """Queue a job to run now. False if it is unknown or this process
+        does not run jobs."""
+        if name not in self.jobs or not self.running:
+            return False
+        with self._lock:
+            self._pending.append(self.jobs[name])
+        return True
+
+    def queue_symbols(self, symbols: List[str], reason: str) -> List[str]:
+        """Run the watching jobs' actions for `symbols` now, ahead of their
+        next cron slot (e.g. right after the company reported earnings)."""
+        if not self.running:
+            return []
+        wanted = {s.upper() for s in symbols}
+        queued = []
+        for job in self.jobs.values():
+            hits = [s for s in job.symbols if s in wanted]
+            if not hits:
+                continue
+            adhoc = ScheduledJob(f"{job.name}:{reason}", job.schedule.expression, hits, job.actions,
+                                 str(job.tz) if job.tz else None)
+            with self._lock:
+                self._pending.append(adhoc)
+            queued.extend(hits)
+        return queued
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            for job in self.jobs.values():
+                if job.due():
+                    job.advance()
+                    with self._lock:
+                        self._pending.append(job)
+
+            while not self._stop_event.is_set():
+                with self._lock:
+                    if not self._pending:
+                        break
+                    job = self._pending.popleft()
+                self.run_job(job)
+
+            self._stop_event.wait(20)
+
+    def run_job(self, job: ScheduledJob) -> Dict[str, Any]:
+        record = {
+            "id": uuid.uuid4().hex[:12],
+            "job": job.name,
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "status": "running",
+            "results": {},
+            "errors": {},
+        }
+        self.history.appendleft(record)
+        print(f"[SCHEDULER] Running job '{job.name}' for {len(job.symbols)} symbols")
+        start = time.perf_counter()
+
+        for symbol in job.symbols:
+            if self._stop_event.is_set():
+                break
+            try:
+                if "warm" in job.actions:
+                    warm_symbol(symbol, self.finnhub_limiter, self._stop_event)
+                    record["results"][symbol] = "warmed"
+                if "pregenerate" in job.actions:
+                    if not self.report_limiter.acquire(self._stop_event):
+                        break
+                    record["results"][symbol] = pregenerate_report(symbol)
+            except Exception as e:
+                record["errors"][symbol] = str(e)
+                metrics.increment("scheduler_symbol_failures", job=job.name)
+
+        elapsed = time.perf_counter() - start
+        record["finished_at"] = datetime.now().isoformat()
+        record["duration_seconds"] = round(elapsed, 2)
+        if self._stop_event.is_set():
+            record["status"] = "cancelled"
+        else:
+            record["status"] = "completed" if not record["errors"] else "partial"
+
+        metrics.increment("scheduler_runs", job=job.name, status=record["status"])
+        metrics.observe("scheduler_job_seconds", elapsed, job=job.name)
+        print(f"[SCHEDULER] Job '{job.name}' {record['status']} in {elapsed:.1f}s")
+        return record
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "jobs": [job.describe() for job in self.jobs.values()],
+            "history": list(self.history),
+        }
+
+
+def create_scheduler() -> Optional[Scheduler]:
+    if not SCHEDULER_CONFIG:
+        return None
+    try:
+        return Scheduler.from_config(SCHEDULER_CONFIG)
+    except Exception as e:
+        print(f"Error loading scheduler config: {e}")
+        return None
+
+
+scheduler = create_scheduler()
@@ -0,0 +1,245 @@
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from backend.services.expressions import Expression, ExpressionError
+from backend.services.finnhub import extract_key_metrics, KEY_METRIC_FIELDS
+from backend.services.finnhub_async import fetch_many_sync
+from backend.services.indicators import indicator_panel
+from backend.services.price_history import get_price_histories
+
+load_dotenv()
+
+
+SCREENER_INDEX_PATH = os.getenv("SCREENER_INDEX_PATH", "data/screener_index.npz")
+SCREENER_WORKERS = int(os.getenv("SCREENER_WORKERS", "8"))
+INDICATOR_FIELDS = ["price", "sma_20", "sma_50", "sma_200", "rsi_14", "change_1m_pct", "change_3m_pct"]
+SCREEN_FIELDS = list(KEY_METRIC_FIELDS) + INDICATOR_FIELDS
+
+_ORDER_RE = re.compile(r"\border\s+by\b", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"\blimit\s+(\d+)\s*$", re.IGNORECASE)
+
+
+def load_universe() -> List[str]:
+    path = os.getenv("SCREENER_UNIVERSE_FILE")
+    if path and os.path.exists(path):
+        with open(path) as f:
+            symbols = [line.split(",")[0].strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        symbols = os.getenv("SCREENER_UNIVERSE", "").split(",")
+    return sorted({s.strip().upper() for s in symbols if s.strip()})
+
+
+def parse_screen_query(query: str) -> Tuple[Optional[Expression], List[Tuple[str, bool]], Optional[int]]:
+    """Split `<filter> order by <field> [asc|desc], ... limit N` into parts.
+
+    Returns (filter expression or None, [(field, descending)], limit or None).
+    """
+    query = (query or "").strip()
+    limit = None
+    match = _LIMIT_RE.search(query)
+    if match:
+        limit = int(match.group(1))
+        query = query[:match.start()].strip()
+
+    order = []
+    parts = _ORDER_RE.split(query, maxsplit=1)
+    if len(parts) == 2:
+        query = parts[0].strip()
+        for item in parts[1].split(","):
+            tokens = item.split()
+            if not tokens or len(tokens) > 2 or (len(tokens) == 2 and tokens[1].lower() not in ("asc", "desc")):
+                raise ExpressionError(f"Invalid order by clause: '{item.strip()}'")
+            order.append((tokens[0], len(tokens) == 2 and tokens[1].lower() == "desc"))
+
+    return (Expression(query) if query else None), order, limit
+
+
+class ScreenerIndex:
+    """Columnar metric index: one float64 array per field, one row per symbol.
+
+    Refreshes build a complete new snapshot and swap it in, so screens never
+    see a half-updated index.
+    """
+
+    def __init__(self, path: str = SCREENER_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refresh_started_at = None
+        self._swap(np.array([], dtype=str), {field: np.array([]) for field in SCREEN_FIELDS}, None)
+        self._load()
+
+    def _swap(self, symbols: np.ndarray, columns: Dict[str, np.ndarray], refreshed_at: Optional[float]):
+        for values in (symbols, *columns.values()):
+            values.flags.writeable = False
+        # One tuple assignment so screens never mix two snapshots.
+        self._data = (symbols, columns, refreshed_at)
+
+    @property
+    def symbols(self) -> np.ndarray:
+        return self._data[0]
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return self._data[1]
+
+    @property
+    def refreshed_at(self) -> Optional[float]:
+        return self._data[2]
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                symbols = data["symbols"]
+                columns = {
+                    field: data[field] if field in data.files else np.full(len(symbols), np.nan)
+                    for field in SCREEN_FIELDS
+                }
+                refreshed_at = float(data["refreshed_at"])
+            self._swap(symbols, columns, refreshed_at)
+            print(f"Loaded screener index with {len(symbols)} symbols")
+        except Exception as e:
+            print(f"Error loading screener index: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        symbols, columns, refreshed_at = self._data
+        np.savez(tmp_path, symbols=symbols, refreshed_at=refreshed_at, **columns)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _fetch_metrics(symbols: List[str]) -> List[Dict[str, Any]]:
+        # One pooled async fan-out, paced by the Finnhub rate limit.
+        fetched = fetch_many_sync(symbols, ["financials"])
+        return [
+            extract_key_metrics((fetched[symbol]["financials"] or {}).get("metric") or {}, default=np.nan)
+            for symbol in symbols
+        ]
+
+    def claim_refresh(self) -> bool:
+        """Mark a refresh as running. False if one already is."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            self._refresh_started_at = time.time()
+            return True
+
+    def refresh_status(self) -> Dict[str, Any]:
+        return {
+            "refreshing": self._refreshing,
+            "refresh_started_at": self._refresh_started_at if self._refreshing else None,
+            "refreshed_at": self.refreshed_at,
+            "universe_size": len(self.symbols),
+        }
+
+    def refresh(self, symbols: List[str] = None, claimed: bool = False) -> Dict[str, Any]:
+        """Rebuild the index. `claimed` means the caller already holds the
+        refresh through claim_refresh()."""
+        if not claimed and not self.claim_refresh():
+            return {"status": "already_running", **self.refresh_status()}
+
+        try:
+            start = time.perf_counter()
+            symbols = sorted({s.upper() for s in (symbols or load_universe())})
+            if not symbols:
+                return {"status": "empty_universe"}
+
+            metric_rows = self._fetch_metrics(symbols)
+
+            columns = {
+                field: np.array([row.get(field) for row in metric_rows], dtype=np.float64)
+                for field in KEY_METRIC_FIELDS
+            }
+            columns.update(self._latest_indicators(symbols))
+
+            self._swap(np.array(symbols), columns, time.time())
+            self._save()
+
+            elapsed = time.perf_counter() - start
+            print(f"Screener index refreshed: {len(symbols)} symbols in {elapsed:.1f}s")
+            return {"status": "completed", "symbols": len(symbols), "seconds": round(elapsed, 2)}
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    @staticmethod
+    def _latest_indicators(symbols: List[str]) -> Dict[str, np.ndarray]:
+        out = {field: np.full(len(symbols), np.nan) for field in INDICATOR_FIELDS}
+        histories = get_price_histories(symbols, period="1y", max_workers=SCREENER_WORKERS)
+        if not histories:
+            return out
+
+        close = pd.concat({t: h["Close"] for t, h in histories.items()}, axis=1).sort_index()
+        close = close.reindex(columns=symbols).ffill().to_numpy(dtype=np.float64)
+        panel = indicator_panel(close)
+
+        out["price"] = close[-1]
+        for field in ("sma_20", "sma_50", "sma_200", "rsi_14"):
+            out[field] = panel[field][-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if len(close) > 21:
+                out["change_1m_pct"] = (close[-1] / close[-22] - 1) * 100
+            if len(close) > 63:
+                out["change_3m_pct"] = (close[-1] / close[-64] - 1) * 100
+        return out
+
+    def screen(self, query: str, limit: int = 50) -> Dict[str, Any]:
+        expression, order, query_limit = parse_screen_query(query)
+        limit = query_limit or limit
+
+        symbols, columns, refreshed_at = self._data
+
+        for field, _ in order:
+            if field not in columns:
+                raise ExpressionError(f"Unknown order by field '{field}'")
+
+        rows = np.arange(len(symbols))
+        if expression is not None:
+            mask = np.broadcast_to(np.asarray(expression.evaluate(columns), dtype=bool), rows.shape)
+            rows = rows[mask]
+
+        if order:
+            # np.lexsort sorts by the last key first; NaN goes last either way.
+            keys = []
+            for field, descending in reversed(order):
+                values = columns[field][rows]
+                keys.append(np.where(np.isnan(values), np.inf, -values if descending else values))
+            rows = rows[np.lexsort(keys)]
+
+        matched = len(rows)
+        rows = rows[:limit]
+
+        results = []
+        for i in rows:
+            record = {"symbol": str(symbols[i])}
+            for field in SCREEN_FIELDS:
+                value = float(columns[field][i])
+                record[field] = None if np.isnan(value) else round(value, 4)
+            results.append(record)
+
+        return {
+            "query": query,
+            "universe_size": int(len(symbols)),
+            "matched": int(matched),
+            "results": results,
+            "tickers": [r["symbol"] for r in results],
+            "refreshed_at": refreshed_at,
+        }
+
+
+screener_index = ScreenerIndex()
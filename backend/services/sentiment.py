@@ -0,0 +1,296 @@
+import csv
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# Path to the full Loughran-McDonald master dictionary CSV (columns Word,
+# Positive, Negative, Uncertainty; a non-zero value marks membership). The
+# built-in lists below are a finance-specific subset used when it is unset.
+SENTIMENT_LEXICON_PATH = os.getenv("SENTIMENT_LEXICON_PATH", "")
+
+NEGATION_WINDOW = 3
+RECENT_HALF_LIFE_HOURS = 12.0
+BASELINE_HALF_LIFE_HOURS = 72.0
+TREND_THRESHOLD = 0.1
+
+POSITIVE = 1
+NEGATIVE = 2
+UNCERTAIN = 4
+NEGATOR = 8
+
+_POSITIVE_WORDS = """
+    able abundance accomplish accomplished accomplishment accomplishments achieve achieved achievement
+    achievements achieves achieving advance advanced advances advancing advantage advantageous advantages
+    alliance attain attained attractive beat beating beats beneficial benefit benefited benefiting benefits
+    best better bolster bolstered boom booming boost boosted boosting breakthrough breakthroughs brilliant
+    collaborate collaboration compliment constructive creative delight delighted dependable desirable
+    diligent distinction distinctive dominant easier easily efficiencies efficiency efficient
+    empower enable enabled enables encouraged encouraging enhance enhanced enhancement enhances enhancing
+    enjoy enthusiastic exceed exceeded exceeding exceeds excellence excellent exceptional excited exciting
+    exclusive favorable favorably favored gain gained gaining gains good great greater greatest growth
+    happy highest honor ideal impressive improve improved improvement improvements improves improving
+    incredible innovate innovation innovations innovative insightful integrity leadership lucrative
+    momentum optimistic outpace outpaced outperform outperformed outperforming outperforms perfect
+    pleased popular positive positives premier premium prestigious profitability profitable progress
+    prosper prospered prosperity rebound rebounded rebounds recovery resolve resolved rewarding
+    robust smooth solid stability stabilize stable strength strengthen strengthened strengths strong
+    stronger strongest succeed succeeded success successes successful successfully superior surge surged
+    surpass surpassed surpasses tremendous unmatched unparalleled upturn upgrade upgraded upgrades valuable
+    versatile vibrant win winner winning wins
+"""
+
+_NEGATIVE_WORDS = """
+    abandon abandoned abandonment abrupt abuse accident accidents accusation accusations accuse accused
+    adverse adversely against allegation allegations allege alleged antitrust argue argued bad bailout
+    bankrupt bankruptcy breach breached burden careless catastrophe catastrophic caution cautioned
+    cautious cease ceased challenge challenged challenges challenging claim claims closure collapse
+    collapsed collapses complaint complaints concern concerned concerns conflict conflicts contraction
+    crime crimes crisis critical criticism criticized cut cuts cutting damage damaged damages decline
+    declined declines declining decrease decreased decreases default defaulted defaults deficit deficits
+    delay delayed delays delinquent delist delisted deteriorate deteriorated deteriorating deterioration
+    difficult difficulties difficulty disappoint disappointed disappointing disappointment
+    discontinue discontinued dismissal dispute disputes disrupt disrupted disruption disruptions dissatisfied
+    divest doubt downgrade downgraded downgrades downturn drop dropped drops erode eroded erosion error
+    errors fail failed failing fails failure failures fall fallen falling falls fault fear fears felony
+    fined fines fraud fraudulent halt halted harm harmful headwind headwinds hurt impair impaired
+    impairment impairments inability inadequate incorrect ineffective inefficient injunction insolvency
+    insolvent instability investigation investigations lawsuit lawsuits layoff layoffs liquidate
+    liquidation litigation lose loses losing loss losses lower lowered misconduct misleading miss missed
+    misses negative negatively neglect obstacle obstacles offense overdue penalties penalty plummet
+    plummeted plunge plunged poor poorly probe problem problems prosecution protest recall recalled
+    recalls recession restate restated restatement restructure restructuring risk risks risky scandal
+    serious setback setbacks severe shortage shortfall shrink shrinking slow slowdown slowed slowing slump
+    slumped subpoena sue sued suffer suffered suspend suspended suspension terminate terminated
+    termination threat threaten threatened threats tumble tumbled turmoil unable uncollectible
+    underperform underperformed unfavorable unprofitable unsuccessful violate violated violation
+    violations volatile warn warned warning warnings weak weaken weakened weakening weakness weaknesses
+    worse worsen worsened worsening worst writedown writedowns writeoff
+"""
+
+_UNCERTAIN_WORDS = """
+    almost ambiguity ambiguous anticipate anticipated apparent apparently appear appeared appears
+    approximate approximately assume assumed assumption assumptions believe believed believes conceivable
+    conditional confusing contingency contingent could depend depended dependent depending depends
+    doubtful exposure exposures fluctuate fluctuated fluctuation fluctuations hidden imprecise indefinite
+    likelihood may maybe might nearly pending perhaps possibility possible possibly predict prediction
+    predictions preliminary presumably probable probably random rather reassess reconsider revise revised
+    risk risks roughly rumor rumors seems seldom sometime sometimes speculate speculated speculation
+    speculative sudden suddenly suggest suggested suggests susceptible tentative tentatively uncertain
+    uncertainties uncertainty unclear unconfirmed undetermined unexpected unexpectedly unknown unpredictable
+    unproven unsettled variability variable vary volatility
+"""
+
+# Negators as listed by Loughran and McDonald (2011), plus contraction
+# stems for text whose "n't" was written without an apostrophe.
+_NEGATORS = """
+    no not none neither never nobody nor without cannot isn aren wasn weren don doesn didn wouldn
+    couldn shouldn hasn haven hadn
+"""
+
+# "n't" becomes " not" before tokenizing, so "can't" and "won't" negate
+# without making "can" or "won" negators themselves.
+_CONTRACTIONS = (("n't", " not"), ("n\u2019t", " not"))
+
+# Everything except lowercase letters becomes a space, so str.split()
+# tokenizes; far cheaper than a regex over thousands of articles.
+_TOKEN_TABLE = {c: " " for c in range(0x2500) if not (ord("a") <= c <= ord("z"))}
+
+
+def _tokenize(text: str) -> List[str]:
+    text = text.lower()
+    for contraction, expanded in _CONTRACTIONS:
+        text = text.replace(contraction, expanded)
+    return text.translate(_TOKEN_TABLE).split()
+
+
+def _builtin_lexicon() -> Dict[str, int]:
+    lexicon = {}
+    for words, flag in ((_POSITIVE_WORDS, POSITIVE), (_NEGATIVE_WORDS, NEGATIVE),
+                        (_UNCERTAIN_WORDS, UNCERTAIN), (_NEGATORS, NEGATOR)):
+        for word in words.split():
+            lexicon[word] = lexicon.get(word, 0) | flag
+    return lexicon
+
+
+def load_lexicon(path: str = None) -> Dict[str, int]:
+    """Word -> category bit flags, from the master dictionary CSV when one
+    is configured and readable, otherwise from the built-in lists."""
+    lexicon = _builtin_lexicon()
+    path = path or SENTIMENT_LEXICON_PATH
+    if not path:
+        return lexicon
+
+    try:
+        loaded = {}
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                flags = 0
+                for column, flag in (("Positive", POSITIVE), ("Negative", NEGATIVE), ("Uncertainty", UNCERTAIN)):
+                    if (row.get(column) or "0").strip() not in ("0", ""):
+                        flags |= flag
+                if flags:
+                    loaded[row["Word"].strip().lower()] = flags
+        for word in _NEGATORS.split():
+            loaded[word] = loaded.get(word, 0) | NEGATOR
+        return loaded
+    except Exception as e:
+        print(f"Error loading sentiment lexicon from {path}: {e}")
+        return lexicon
+
+
+_lexicon = load_lexicon()
+
+
+def score_texts(texts: List[str]) -> Dict[str, np.ndarray]:
+    """Count lexicon hits for each text in one vectorized pass.
+
+    All texts are tokenized into one flat array with an owner index per
+    token. Following Loughran-McDonald, a positive word within
+    NEGATION_WINDOW tokens after a negator in the same text counts as
+    negative; negated negative words are left as they are.
+
+    Returns arrays of length len(texts): tokens, positive, negative,
+    uncertainty and score = (positive - negative) / (positive + negative),
+    0 for texts without sentiment words.
+    """
+    n = len(texts)
+    token_lists = [_tokenize(text) for text in texts]
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=n)
+    total = int(lengths.sum())
+
+    lookup = _lexicon.get
+    flags = np.fromiter(
+        (lookup(token, 0) for tokens in token_lists for token in tokens), dtype=np.int64, count=total
+    )
+    owner = np.repeat(np.arange(n), lengths)
+
+    positions = np.arange(total)
+    is_negator = (flags & NEGATOR) > 0
+    # Index of the closest negator strictly before each token, -1 if none.
+    last_negator = np.maximum.accumulate(np.where(is_negator, positions, -1))
+    previous = np.concatenate(([-1], last_negator[:-1])) if total else last_negator
+    negated = (
+        (previous >= 0)
+        & (positions - previous <= NEGATION_WINDOW)
+        & (owner[np.clip(previous, 0, None)] == owner)
+    )
+
+    positive_hit = (flags & POSITIVE) > 0
+    negative_hit = ((flags & NEGATIVE) > 0) | (positive_hit & negated)
+    positive_hit &= ~negated
+
+    positive = np.bincount(owner, weights=positive_hit, minlength=n)
+    negative = np.bincount(owner, weights=negative_hit, minlength=n)
+    uncertainty = np.bincount(owner, weights=(flags & UNCERTAIN) > 0, minlength=n)
+    hits = positive + negative
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(hits > 0, (positive - negative) / hits, 0.0)
+
+    return {
+        "tokens": lengths,
+        "positive": positive.astype(np.int64),
+        "negative": negative.astype(np.int64),
+        "uncertainty": uncertainty.astype(np.int64),
+        "score": score,
+    }
+
+
+def _article_text(article: Dict[str, Any]) -> str:
+    return f"{article.get('headline', '')} {article.get('summary', '')}"
+
+
+def score_articles(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copies of `articles` with per-article sentiment fields added."""
+    if not articles:
+        return []
+    counts = score_texts([_article_text(a) for a in articles])
+    scored = []
+    for i, article in enumerate(articles):
+        article = dict(article)
+        article["sentiment"] = {
+            "score": round(float(counts["score"][i]), 4),
+            "positive": int(counts["positive"][i]),
+            "negative": int(counts["negative"][i]),
+            "uncertainty": int(counts["uncertainty"][i]),
+        }
+        scored.append(article)
+    return scored
+
+
+def _decayed_mean(scores: np.ndarray, weights: np.ndarray, age_hours: np.ndarray, half_life: float) -> float:
+    decayed = weights * np.power(0.5, age_hours / half_life)
+    total = decayed.sum()
+    return float((scores * decayed).sum() / total) if total > 0 else 0.0
+
+
+def ticker_sentiment(ticker: str, articles: List[Dict[str, Any]], top: int = 3) -> Dict[str, Any]:
+    """Compact sentiment summary for one ticker's news.
+
+    The headline score is the long half-life weighted mean of article
+    scores (articles without sentiment words carry no weight). The trend compares
+    a short half-life mean against a long one, so a recent shift shows up
+    before it dominates the week.
+    """
+    summary = {"ticker": ticker.upper(), "articles": len(articles)}
+    if not articles:
+        return summary
+
+    counts = score_texts([_article_text(a) for a in articles])
+    scores = counts["score"]
+    weights = ((counts["positive"] + counts["negative"]) > 0).astype(np.float64)
+    published = np.array([float(a.get("datetime") or 0) for a in articles])
+    age_hours = np.clip(time.time() - published, 0, None) / 3600.0
+
+    recent = _decayed_mean(scores, weights, age_hours, RECENT_HALF_LIFE_HOURS)
+    baseline = _decayed_mean(scores, weights, age_hours, BASELINE_HALF_LIFE_HOURS)
+    if recent - baseline > TREND_THRESHOLD:
+        direction = "improving"
+    elif baseline - recent > TREND_THRESHOLD:
+        direction = "deteriorating"
+    else:
+        direction = "stable"
+
+    summary.update({
+        "score": round(baseline, 4),
+        "positive_articles": int((scores > 0).sum()),
+        "negative_articles": int((scores < 0).sum()),
+        "neutral_articles": int((scores == 0).sum()),
+        "uncertainty_per_article": round(float(counts["uncertainty"].mean()), 3),
+        "trend": {
+            "recent_score": round(recent, 4),
+            "baseline_score": round(baseline, 4),
+            "direction": direction,
+        },
+    })
+
+    days = np.array([
+        datetime.fromtimestamp(p, tz=timezone.utc).strftime("%Y-%m-%d") if p else "unknown" for p in published
+    ])
+    daily = []
+    for day in sorted(set(days)):
+        mask = days == day
+        day_weights = weights[mask]
+        daily.append({
+            "date": day,
+            "articles": int(mask.sum()),
+            "score": round(float((scores[mask] * day_weights).sum() / day_weights.sum()), 4) if day_weights.sum() else 0.0,
+        })
+    summary["daily"] = daily
+
+    order = np.argsort(scores, kind="stable")
+    summary["most_negative"] = [
+        {"headline": articles[i].get("headline", ""), "score": round(float(scores[i]), 4)}
+        for i in order[:top] if scores[i] < 0
+    ]
+    summary["most_positive"] = [
+        {"headline": articles[i].get("headline", ""), "score": round(float(scores[i]), 4)}
+        for i in order[::-1][:top] if scores[i] > 0
+    ]
+    return summary
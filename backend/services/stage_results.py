@@ -0,0 +1,38 @@
+from typing import Sequence
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+
+class StageResult:
+    """Compact outcome of one agent stage."""
+
+    __slots__ = ("stage", "text", "llm_turns", "tool_calls", "tool_errors", "seconds")
+
+    def __init__(self, stage: str, text: str, llm_turns: int = 0, tool_calls: int = 0,
+                 tool_errors: int = 0, seconds: float = 0.0):
+        self.stage = stage
+        self.text = text
+        self.llm_turns = llm_turns
+        self.tool_calls = tool_calls
+        self.tool_errors = tool_errors
+        self.seconds = seconds
+
+    @classmethod
+    def from_messages(cls, stage: str, messages: Sequence, text: str, seconds: float) -> "StageResult":
+        llm_turns = tool_calls = tool_errors = 0
+        for msg in messages:
+            if isinstance(msg, AIMessage):
+                llm_turns += 1
+            elif isinstance(msg, ToolMessage):
+                tool_calls += 1
+                if msg.content.startswith('{"error"'):
+                    tool_errors += 1
+        return cls(stage, text, llm_turns, tool_calls, tool_errors, seconds)
+
+    def describe(self) -> str:
+        parts = [f"{self.llm_turns} LLM turn(s)"]
+        if self.tool_calls:
+            errors = f", {self.tool_errors} failed" if self.tool_errors else ""
+            parts.append(f"{self.tool_calls} tool call(s){errors}")
+        parts.append(f"{self.seconds:.1f}s")
+        return ", ".join(parts)
@@ -0,0 +1,204 @@
+import csv
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional
+
+from dotenv import load_dotenv
+
+from backend.services.metrics import metrics
+
+load_dotenv()
+
+
+SYMBOL_FILE_PATH = os.getenv("SYMBOL_FILE_PATH", "data/symbols.csv")
+SYMBOL_EXCHANGES = [e.strip().upper() for e in os.getenv("SYMBOL_EXCHANGES", "US").split(",") if e.strip()]
+SYMBOL_REFRESH_SECONDS = float(os.getenv("SYMBOL_REFRESH_SECONDS", "86400"))
+
+# Plain symbols plus one class or venue suffix: AAPL, BRK.B, RDS-A, 7203.T.
+_SYMBOL_RE = re.compile(r"^[A-Z0-9]{1,10}(?:[.\-][A-Z0-9]{1,4})?$")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+FIELDS = ["symbol", "name", "type", "exchange"]
+
+
+def normalize_symbol(ticker: str) -> str:
+    return (ticker or "").strip().upper().replace("/", ".")
+
+
+def well_formed(ticker: str) -> bool:
+    return bool(_SYMBOL_RE.match(normalize_symbol(ticker)))
+
+
+class SymbolIndex:
+    """Sorted symbol universe for validation, autocomplete and name lookup.
+
+    Symbols are kept in one sorted list with the other fields in parallel
+    lists, so membership and prefix search are a binary search. Name search
+    uses a second sorted list of (name word, row) pairs, and each name is
+    tokenized once when the lists are built. Refreshes build
+    new lists and swap them in whole. While no symbol file has been loaded
+    only the symbol format is checked.
+    """
+
+    def __init__(self, path: str = SYMBOL_FILE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.refreshed_at = None
+        self._swap([])
+        self._load()
+
+    def _swap(self, records: List[Dict[str, str]]):
+        records = sorted({r["symbol"]: r for r in records if r.get("symbol")}.values(), key=lambda r: r["symbol"])
+        name_words = [tuple(_WORD_RE.findall(r["name"].lower())) for r in records]
+        words = sorted((word, row) for row, tokens in enumerate(name_words) for word in set(tokens))
+        # One tuple assignment so readers never see lists from two snapshots.
+        self._data = (
+            [r["symbol"] for r in records],
+            [r["name"] for r in records],
+            [r["type"] for r in records],
+            [r["exchange"] for r in records],
+            [w for w, _ in words],
+            [row for _, row in words],
+            name_words,
+        )
+
+    def __len__(self) -> int:
+        return len(self._data[0])
+
+    @property
+    def loaded(self) -> bool:
+        return len(self) > 0
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, newline="") as f:
+                records = [{field: (row.get(field) or "").strip() for field in FIELDS} for row in csv.DictReader(f)]
+            for record in records:
+                record["symbol"] = record["symbol"].upper()
+            self._swap(records)
+            self.refreshed_at = os.path.getmtime(self.path)
+            print(f"Loaded symbol index with {len(self)} symbols")
+        except Exception as e:
+            print(f"Error loading symbol file: {e}")
+
+    def _save(self, records: List[Dict[str, str]]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        os.replace(tmp_path, self.path)
+
+    def stale(self) -> bool:
+        return self.refreshed_at is None or time.time() - self.refreshed_at > SYMBOL_REFRESH_SECONDS
+
+    def refresh(self, exchanges: List[str] = None) -> Dict[str, Any]:
+        from backend.services.finnhub import finnhub_client
+
+        with self._lock:
+            if self._refreshing:
+                return {"status": "already_running"}
+            self._refreshing = True
+
+        try:
+            start = time.perf_counter()
+            records = []
+            for exchange in exchanges or SYMBOL_EXCHANGES:
+                for item in finnhub_client.get_stock_symbols(exchange):
+                    symbol = normalize_symbol(item.get("displaySymbol") or item.get("symbol"))
+                    if symbol:
+                        records.append({
+                            "symbol": symbol,
+                            "name": (item.get("description") or "").strip(),
+                            "type": item.get("type") or "",
+                            "exchange": item.get("mic") or exchange,
+                        })
+            if not records:
+                # Keep the current universe rather than wiping it on an outage.
+                return {"status": "empty_response"}
+
+            self._swap(records)
+            self.refreshed_at = time.time()
+            self._save([dict(zip(FIELDS, row)) for row in zip(*self._data[:4])])
+
+            elapsed = time.perf_counter() - start
+            print(f"Symbol index refreshed: {len(self)} symbols in {elapsed:.1f}s")
+            return {"status": "completed", "symbols": len(self), "seconds": round(elapsed, 2)}
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _row(self, symbol: str) -> Optional[int]:
+        symbols = self._data[0]
+        i = bisect_left(symbols, symbol)
+        return i if i < len(symbols) and symbols[i] == symbol else None
+
+    def _record(self, row: int) -> Dict[str, str]:
+        symbols, names, types, exchanges = self._data[:4]
+        return {"symbol": symbols[row], "name": names[row], "type": types[row], "exchange": exchanges[row]}
+
+    def resolve(self, ticker: str) -> Optional[Dict[str, str]]:
+        """Record for `ticker`, accepting '.' and '-' interchangeably as the
+        class separator (BRK-B finds BRK.B)."""
+        symbol = normalize_symbol(ticker)
+        for candidate in dict.fromkeys((symbol, symbol.replace("-", "."), symbol.replace(".", "-"))):
+            row = self._row(candidate)
+            if row is not None:
+                return self._record(row)
+        return None
+
+    def validate(self, ticker: str) -> Optional[str]:
+        """Reason `ticker` cannot be analyzed, or None if it can."""
+        symbol = normalize_symbol(ticker)
+        if not well_formed(symbol):
+            metrics.increment("tickers_rejected", reason="format")
+            return f"Invalid ticker symbol: {ticker}"
+        if self.loaded and self.resolve(symbol) is None:
+            metrics.increment("tickers_rejected", reason="unknown")
+            return f"Unknown ticker symbol: {ticker}"
+        return None
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Symbols starting with `query`, then companies with a name word
+        starting with each word of `query`. Exact symbol matches come first,
+        then shorter symbols."""
+        symbols, names, _, _, words, word_rows, name_words = self._data
+        query = (query or "").strip()
+        if not query:
+            return []
+
+        ranked = {}
+        prefix = normalize_symbol(query)
+        i = bisect_left(symbols, prefix)
+        while i < len(symbols) and symbols[i].startswith(prefix) and len(ranked) < limit * 20:
+            ranked[i] = (0 if symbols[i] == prefix else 1, len(symbols[i]), symbols[i])
+            i += 1
+
+        terms = _WORD_RE.findall(query.lower())
+        if terms:
+            first, rest = terms[0], terms[1:]
+            j = bisect_left(words, first)
+            end = min(len(words), j + limit * 20)
+            while j < end and words[j].startswith(first):
+                row = word_rows[j]
+                j += 1
+                if row in ranked:
+                    continue
+                if all(any(w.startswith(term) for w in name_words[row]) for term in rest):
+                    starts = 0 if names[row].lower().startswith(query.lower()) else 1
+                    ranked[row] = (2 + starts, len(names[row]), symbols[row])
+
+        rows = sorted(ranked, key=ranked.get)[:limit]
+        return [self._record(row) for row in rows]
+
+
+symbol_index = SymbolIndex()
@@ -0,0 +1,148 @@
+import contextvars
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.messages import HumanMessage
+
+from backend.services.cancellation import RunCancelled
+from backend.services.llm import invoke_llm
+
+load_dotenv()
+
+
+CHARS_PER_TOKEN = 4
+WRITER_INPUT_TOKEN_BUDGET = int(os.getenv("WRITER_INPUT_TOKEN_BUDGET", "2400"))
+SECTION_MAX_CHARS = int(os.getenv("SYNTHESIS_SECTION_MAX_CHARS", "6000"))
+SECTION_MIN_CHARS = 400
+MAP_WORKERS = int(os.getenv("SYNTHESIS_WORKERS", "6"))
+
+_HEADER_RE = re.compile(r"^#{1,4}\s+(.+?)\s*$", re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _paragraphs(body: str) -> List[str]:
+    paragraphs = []
+    for paragraph in body.split("\n\n"):
+        # Very long paragraphs are cut on sentence boundaries.
+        while len(paragraph) > SECTION_MAX_CHARS:
+            cut = paragraph.rfind(". ", 0, SECTION_MAX_CHARS) + 1 or SECTION_MAX_CHARS
+            paragraphs.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        paragraphs.append(paragraph)
+    return paragraphs
+
+
+def split_sections(report: str) -> List[Tuple[str, str]]:
+    """Split a markdown report on its headers into (title, body) pairs.
+
+    Tiny sections are merged into the previous one and oversized sections
+    are split on paragraph boundaries so each map call stays small.
+    """
+    matches = list(_HEADER_RE.finditer(report))
+    raw = []
+    if not matches or matches[0].start() > 0:
+        end = matches[0].start() if matches else len(report)
+        raw.append(("Overview", report[:end]))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(report)
+        raw.append((match.group(1).strip("*# "), report[match.end():end]))
+
+    sections = []
+    for title, body in raw:
+        body = body.strip()
+        if not body:
+            continue
+        if sections and len(body) < SECTION_MIN_CHARS:
+            prev_title, prev_body = sections[-1]
+            sections[-1] = (prev_title, f"{prev_body}\n\n{title}: {body}")
+            continue
+        sections.append((title, body))
+
+    chunked = []
+    for title, body in sections:
+        if len(body) <= SECTION_MAX_CHARS:
+            chunked.append((title, body))
+            continue
+        part = ""
+        for paragraph in _paragraphs(body):
+            if part and len(part) + len(paragraph) > SECTION_MAX_CHARS:
+                chunked.append((title, part.strip()))
+                part = ""
+            part += paragraph + "\n\n"
+        if part.strip():
+            chunked.append((title, part.strip()))
+    return chunked
+
+
+def _condense(ticker: str, label: str, title: str, body: str, max_words: int) -> str:
+    prompt = f"""Condense this section of a {label} on {ticker} into at most {max_words} words.
+
+Keep every specific number, percentage, date, rating and price target. Keep the author's conclusions and risks. Drop filler and repetition. Plain sentences, no headers.
+
+Section: {title}
+
+{body}"""
+    try:
+        response = invoke_llm("summarizer", "map", [HumanMessage(content=prompt)], temperature=0.2)
+        return response.content.strip()
+    except RunCancelled:
+        raise
+    except Exception as e:
+        print(f"   → Section condense failed ({title}): {e}")
+        return body[:max_words * 6]
+
+
+def build_writer_digests(ticker: str, research_data: str, analysis_data: str) -> Tuple[str, str]:
+    """Map-reduce both reports into digests that fit the writer's budget.
+
+    Reports that already fit are passed through untouched. Otherwise every
+    section of both reports is condensed in parallel with the fast model,
+    each getting a share of the budget proportional to its length, and the
+    digests are reassembled in report order.
+    """
+    reports = [("market research report", research_data or ""), ("financial analysis report", analysis_data or "")]
+    total_tokens = sum(estimate_tokens(text) for _, text in reports)
+    if total_tokens <= WRITER_INPUT_TOKEN_BUDGET:
+        return research_data or "", analysis_data or ""
+
+    jobs = []
+    for report_index, (label, text) in enumerate(reports):
+        for title, body in split_sections(text):
+            jobs.append((report_index, label, title, body))
+
+    total_chars = sum(len(body) for *_, body in jobs) or 1
+    budget_words = WRITER_INPUT_TOKEN_BUDGET * CHARS_PER_TOKEN // 6
+
+    print(f"   → Condensing {len(jobs)} report sections for the writer (~{total_tokens} tokens)")
+    with ThreadPoolExecutor(max_workers=MAP_WORKERS) as executor:
+        futures = [
+            # Carry the current run into the workers so a cancelled run stops
+            # condensing instead of finishing every section.
+            executor.submit(
+                contextvars.copy_context().run, _condense, ticker, label, title, body,
+                max(40, int(budget_words * len(body) / total_chars))
+            )
+            for _, label, title, body in jobs
+        ]
+        digests = [future.result() for future in futures]
+
+    parts = ([], [])
+    for (report_index, _, title, _), digest in zip(jobs, digests):
+        parts[report_index].append(f"{title}: {digest}")
+
+    max_chars = WRITER_INPUT_TOKEN_BUDGET * CHARS_PER_TOKEN
+    research_digest = "\n\n".join(parts[0])
+    analysis_digest = "\n\n".join(parts[1])
+    overflow = len(research_digest) + len(analysis_digest) - max_chars
+    if overflow > 0:
+        share = len(research_digest) / (len(research_digest) + len(analysis_digest))
+        research_digest = research_digest[:len(research_digest) - int(overflow * share)]
+        analysis_digest = analysis_digest[:len(analysis_digest) - int(overflow * (1 - share))]
+
+    return research_digest, analysis_digest
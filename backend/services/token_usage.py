@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List
+
+from dotenv import load_dotenv
+
+from backend.services.metrics import metrics
+
+load_dotenv()
+
+
+TOKEN_USAGE_PATH = os.getenv("TOKEN_USAGE_PATH", "data/token_usage.sqlite3")
+# 0 disables a budget.
+RUN_TOKEN_BUDGET = int(os.getenv("RUN_TOKEN_BUDGET", "0"))
+CLIENT_DAILY_TOKEN_BUDGET = int(os.getenv("CLIENT_DAILY_TOKEN_BUDGET", "0"))
+
+
+class TokenBudgetExceeded(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _seconds_until_reset() -> int:
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+class RunTokens:
+    """Prompt and completion tokens of one run, per agent."""
+
+    def __init__(self, ticker: str, client_id: str, budget: int = RUN_TOKEN_BUDGET):
+        self.ticker = ticker.upper()
+        self.client_id = client_id
+        self.budget = budget
+        self.by_agent: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, agent: str, prompt_tokens: int, completion_tokens: int) -> int:
+        with self._lock:
+            usage = self.by_agent.setdefault(agent, {"prompt_tokens": 0, "completion_tokens": 0, "llm_calls": 0})
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+            usage["llm_calls"] += 1
+            return self.total
+
+    @property
+    def total(self) -> int:
+        return sum(u["prompt_tokens"] + u["completion_tokens"] for u in self.by_agent.values())
+
+    def combined(self, agents: List[str]) -> Dict[str, int]:
+        out = {"prompt_tokens": 0, "completion_tokens": 0, "llm_calls": 0}
+        for agent in agents:
+            for key, value in self.by_agent.get(agent, {}).items():
+                out[key] += value
+        return out
+
+
+class TokenLedger:
+    """Token usage per ticker, agent and UTC day, and per client and day,
+    in a sqlite file shared by every worker. Every LLM call is written as
+    it completes, so client budgets hold across concurrent runs and
+    workers."""
+
+    def __init__(self, path: str = TOKEN_USAGE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ticker_usage ("
+                "day TEXT NOT NULL, ticker TEXT NOT NULL, agent TEXT NOT NULL, "
+                "prompt_tokens INTEGER NOT NULL, completion_tokens INTEGER NOT NULL, calls INTEGER NOT NULL, "
+                "PRIMARY KEY (day, ticker, agent))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS client_usage ("
+                "day TEXT NOT NULL, client_id TEXT NOT NULL, tokens INTEGER NOT NULL, "
+                "PRIMARY KEY (day, client_id))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, tokens: RunTokens, agent: str, prompt_tokens: int, completion_tokens: int) -> int:
+        """Add one call's usage to the run and the store; returns the
+        client's total for today."""
+        tokens.add(agent, prompt_tokens, completion_tokens)
+        day = _today()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO ticker_usage (day, ticker, agent, prompt_tokens, completion_tokens, calls) "
+                "VALUES (?, ?, ?, ?, ?, 1) ON CONFLICT (day, ticker, agent) DO UPDATE SET "
+                "prompt_tokens = prompt_tokens + excluded.prompt_tokens, "
+                "completion_tokens = completion_tokens + excluded.completion_tokens, calls = calls + 1",
+                (day, tokens.ticker, agent, prompt_tokens, completion_tokens)
+            )
+            conn.execute(
+                "INSERT INTO client_usage (day, client_id, tokens) VALUES (?, ?, ?) "
+                "ON CONFLICT (day, client_id) DO UPDATE SET tokens = tokens + excluded.tokens",
+                (day, tokens.client_id, prompt_tokens + completion_tokens)
+            )
+            row = conn.execute(
+                "SELECT tokens FROM client_usage WHERE day = ? AND client_id = ?", (day, tokens.client_id)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def client_tokens(self, client_id: str, day: str = None) -> int:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT tokens FROM client_usage WHERE day = ? AND client_id = ?", (day or _today(), client_id)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def check_client(self, client_id: str, budget: int = CLIENT_DAILY_TOKEN_BUDGET):
+        """Raise TokenBudgetExceeded if `client_id` has used up today's budget."""
+        if budget and self.client_tokens(client_id) >= budget:
+            metrics.increment("token_budget_rejections", scope="client")
+            raise TokenBudgetExceeded(f"Daily token budget of {budget} used up", _seconds_until_reset())
+
+    def usage(self, ticker: str = None, days: int = 7) -> List[Dict[str, Any]]:
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        query = ("SELECT day, ticker, agent, prompt_tokens, completion_tokens, calls FROM ticker_usage "
+                 "WHERE day >= ?")
+        params = [since]
+        if ticker:
+            query += " AND ticker = ?"
+            params.append(ticker.upper())
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY day DESC, ticker, agent", params).fetchall()
+        return [
+            dict(zip(("day", "ticker", "agent", "prompt_tokens", "completion_tokens", "calls"), row))
+            for row in rows
+        ]
+
+
+token_ledger = TokenLedger()
+
+
+def record_run_tokens(run, agent: str, prompt_tokens: int, completion_tokens: int):
+    """Account one LLM call to `run` and cancel the run once it or its
+    client is over budget. The caller's next cancellation check stops it."""
+    tokens = getattr(run, "tokens", None)
+    if tokens is None:
+        return
+
+    start = time.perf_counter()
+    try:
+        client_total = token_ledger.record(tokens, agent, prompt_tokens, completion_tokens)
+    except Exception as e:
+        # Accounting must never fail an analysis.
+        print(f"Error recording token usage: {e}")
+        client_total = 0
+    metrics.observe("token_ledger_write_seconds", time.perf_counter() - start)
+
+    if tokens.budget and tokens.total > tokens.budget:
+        metrics.increment("token_budget_rejections", scope="run")
+        run.cancel("token_budget_exceeded")
+    elif CLIENT_DAILY_TOKEN_BUDGET and client_total > CLIENT_DAILY_TOKEN_BUDGET:
+        metrics.increment("token_budget_rejections", scope="client")
+        run.cancel("client_token_budget_exceeded")
@@ -0,0 +1,98 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Any, List
+
+from dotenv import load_dotenv
+from langchain_core.messages import ToolMessage
+
+from backend.services.cancellation import RunContext, bind_run, get_run
+from backend.services.metrics import metrics
+
+load_dotenv()
+
+
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "16"))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+
+# Tools that legitimately take longer than the default. Override any tool
+# with TOOL_TIMEOUT_<TOOL_NAME>, e.g. TOOL_TIMEOUT_GET_COMPANY_NEWS=15.
+TOOL_TIMEOUTS = {
+    "get_portfolio_context": 45,
+    "backtest_technical_signals": 60,
+}
+
+_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool")
+
+
+def tool_timeout(name: str) -> float:
+    value = os.getenv(f"TOOL_TIMEOUT_{name.upper()}")
+    if value:
+        return float(value)
+    return TOOL_TIMEOUTS.get(name, TOOL_TIMEOUT_SECONDS)
+
+
+class ConcurrentToolNode:
+    """Graph node running one turn's tool calls in parallel.
+
+    Every call of the turn is submitted to a shared bounded pool at once,
+    so the turn takes as long as its slowest tool rather than the sum.
+    A call that exceeds its timeout (or the run's deadline) is answered
+    with a structured error ToolMessage, and so is a call that raises, so
+    the agent always gets one reply per tool call and can write around a
+    missing source. A timed-out tool keeps running in the background but
+    its result is discarded.
+    """
+
+    def __init__(self, tools: List, agent: str):
+        self.tools = {t.name: t for t in tools}
+        self.agent = agent
+
+    def _run_tool(self, call: Dict[str, Any], run: RunContext) -> str:
+        name = call["name"]
+        tool = self.tools.get(name)
+        if tool is None:
+            raise ValueError(f"Unknown tool: {name}")
+
+        start = time.perf_counter()
+        with bind_run(run):
+            result = tool.invoke(call.get("args") or {})
+        metrics.observe("tool_latency_seconds", time.perf_counter() - start, agent=self.agent, tool=name)
+        return result if isinstance(result, str) else json.dumps(result, default=str)
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        calls = state["messages"][-1].tool_calls
+        run = get_run(state.get("run_id"))
+        start = time.monotonic()
+
+        submitted = [(call, _executor.submit(self._run_tool, call, run)) for call in calls]
+
+        messages = []
+        for call, future in submitted:
+            name = call["name"]
+            timeout = tool_timeout(name)
+            if run is not None and run.remaining() is not None:
+                timeout = min(timeout, run.remaining())
+            try:
+                content = future.result(timeout=max(start + timeout - time.monotonic(), 0))
+                outcome = "ok"
+            except FutureTimeout:
+                future.cancel()
+                content = json.dumps({
+                    "error": "timeout",
+                    "tool": name,
+                    "timeout_seconds": round(timeout, 1),
+                    "message": f"{name} did not return in time; continue without this data"
+                })
+                outcome = "timeout"
+            except Exception as e:
+                content = json.dumps({"error": str(e), "tool": name})
+                outcome = "error"
+
+            metrics.increment("tool_calls", agent=self.agent, tool=name, outcome=outcome)
+            messages.append(ToolMessage(content=content, name=name, tool_call_id=call["id"]))
+
+        metrics.observe("tool_turn_seconds", time.monotonic() - start, agent=self.agent)
+        print(f"   → {len(calls)} tool call(s) finished in {time.monotonic() - start:.1f}s")
+        return {"messages": messages}
@@ -1,3 +1,8 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
 import streamlit as st
 import requests
 
@@ -9,6 +14,25 @@ st.set_page_config(
 )
 
 API_BASE_URL = "http://localhost:8000/api"
+POLL_INTERVAL_SECONDS = 2
+RUN_TIMEOUT_SECONDS = 300
+# Per browser session.
+RESULT_CACHE_SIZE = 20
+
+STAGES = [
+    ("research", "Market Researcher"),
+    ("analysis", "Data Analyst"),
+    ("report", "Report Writer"),
+]
+QUICK_STAGES = [
+    ("analysis", "Data Snapshot"),
+    ("report", "Quick Summary"),
+]
+MODES = {
+    "standard": "Standard - full three-agent report",
+    "quick": "Quick - ~300-word take in seconds",
+    "deep": "Deep - large model on every step",
+}
 
 st.markdown("""
     <style>
@@ -85,32 +109,206 @@ def display_sidebar():
         - **Finnhub API** - Real-time data
         - **FastAPI** - Backend service
         """)
+        
+        st.markdown("---")
+        st.markdown("### 🗄️ Caching")
+        max_age_minutes = st.slider(
+            "Reuse results up to (minutes)",
+            min_value=0,
+            max_value=240,
+            value=60,
+            help="Results younger than this are shown without re-running the agents. 0 always runs a fresh analysis."
+        )
+        
+        st.markdown("---")
+        st.markdown("### ⚡ Analysis Mode")
+        mode = st.selectbox("Mode", list(MODES), format_func=MODES.get, label_visibility="collapsed")
+    
+    return max_age_minutes * 60, mode
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    # One pooled keep-alive session for every rerun and browser tab.
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class ResultCache:
+    """(ticker, mode) -> (fetched_at, result), least recently used first
+    out once it holds RESULT_CACHE_SIZE entries."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def get_result_cache() -> ResultCache:
+    # Kept in the session so one user's results are never served to another.
+    if "result_cache" not in st.session_state:
+        st.session_state.result_cache = ResultCache()
+    return st.session_state.result_cache
+
+
+def get_cached_result(ticker: str, max_age: int, mode: str = "standard"):
+    entry = get_result_cache().get((ticker, mode))
+    if entry and max_age > 0 and time.time() - entry[0] <= max_age:
+        return entry
+    return None
 
 
-def analyze_stock(ticker: str, company_name: str = None):
+def start_analysis(ticker: str, company_name: str = None, max_age: int = 0, mode: str = "standard"):
     try:
-        with st.spinner(f"🔄 Analyzing {ticker}... This may take a minute..."):
-            response = requests.post(
-                f"{API_BASE_URL}/analyze",
+        response = get_http_session().post(
+            f"{API_BASE_URL}/analyze/runs",
+            json={
+                "ticker": ticker,
+                "company_name": company_name,
+                "max_age_seconds": max_age,
+                "mode": mode,
+                "deadline_seconds": RUN_TIMEOUT_SECONDS
+            },
+            timeout=30
+        )
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ Error: {str(e)}")
+        return None
+    
+    if response.status_code in (200, 202):
+        return response.json()
+    
+    st.error(f"Error: {response.status_code} - {response.text}")
+    return None
+
+
+def poll_analysis(run_id: str):
+    try:
+        response = get_http_session().get(f"{API_BASE_URL}/analyze/runs/{run_id}", timeout=10)
+    except requests.exceptions.RequestException:
+        return None
+    return response.json() if response.status_code == 200 else None
+
+
+def cancel_analysis(run_id: str):
+    # Best effort: the run also stops at its own deadline.
+    try:
+        get_http_session().delete(f"{API_BASE_URL}/analyze/runs/{run_id}", timeout=10)
+    except requests.exceptions.RequestException:
+        pass
+
+
+def stream_quick_analysis(ticker: str, company_name: str = None, max_age: int = 0):
+    slots = create_result_slots(QUICK_STAGES)
+    with slots["status"].container():
+        display_agent_status(agent_statuses_from_progress({"status": "running"}, QUICK_STAGES))
+    
+    outcome = {}
+    
+    def summary_tokens():
+        try:
+            with get_http_session().post(
+                f"{API_BASE_URL}/analyze/stream",
                 json={
                     "ticker": ticker,
-                    "company_name": company_name
+                    "company_name": company_name,
+                    "max_age_seconds": max_age,
+                    "mode": "quick"
                 },
-                timeout=300 
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                st.error(f"Error: {response.status_code} - {response.text}")
-                return None
-                
-    except requests.exceptions.Timeout:
-        st.error("⏰ Request timeout. The analysis is taking too long. Please try again.")
+                stream=True,
+                timeout=(10, 60)
+            ) as response:
+                if response.status_code != 200:
+                    outcome["detail"] = f"{response.status_code} - {response.text}"
+                    return
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["event"] == "token":
+                        yield event["text"]
+                    else:
+                        outcome.update(event)
+        except requests.exceptions.RequestException as e:
+            outcome["detail"] = str(e)
+    
+    with slots["report"].container():
+        st.write_stream(summary_tokens())
+    
+    if outcome.get("event") != "result":
+        st.error(f"❌ Analysis failed: {outcome.get('detail') or 'unknown error'}")
         return None
-    except Exception as e:
-        st.error(f"❌ Error: {str(e)}")
+    
+    result = outcome["data"]
+    result["completed_stages"] = [stage for stage, _ in QUICK_STAGES if result.get(f"{stage}_data")]
+    render_result(result, slots, QUICK_STAGES)
+    get_result_cache().put((ticker, "quick"), result)
+    return result
+
+
+def analyze_stock(ticker: str, company_name: str = None, max_age: int = 0, mode: str = "standard"):
+    if mode == "quick":
+        return stream_quick_analysis(ticker, company_name, max_age)
+    
+    progress = start_analysis(ticker, company_name, max_age, mode)
+    if progress is None:
+        return None
+    
+    slots = create_result_slots()
+    render_result(progress, slots)
+    
+    deadline = time.time() + RUN_TIMEOUT_SECONDS
+    while progress["status"] in ("queued", "running"):
+        if time.time() > deadline:
+            cancel_analysis(progress["run_id"])
+            st.error("⏰ Request timeout. The analysis is taking too long. Please try again.")
+            return None
+        time.sleep(POLL_INTERVAL_SECONDS)
+        update = poll_analysis(progress["run_id"])
+        if update is not None:
+            progress = update
+            render_result(progress, slots)
+    
+    if progress["status"] != "completed":
+        st.error(f"❌ Analysis {progress['status']}: {progress.get('error') or 'unknown error'}")
         return None
+    
+    get_result_cache().put((ticker, mode), progress)
+    return progress
+
+
+def agent_statuses_from_progress(progress, stages=STAGES):
+    completed = progress.get("completed_stages") or []
+    running = progress.get("status") in ("queued", "running")
+    statuses = []
+    for stage, agent_name in stages:
+        if stage in completed:
+            status, message = "completed", "Completed"
+        elif running:
+            is_next = len(completed) == [s for s, _ in stages].index(stage)
+            status = "in_progress" if is_next and progress["status"] == "running" else "pending"
+            message = "Working..." if status == "in_progress" else "Waiting"
+        else:
+            status, message = "failed", "Did not complete"
+        statuses.append({"agent_name": agent_name, "status": status, "message": message})
+    return statuses
 
 
 def display_agent_status(agent_statuses):
@@ -124,7 +322,8 @@ def display_agent_status(agent_statuses):
                 "completed": "status-completed",
                 "in_progress": "status-in-progress",
                 "error": "status-error",
-                "failed": "status-error"
+                "failed": "status-error",
+                "pending": "status-in-progress"
             }.get(status["status"], "status-in-progress")
             
             st.markdown(f"""
@@ -170,10 +369,44 @@ def display_report(report_data):
         st.markdown(report_text)
 
 
+TAB_LABELS = {"research": "🔍 Research", "analysis": "📈 Analysis", "report": "📝 Report"}
+
+
+def create_result_slots(stages=STAGES):
+    status_slot = st.empty()
+    st.markdown("---")
+    keys = [stage for stage, _ in stages]
+    tabs = st.tabs([TAB_LABELS[key] for key in keys])
+    slots = {"status": status_slot}
+    for key, tab in zip(keys, tabs):
+        with tab:
+            slots[key] = st.empty()
+    return slots
+
+
+def render_result(result, slots, stages=STAGES):
+    with slots["status"].container():
+        display_agent_status(agent_statuses_from_progress(result, stages))
+    
+    sections = [
+        ("research", "research_data", display_research_data, "⏳ Market research in progress..."),
+        ("analysis", "analysis_data", display_analysis_data, "⏳ Financial analysis in progress..."),
+        ("report", "report_data", display_report, "⏳ Executive summary in progress..."),
+    ]
+    for key, field, display, pending_text in sections:
+        if key not in slots:
+            continue
+        with slots[key].container():
+            if result.get(field):
+                display(result[field])
+            else:
+                st.info(pending_text)
+
 
 def main():
     display_header()
-    display_sidebar()
+    max_age, mode = display_sidebar()
+    stages = QUICK_STAGES if mode == "quick" else STAGES
     
     col1, col2, col3 = st.columns([2, 2, 1])
     
@@ -198,28 +431,19 @@ def main():
     if analyze_button and ticker:
         st.markdown("---")
         
-        result = analyze_stock(ticker, company_name if company_name else None)
+        cached = get_cached_result(ticker, max_age, mode)
+        if cached:
+            fetched_at, result = cached
+            st.info(f"📌 Showing results from {int((time.time() - fetched_at) // 60)} minute(s) ago.")
+            render_result(result, create_result_slots(stages), stages)
+        else:
+            result = analyze_stock(ticker, company_name if company_name else None, max_age, mode)
+            if result:
+                st.success(f"✅ Analysis completed for {result['ticker']}!")
         
         if result:
             st.session_state.last_analysis = result
-            
-            st.success(f"✅ Analysis completed for {result['ticker']}!")
-            
-            if result.get("agent_statuses"):
-                display_agent_status(result["agent_statuses"])
-            
-            st.markdown("---")
-            
-            tab1, tab2, tab3 = st.tabs(["🔍 Research", "📈 Analysis", "📝 Report"])
-            
-            with tab1:
-                display_research_data(result.get("research_data"))
-            
-            with tab2:
-                display_analysis_data(result.get("analysis_data"))
-            
-            with tab3:
-                display_report(result.get("report_data"))
+            st.session_state.last_stages = stages
             
     elif analyze_button and not ticker:
         st.warning("⚠️ Please enter a stock ticker symbol")
@@ -228,23 +452,8 @@ def main():
         st.markdown("---")
         st.info("📌 Showing last analysis results. Enter a new ticker to analyze another stock.")
         
-        result = st.session_state.last_analysis
-        
-        if result.get("agent_statuses"):
-            display_agent_status(result["agent_statuses"])
-        
-        st.markdown("---")
-        
-        tab1, tab2, tab3 = st.tabs(["🔍 Research", "📈 Analysis", "📝 Report"])
-        
-        with tab1:
-            display_research_data(result.get("research_data"))
-        
-        with tab2:
-            display_analysis_data(result.get("analysis_data"))
-        
-        with tab3:
-            display_report(result.get("report_data"))
+        last_stages = st.session_state.get("last_stages", STAGES)
+        render_result(st.session_state.last_analysis, create_result_slots(last_stages), last_stages)
     
     st.markdown("---")
     st.markdown("""
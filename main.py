@@ -4,14 +4,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
 
-from backend.routes import analysis
+from backend.routes import analysis, backtest, compare, prices, screener, symbols, scheduler as scheduler_routes
+from backend.routes.responses import FastJSONResponse, add_compression
+from backend.services.quote_feed import start_quote_feed, stop_quote_feed
+from backend.services.finnhub_async import close_async_finnhub_client
+from backend.services.scheduler import scheduler
+from backend.services.symbols import symbol_index
+from backend.services.earnings import start_earnings_watch, stop_earnings_watch
+import threading
 
 load_dotenv()
 
 app = FastAPI(
     title="Financial Analysis Agent Crew API",
     description="Multi-agent AI system for comprehensive stock analysis",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 app.add_middleware(
@@ -22,7 +30,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+add_compression(app)
+
 app.include_router(analysis.router, prefix="/api", tags=["analysis"])
+app.include_router(compare.router, prefix="/api", tags=["compare"])
+app.include_router(backtest.router, prefix="/api", tags=["backtest"])
+app.include_router(prices.router, prefix="/api", tags=["prices"])
+app.include_router(screener.router, prefix="/api", tags=["screener"])
+app.include_router(symbols.router, prefix="/api", tags=["symbols"])
+app.include_router(scheduler_routes.router, prefix="/api", tags=["scheduler"])
+
+
+@app.on_event("startup")
+async def startup():
+    start_quote_feed()
+    if symbol_index.stale():
+        threading.Thread(target=symbol_index.refresh, name="symbol-refresh", daemon=True).start()
+    start_earnings_watch()
+    if scheduler is not None:
+        scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    stop_quote_feed()
+    stop_earnings_watch()
+    if scheduler is not None:
+        scheduler.stop()
+    close_async_finnhub_client()
+
 
 @app.get("/")
 async def root():
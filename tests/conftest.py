@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+# Services open their stores and clients at import time; keep them off the
+# working tree and away from real credentials.
+_DATA_DIR = tempfile.mkdtemp(prefix="financial-agent-tests-")
+for name, value in {
+    "FINNHUB_API_KEY": "test",
+    "GROQ_API_KEY": "test",
+    "REPORT_STORE_PATH": os.path.join(_DATA_DIR, "reports.sqlite3"),
+    "CHECKPOINT_STORE_PATH": os.path.join(_DATA_DIR, "checkpoints.sqlite3"),
+    "TOKEN_USAGE_PATH": os.path.join(_DATA_DIR, "token_usage.sqlite3"),
+    "SYMBOL_FILE_PATH": os.path.join(_DATA_DIR, "symbols.csv"),
+    "EARNINGS_CALENDAR_PATH": os.path.join(_DATA_DIR, "earnings.json"),
+    "FUNDAMENTALS_STORE_DIR": os.path.join(_DATA_DIR, "fundamentals"),
+    "SCREENER_INDEX_PATH": os.path.join(_DATA_DIR, "screener_index.npz"),
+    "SCHEDULER_CONFIG": "",
+    "QUOTE_FEED_SYMBOLS": "",
+}.items():
+    os.environ.setdefault(name, value)
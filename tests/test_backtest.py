@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.interactors import backtest as interactor_module
+from backend.interactors.backtest import BacktestInteractor
+from backend.schemas.backtest import BacktestRequest
+from backend.services import backtest
+from backend.services.backtest import BacktestInputError, BacktestNotFound
+
+
+def _histories(bars: int):
+    close = np.linspace(100.0, 120.0, bars)
+    frame = pd.DataFrame({"Close": close, "Volume": np.full(bars, 1e6)}, index=pd.bdate_range("2025-01-01", periods=bars))
+    return lambda tickers, period: {t.upper(): frame for t in tickers}
+
+
+def _run(**request):
+    return BacktestInteractor().execute_backtest(BacktestRequest(**request))
+
+
+def test_no_price_history_is_not_found(monkeypatch):
+    monkeypatch.setattr(backtest, "get_price_histories", lambda tickers, period: {})
+    with pytest.raises(BacktestNotFound):
+        _run(tickers=["AAPL"])
+
+
+def test_unknown_ticker_is_not_found(monkeypatch):
+    class LoadedIndex:
+        loaded = True
+
+        def resolve(self, ticker):
+            return {"symbol": ticker} if ticker == "AAPL" else None
+
+    monkeypatch.setattr(interactor_module, "symbol_index", LoadedIndex())
+    with pytest.raises(BacktestNotFound, match="ZZZZ"):
+        _run(tickers=["AAPL", "ZZZZ"])
+
+
+@pytest.mark.parametrize("request_fields", [
+    {"tickers": ["NOT A TICKER"]},
+    {"tickers": ["AAPL"], "period": "7y"},
+    {"tickers": ["AAPL"], "period": "1mo", "horizon": 60},
+])
+def test_invalid_input_is_an_input_error(monkeypatch, request_fields):
+    monkeypatch.setattr(backtest, "get_price_histories", _histories(21))
+    with pytest.raises(BacktestInputError):
+        _run(**request_fields)
+
+
+def test_valid_request_runs(monkeypatch):
+    monkeypatch.setattr(backtest, "get_price_histories", _histories(300))
+    response = _run(tickers=["AAPL"], period="2y", horizon=5)
+    assert response.tickers == ["AAPL"] and response.bars == 300
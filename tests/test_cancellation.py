@@ -0,0 +1,20 @@
+import time
+
+from backend.services import cancellation
+from backend.services.cancellation import RunContext
+
+
+def test_request_deadline_is_capped_by_the_server(monkeypatch):
+    monkeypatch.setattr(cancellation, "ANALYSIS_DEADLINE_SECONDS", 300)
+
+    assert 0 < RunContext.for_request("a", 30).remaining() <= 30
+    assert 290 < RunContext.for_request("b", 3600).remaining() <= 300
+    assert 290 < RunContext.for_request("c").remaining() <= 300
+    assert RunContext.for_request("d").run_id == "d"
+
+
+def test_expired_deadline_cancels_the_run():
+    run = RunContext.for_request(deadline_seconds=0.05)
+    time.sleep(0.1)
+    assert run.cancelled
+    assert run.reason == "deadline_exceeded"
@@ -0,0 +1,5 @@
+from backend.interactors.compare import _store_key
+
+
+def test_store_key_ignores_ticker_order_and_duplicates():
+    assert _store_key(["MSFT", "AAPL", "msft"]) == _store_key(["AAPL", "MSFT"]) == "compare:AAPL+MSFT"
@@ -0,0 +1,45 @@
+import time
+
+from backend.services import finnhub, report_store, scheduler
+from backend.services.earnings import EarningsCalendar
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.queued = []
+
+    def queue_symbols(self, symbols, reason):
+        self.queued.append((sorted(symbols), reason))
+        return symbols
+
+
+def test_sweep_queues_only_symbols_whose_reports_were_removed(tmp_path, monkeypatch):
+    now = time.time()
+    calendar = EarningsCalendar(path=str(tmp_path / "earnings.json"))
+    calendar._swap([
+        {"symbol": "AAPL", "date": "", "hour": "", "at": now - 3600},
+        {"symbol": "MSFT", "date": "", "hour": "", "at": now - 1800},
+    ])
+
+    stored = {"AAPL:standard", "MSFT+NVDA:compare"}
+
+    def invalidate_matching(match, before):
+        removed = {key for key in stored if match(key)}
+        stored.difference_update(removed)
+        return len(removed)
+
+    fake_scheduler = FakeScheduler()
+    monkeypatch.setattr(report_store.report_store, "invalidate_matching", invalidate_matching)
+    monkeypatch.setattr(finnhub.finnhub_client, "invalidate", lambda ticker, kinds=None: None)
+    monkeypatch.setattr(scheduler, "scheduler", fake_scheduler)
+
+    assert sorted(calendar.sweep()) == ["AAPL", "MSFT"]
+    assert fake_scheduler.queued == [(["AAPL", "MSFT"], "earnings")]
+
+    # A restarted worker re-checks the window, but the reports are gone.
+    stored.add("MSFT:quick")
+    restarted = EarningsCalendar(path=str(tmp_path / "earnings.json"))
+    restarted._swap(calendar._data[3])
+    fake_scheduler.queued.clear()
+    assert sorted(restarted.sweep()) == ["AAPL", "MSFT"]
+    assert fake_scheduler.queued == [(["MSFT"], "earnings")]
@@ -0,0 +1,33 @@
+import asyncio
+
+from backend.services import finnhub_async
+from backend.services.finnhub_async import async_finnhub_client, fetch_many_sync
+
+
+def test_fetch_many_sync_reuses_the_shared_client_and_loop(monkeypatch):
+    seen = []
+
+    async def fake_request(endpoint, params):
+        seen.append((asyncio.get_running_loop(), async_finnhub_client._get_client()))
+        return {"symbol": params.get("symbol")}
+
+    monkeypatch.setattr(async_finnhub_client, "_request", fake_request)
+    first = fetch_many_sync(["LOOPA"], ["quote"])
+    second = fetch_many_sync(["LOOPB", "LOOPC"], ["quote"])
+
+    assert first == {"LOOPA": {"quote": {"symbol": "LOOPA"}}}
+    assert set(second) == {"LOOPB", "LOOPC"}
+    assert len(seen) == 3
+    assert len({id(loop) for loop, _ in seen}) == 1
+    assert len({id(client) for _, client in seen}) == 1
+    assert seen[0][0] is finnhub_async._client_loop()
+
+
+def test_pool_stats_report_connections_as_unavailable_without_the_pool(monkeypatch):
+    client = finnhub_async.AsyncFinnhubClient()
+    assert client.pool_stats()["connections"] == 0
+
+    monkeypatch.setattr(client, "_client", object())
+    stats = client.pool_stats()
+    assert stats["connections"] is None and stats["idle_connections"] is None
+    client._report_pool()
@@ -0,0 +1,158 @@
+import pytest
+from langchain_core.messages import AIMessage
+
+from backend.services import graph
+from backend.services.checkpoints import StageCheckpointer, CHECKPOINT_KEYS
+
+STAGES = ["research", "analysis", "report"]
+
+
+class MemoryCheckpointer(StageCheckpointer):
+    def __init__(self):
+        self.saved = {}
+
+    def load(self, run_id):
+        return self.saved.get(run_id)
+
+    def save(self, run_id, state):
+        self.saved[run_id] = {key: state.get(key) for key in CHECKPOINT_KEYS}
+
+    def delete(self, run_id):
+        self.saved.pop(run_id, None)
+
+
+def _fake_stage(name, next_stage, calls, failing):
+    def stage(state):
+        calls.append(name)
+        if name in failing:
+            state["status"] = "error"
+            state["error"] = f"{name} failed"
+            return state
+        state[f"{name}_data" if name != "report" else "report_data"] = (
+            {"report_text": "report"} if name == "report" else {"summary": name}
+        )
+        state["current_stage"] = next_stage
+        state["messages"] = [AIMessage(content=name)]
+        if name == "report":
+            state["status"] = "completed"
+        return state
+    return stage
+
+
+def _initial_state(run_id):
+    return {
+        "ticker": "AAPL",
+        "mode": "standard",
+        "company_name": "AAPL",
+        "holdings": [],
+        "run_id": run_id,
+        "current_stage": "research",
+        "completed_stages": [],
+        "stage_results": {},
+        "research_data": {},
+        "analysis_data": {},
+        "report_data": {},
+        "status": "in_progress",
+        "error": "",
+        "messages": [],
+    }
+
+
+@pytest.mark.parametrize("failed_stage", STAGES)
+def test_resume_after_last_completed_stage(monkeypatch, failed_stage):
+    monkeypatch.setattr(graph, "STAGE_ATTEMPTS", {})
+    monkeypatch.setattr(graph, "STAGE_MAX_ATTEMPTS", 1)
+    checkpointer = MemoryCheckpointer()
+    calls, failing = [], {failed_stage}
+    for name, next_stage in zip(STAGES, ["analysis", "report", "completed"]):
+        monkeypatch.setattr(graph, f"{name}_stage", _fake_stage(name, next_stage, calls, failing))
+    app = graph.create_analysis_graph(checkpointer)
+
+    first = app.invoke(graph._restore_checkpoint(_initial_state("run-1"), checkpointer))
+    assert first["status"] == "error"
+    done_before = STAGES[:STAGES.index(failed_stage)]
+    assert checkpointer.load("run-1")["completed_stages"] == done_before
+
+    calls.clear()
+    failing.clear()
+    resumed = app.invoke(graph._restore_checkpoint(_initial_state("run-1"), checkpointer))
+
+    remaining = STAGES[STAGES.index(failed_stage):]
+    assert resumed["status"] == "completed"
+    assert calls == remaining
+    assert resumed["completed_stages"] == STAGES
+    assert resumed["report_data"] == {"report_text": "report"}
+    # Skipped stages add nothing to the message history.
+    assert [m.content for m in resumed["messages"]] == remaining
+
+
+def test_completed_run_is_not_rerun(monkeypatch):
+    checkpointer = MemoryCheckpointer()
+    calls = []
+    for name, next_stage in zip(STAGES, ["analysis", "report", "completed"]):
+        monkeypatch.setattr(graph, f"{name}_stage", _fake_stage(name, next_stage, calls, set()))
+    app = graph.create_analysis_graph(checkpointer)
+
+    app.invoke(graph._restore_checkpoint(_initial_state("run-2"), checkpointer))
+    calls.clear()
+    again = app.invoke(graph._restore_checkpoint(_initial_state("run-2"), checkpointer))
+
+    assert calls == []
+    assert again["status"] == "completed"
+
+
+def _flaky_research(calls, retryable):
+    def stage(state):
+        calls.append("research")
+        if len(calls) == 1:
+            state["status"] = "error"
+            state["error"] = "research failed"
+            state["retryable"] = retryable
+            return state
+        state["research_data"] = {"summary": "research"}
+        state["current_stage"] = "end"
+        state["status"] = "completed"
+        return state
+    return stage
+
+
+@pytest.mark.parametrize("retryable, expected_calls, status", [(True, 2, "completed"), (False, 1, "error")])
+def test_only_transient_failures_are_retried(monkeypatch, retryable, expected_calls, status):
+    monkeypatch.setattr(graph, "STAGE_ATTEMPTS", {"research": 3})
+    monkeypatch.setattr(graph, "STAGE_RETRY_BACKOFF_SECONDS", 0)
+    calls = []
+    monkeypatch.setattr(graph, "research_stage", _flaky_research(calls, retryable))
+    app = graph.create_analysis_graph(MemoryCheckpointer())
+
+    result = app.invoke(_initial_state("run-3"))
+
+    assert len(calls) == expected_calls
+    assert result["status"] == status
+    assert "retryable" not in result
+
+
+def test_checkpoint_from_another_mode_is_ignored():
+    checkpointer = MemoryCheckpointer()
+    quick = {**_initial_state("run-4"), "mode": "quick", "current_stage": "completed", "status": "completed",
+             "completed_stages": ["analysis", "report"], "report_data": {"report_text": "quick"}}
+    checkpointer.save("run-4", quick)
+
+    restored = graph._restore_checkpoint(_initial_state("run-4"), checkpointer)
+
+    assert restored["completed_stages"] == []
+    assert restored["current_stage"] == "research"
+
+
+def test_transient_errors_are_classified():
+    from backend.services.resilience import UpstreamTimeout, is_retryable_failure
+
+    class Unauthorized(Exception):
+        status_code = 401
+
+    class RateLimited(Exception):
+        status_code = 429
+
+    assert is_retryable_failure(UpstreamTimeout("finnhub.quote", 3))
+    assert is_retryable_failure(RateLimited())
+    assert not is_retryable_failure(Unauthorized())
+    assert not is_retryable_failure(ValueError("GROQ_API_KEY not found in environment variables"))
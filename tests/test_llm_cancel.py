@@ -0,0 +1,39 @@
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from backend.services import llm
+from backend.services.cancellation import RunCancelled, RunContext, bind_run
+
+
+class SlowLLM:
+    def __init__(self, release):
+        self.release = release
+
+    def invoke(self, messages):
+        self.release.wait(5)
+        return AIMessage(content="late", response_metadata={"token_usage": {"prompt_tokens": 50, "completion_tokens": 5}})
+
+
+def test_cancel_abandons_in_flight_call(monkeypatch):
+    release = threading.Event()
+    recorded = []
+    monkeypatch.setattr(llm, "get_llm", lambda **kwargs: SlowLLM(release))
+    monkeypatch.setattr(llm, "record_run_tokens", lambda run, agent, *usage: recorded.append(usage))
+
+    run = RunContext(run_id="cancel-test")
+    threading.Timer(0.3, run.cancel, args=("client_disconnected",)).start()
+    start = time.perf_counter()
+    with bind_run(run), pytest.raises(RunCancelled):
+        llm.invoke_llm("writer", "summary", [HumanMessage(content="hi")])
+    assert time.perf_counter() - start < 2
+
+    # The abandoned call still counts against the run once it returns.
+    release.set()
+    for _ in range(50):
+        if recorded:
+            break
+        time.sleep(0.05)
+    assert recorded == [(50, 5)]
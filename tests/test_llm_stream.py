@@ -0,0 +1,43 @@
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+from backend.services import llm
+
+
+class FakeChatGroq:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def stream(self, messages):
+        return iter(self.chunks)
+
+
+def _delta(content, **metadata):
+    return AIMessageChunk(content=content, response_metadata=metadata)
+
+
+def _stream(monkeypatch, chunks):
+    recorded = []
+    monkeypatch.setattr(llm, "get_llm", lambda **kwargs: FakeChatGroq(chunks))
+    monkeypatch.setattr(llm, "record_run_tokens", lambda run, agent, *usage: recorded.append(usage))
+    tokens = []
+    response = llm.stream_llm("quick", "summary", [HumanMessage(content="x" * 400)], on_token=tokens.append)
+    return recorded, response, tokens
+
+
+def test_stream_records_usage_from_chunk_metadata(monkeypatch):
+    chunks = [
+        _delta("Hello"),
+        _delta(" world", x_groq={"usage": {"prompt_tokens": 120, "completion_tokens": 7}}),
+    ]
+    recorded, response, tokens = _stream(monkeypatch, chunks)
+
+    assert response.content == "Hello world"
+    assert tokens == ["Hello", " world"]
+    assert recorded == [(120, 7)]
+
+
+def test_stream_without_usage_records_an_estimate(monkeypatch):
+    recorded, response, _ = _stream(monkeypatch, [_delta("a" * 40)])
+
+    assert response.content == "a" * 40
+    assert recorded == [(100, 10)]
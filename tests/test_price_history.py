@@ -0,0 +1,21 @@
+import pandas as pd
+
+from backend.services import price_history
+from backend.services.cancellation import RunContext, bind_run, current_run
+
+
+def test_histories_are_fetched_in_the_callers_run(monkeypatch):
+    seen = {}
+
+    def fake_history(ticker, period):
+        seen[ticker] = current_run()
+        return pd.DataFrame({"Close": [1.0]}) if ticker != "NODATA" else pd.DataFrame()
+
+    monkeypatch.setattr(price_history, "get_price_history", fake_history)
+    run = RunContext(run_id="histories")
+
+    with bind_run(run):
+        frames = price_history.get_price_histories(["aapl", "msft", "nodata", "AAPL"])
+
+    assert sorted(frames) == ["AAPL", "MSFT"]
+    assert all(r is run for r in seen.values())
@@ -0,0 +1,48 @@
+import threading
+
+from backend.services import quick_analysis
+from backend.services.cancellation import RunContext, bind_run, current_run
+
+
+def test_cached_quote_skips_quote_fetch(monkeypatch):
+    requested = []
+
+    def fake_fetch(tickers, endpoints):
+        requested.append(list(endpoints))
+        return {ticker: {"quote": {"c": 1.0, "dp": 0.0}} for ticker in tickers}
+
+    monkeypatch.setattr(quick_analysis, "fetch_many_sync", fake_fetch)
+    monkeypatch.setattr(quick_analysis, "get_cached_quote", lambda ticker: {"c": 190.5, "dp": 1.25})
+    monkeypatch.setattr(quick_analysis.finnhub_client, "get_company_news", lambda *args: [])
+    monkeypatch.setattr(quick_analysis, "_price_facts", lambda ticker: {})
+
+    facts = quick_analysis.gather_facts_many(["aapl"])
+
+    assert "quote" not in requested[0]
+    assert facts["AAPL"]["price"] == 190.5
+    assert facts["AAPL"]["change_today_pct"] == 1.25
+
+
+def test_stragglers_do_not_starve_later_runs(monkeypatch):
+    release = threading.Event()
+    runs = []
+
+    def slow_fetch(tickers, endpoints):
+        runs.append(current_run())
+        release.wait(5)
+        return {}
+
+    monkeypatch.setattr(quick_analysis, "fetch_many_sync", slow_fetch)
+    monkeypatch.setattr(quick_analysis, "get_cached_quote", lambda ticker: None)
+    monkeypatch.setattr(quick_analysis.finnhub_client, "get_company_news", lambda *args: release.wait(5) or [])
+    monkeypatch.setattr(quick_analysis, "_price_facts", lambda ticker: {"last_close": 10.0})
+
+    try:
+        for i in range(8):
+            run = RunContext(run_id=f"quick-{i}")
+            with bind_run(run):
+                facts = quick_analysis.gather_facts_many(["MSFT"], timeout=0.2)
+            assert facts["MSFT"]["unavailable"] == ["finnhub", "news"]
+            assert runs[-1] is run
+    finally:
+        release.set()
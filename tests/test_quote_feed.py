@@ -0,0 +1,89 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from backend.services.quote_feed import QuoteTable, QUOTE_FEED_SESSION_TZ
+
+
+def _ts(*args) -> int:
+    return int(datetime(*args, tzinfo=QUOTE_FEED_SESSION_TZ).timestamp())
+
+
+@pytest.fixture
+def open_table(tmp_path):
+    name = f"test_quotes_{uuid.uuid4().hex[:8]}"
+    tables = []
+
+    def open_table(symbols=("AAPL", "MSFT")):
+        table = QuoteTable(name, list(symbols), lock_path=str(tmp_path / "quotes.lock"))
+        tables.append(table)
+        return table
+
+    yield open_table
+    for table in reversed(tables):
+        if table.rows is not None:
+            table.close()
+
+
+def test_attached_process_reads_owner_quotes(open_table):
+    owner, reader = open_table(), open_table()
+    assert owner.owner and not reader.owner
+
+    owner.seed("AAPL", {"c": 190.0, "pc": 188.0, "o": 189.0, "h": 191.0, "l": 187.0, "t": _ts(2026, 3, 2, 10)})
+    assert reader.get("aapl")["c"] == 190.0
+    assert reader.get("MSFT") is None
+
+
+def test_different_symbol_list_refuses_to_attach(open_table):
+    open_table(("AAPL", "MSFT"))
+    with pytest.raises(ValueError):
+        open_table(("AAPL", "NVDA"))
+
+
+def test_standby_takes_over_a_dead_owners_block(open_table):
+    owner, standby = open_table(), open_table()
+    owner.seed("AAPL", {"c": 190.0, "pc": 188.0, "t": _ts(2026, 3, 2, 10)})
+    assert not standby.take_over()
+
+    # A crash releases the lock but leaves the block behind.
+    owner._lock_file.close()
+    owner._lock_file = None
+    owner.owner = False
+
+    assert standby.take_over() and standby.owner
+    assert standby.get("AAPL")["c"] == 190.0
+    standby.apply_trade("AAPL", 191.0, _ts(2026, 3, 2, 10, 5) * 1000)
+    assert owner.get("AAPL")["c"] == 191.0
+
+
+def test_readers_follow_the_block_to_a_new_owner(open_table):
+    owner, reader, standby = open_table(), open_table(), open_table()
+    owner.seed("AAPL", {"c": 190.0, "pc": 188.0, "t": _ts(2026, 3, 2, 10)})
+    assert reader.get("AAPL")["c"] == 190.0
+
+    # A clean shutdown retires and unlinks the block.
+    owner.close()
+    assert reader.get("AAPL") is None
+
+    assert standby.take_over()
+    standby.seed("AAPL", {"c": 192.0, "pc": 190.0, "t": _ts(2026, 3, 2, 11)})
+    assert reader.get("AAPL")["c"] == 192.0
+
+
+def test_trade_in_a_new_session_rolls_the_row_over(open_table):
+    table = open_table()
+    table.seed("AAPL", {"c": 190.0, "pc": 185.0, "o": 186.0, "h": 195.0, "l": 184.0, "t": _ts(2026, 3, 2, 16)})
+
+    assert not table.apply_trade("AAPL", 191.0, _ts(2026, 3, 2, 17) * 1000)
+    assert table.get("AAPL")["h"] == 195.0
+
+    assert table.apply_trade("AAPL", 193.0, _ts(2026, 3, 3, 9, 30) * 1000)
+    quote = table.get("AAPL")
+    assert (quote["pc"], quote["o"], quote["h"], quote["l"]) == (191.0, 193.0, 193.0, 193.0)
+    assert quote["d"] == pytest.approx(2.0)
+
+    # The REST reseed then replaces the approximate close with the official one.
+    table.seed("AAPL", {"c": 190.5, "pc": 185.0, "o": 186.0, "h": 195.0, "l": 184.0, "t": _ts(2026, 3, 2, 16)})
+    quote = table.get("AAPL")
+    assert (quote["c"], quote["pc"], quote["o"]) == (193.0, 190.5, 193.0)
@@ -0,0 +1,37 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from backend.services import agents
+
+
+def _route(monkeypatch, messages, replies):
+    turns = []
+
+    def fake_invoke(agent, turn, messages, temperature=0.7, tools=None):
+        turns.append(turn)
+        return replies.pop(0)
+
+    monkeypatch.setattr(agents, "invoke_llm", fake_invoke)
+    agents.invoke_react_turn("research", messages, agents.research_tools, temperature=0.7)
+    return turns
+
+
+def test_turn_after_tool_results_goes_to_the_fast_tier(monkeypatch):
+    call = {"name": "get_company_profile", "args": {"ticker": "AAPL"}, "id": "call_1"}
+    messages = [
+        SystemMessage(content="research"),
+        HumanMessage(content="AAPL"),
+        AIMessage(content="", tool_calls=[call]),
+        ToolMessage(content="{}", name="get_company_profile", tool_call_id="call_1"),
+    ]
+    assert _route(monkeypatch, messages, [AIMessage(content="", tool_calls=[call])]) == ["tool"]
+
+
+def test_fast_answer_without_tool_calls_is_rerun_on_the_report_route(monkeypatch):
+    messages = [HumanMessage(content="AAPL"), ToolMessage(content="{}", name="get_quote", tool_call_id="call_1")]
+    turns = _route(monkeypatch, messages, [AIMessage(content="draft"), AIMessage(content="report")])
+    assert turns == ["tool", "report"]
+
+
+def test_turn_without_pending_tool_results_goes_to_the_report_route(monkeypatch):
+    messages = [SystemMessage(content="research"), HumanMessage(content="AAPL")]
+    assert _route(monkeypatch, messages, [AIMessage(content="report")]) == ["report"]
@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from backend.services import resilience
+from backend.services.resilience import (
+    CallPolicy, EmptyResponse, ResilientCaller, UpstreamSaturated, UpstreamTimeout
+)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "UPSTREAM_BACKOFF_SECONDS", 0)
+
+
+def test_empty_dataframe_is_retried():
+    caller = ResilientCaller({"yfinance.history": CallPolicy(timeout=2, retry_empty=True)})
+    frames = [pd.DataFrame(), pd.DataFrame({"Close": [1.0]})]
+
+    result = caller.call("yfinance.history", lambda: frames.pop(0))
+
+    assert list(result["Close"]) == [1.0]
+    assert not frames
+
+
+def test_empty_result_fails_after_the_last_attempt():
+    caller = ResilientCaller({"yfinance.history": CallPolicy(timeout=2, attempts=2, retry_empty=True)})
+    calls = []
+
+    with pytest.raises(EmptyResponse):
+        caller.call("yfinance.history", lambda: calls.append(1) or pd.DataFrame())
+    assert len(calls) == 2
+
+
+def test_abandoned_calls_are_capped_per_upstream():
+    caller = ResilientCaller({"finnhub.quote": CallPolicy(timeout=0.1, attempts=1)}, max_in_flight=2)
+    release = threading.Event()
+    hung = lambda: release.wait(5)
+
+    for _ in range(2):
+        with pytest.raises(UpstreamTimeout):
+            caller.call("finnhub.quote", hung)
+    with pytest.raises(UpstreamSaturated):
+        caller.call("finnhub.quote", hung)
+    # Other upstreams keep their own slots.
+    assert caller.call("yfinance.history", lambda: "ok") == "ok"
+
+    release.set()
+    time.sleep(0.1)
+    assert caller.call("finnhub.quote", lambda: {"c": 1.0}) == {"c": 1.0}
+
+
+def test_no_hedge_without_a_free_slot(monkeypatch):
+    caller = ResilientCaller({"finnhub.quote": CallPolicy(timeout=1, attempts=1, hedge=True)}, max_in_flight=1)
+    monkeypatch.setattr(caller, "_hedge_delay", lambda endpoint, policy: 0.05)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "primary"
+
+    assert caller.call("finnhub.quote", slow) == "primary"
+    assert len(calls) == 1
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+from backend.routes.responses import parse_fields, project
+from backend.schemas.analysis import AnalysisResponse, RunProgress
+
+
+def test_known_paths_are_accepted():
+    assert parse_fields("status, report_data.report_text", AnalysisResponse) == ["status", "report_data.report_text"]
+    assert parse_fields("completed_stages", RunProgress) == ["completed_stages"]
+    # research_data allows extra keys, so anything below it is accepted.
+    assert parse_fields("research_data.news_summary", AnalysisResponse) == ["research_data.news_summary"]
+    assert parse_fields("", AnalysisResponse) is None
+
+
+@pytest.mark.parametrize("fields, model", [
+    ("stauts", AnalysisResponse),
+    ("report_data.report", AnalysisResponse),
+    ("status.value", AnalysisResponse),
+    ("agent_statuses.status", AnalysisResponse),
+    ("completed_stages", AnalysisResponse),
+    ("cached,timestamp", RunProgress),
+])
+def test_unknown_paths_are_rejected_up_front(fields, model):
+    with pytest.raises(HTTPException) as error:
+        parse_fields(fields, model)
+    assert error.value.status_code == 400
+
+
+def test_project_fills_missing_values_with_none():
+    payload = {"status": "completed", "report_data": None, "research_data": {"summary": "s"}}
+    selected = parse_fields("status,report_data.report_text,research_data.extra", AnalysisResponse)
+    assert project(payload, selected) == {
+        "status": "completed",
+        "report_data": None,
+        "research_data": {"extra": None},
+    }
+
+
+def test_token_stream_passes_the_compression_middleware_unbuffered():
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    from backend.routes.responses import add_compression
+
+    async def scenario():
+        first_sent, finished = asyncio.Event(), asyncio.Event()
+        messages = []
+
+        async def tokens():
+            yield b'{"event": "token", "text": "Hello"}\n'
+            # Resumes only once the first line has reached the client, so a
+            # middleware that buffers the stream times out here.
+            await asyncio.wait_for(first_sent.wait(), timeout=2)
+            yield b'{"event": "result"}\n'
+
+        app = FastAPI()
+
+        @app.get("/stream")
+        async def stream():
+            return StreamingResponse(tokens(), media_type="application/x-ndjson", headers={"Content-Encoding": "identity"})
+
+        add_compression(app)
+
+        async def receive():
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body":
+                if message.get("more_body") and message.get("body"):
+                    first_sent.set()
+                if not message.get("more_body"):
+                    finished.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/stream", "raw_path": b"/stream", "query_string": b"", "root_path": "",
+            "headers": [(b"host", b"test"), (b"accept-encoding", b"br, gzip")],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        await app(scope, receive, send)
+        return messages
+
+    messages = asyncio.run(scenario())
+    start = messages[0]
+    bodies = [m for m in messages if m["type"] == "http.response.body"]
+
+    assert (b"content-encoding", b"identity") in start["headers"]
+    assert bodies[0]["body"] == b'{"event": "token", "text": "Hello"}\n' and bodies[0]["more_body"]
+    assert b"".join(m.get("body", b"") for m in bodies).endswith(b'{"event": "result"}\n')
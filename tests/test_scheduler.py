@@ -0,0 +1,35 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from backend.services.scheduler import CronSchedule, ScheduledJob, Scheduler
+
+
+@pytest.mark.parametrize("expression", ["0 0 29 2 *", "0 0 30 2 *", "0 0 31 4,6 *"])
+def test_schedules_that_skip_years_are_rejected(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+@pytest.mark.parametrize("expression", ["0 0 29 2 1", "0 0 28-29 2 *", "0 0 31 * *"])
+def test_schedules_that_fire_every_year_are_accepted(expression):
+    schedule = CronSchedule(expression)
+    assert schedule.next_after(datetime(2025, 3, 1)) is not None
+
+
+def test_bad_job_does_not_break_the_config(tmp_path):
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps({"jobs": [
+        {"name": "leap", "cron": "0 0 29 2 *", "symbols": ["AAPL"]},
+        {"name": "open", "cron": "0 9 * * 1-5", "symbols": ["AAPL"]},
+    ]}))
+    scheduler = Scheduler.from_config(str(path))
+    assert list(scheduler.jobs) == ["open"]
+
+
+def test_trigger_refuses_when_not_running():
+    scheduler = Scheduler([ScheduledJob("open", "0 9 * * 1-5", ["AAPL"], ["warm"])])
+    assert scheduler.running is False
+    assert scheduler.trigger("open") is False
+    assert not scheduler._pending
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from backend.services.screener import ScreenerIndex, INDICATOR_FIELDS
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = ScreenerIndex(path=str(tmp_path / "screener.npz"))
+    monkeypatch.setattr(ScreenerIndex, "_fetch_metrics", staticmethod(
+        lambda symbols: [{"pe_ratio": float(i + 10)} for i, _ in enumerate(symbols)]
+    ))
+    monkeypatch.setattr(ScreenerIndex, "_latest_indicators", staticmethod(
+        lambda symbols: {field: np.full(len(symbols), np.nan) for field in INDICATOR_FIELDS}
+    ))
+    return index
+
+
+def test_refresh_swaps_one_immutable_snapshot(index):
+    before = index._data
+    assert index.refresh(["msft", "aapl"])["status"] == "completed"
+
+    symbols, columns, refreshed_at = index._data
+    assert index._data is not before
+    assert list(symbols) == ["AAPL", "MSFT"]
+    assert len(columns["pe_ratio"]) == len(symbols)
+    assert refreshed_at is not None
+    with pytest.raises(ValueError):
+        columns["pe_ratio"][0] = 0
+
+    result = index.screen("pe_ratio > 10")
+    assert result["tickers"] == ["MSFT"]
+    assert result["refreshed_at"] == refreshed_at
+
+
+def test_snapshot_survives_reload(index):
+    index.refresh(["AAPL", "MSFT"])
+    reloaded = ScreenerIndex(path=index.path)
+    assert list(reloaded.symbols) == ["AAPL", "MSFT"]
+    assert reloaded.refreshed_at == index.refreshed_at
+
+
+def test_refresh_reports_already_running_with_status(index):
+    assert index.claim_refresh()
+
+    result = index.refresh(["AAPL"])
+    assert result["status"] == "already_running"
+    assert result["refreshing"] and result["refresh_started_at"] is not None
+
+    assert index.refresh(["AAPL"], claimed=True)["status"] == "completed"
+    assert not index.refresh_status()["refreshing"]
@@ -0,0 +1,23 @@
+import pytest
+
+from backend.services.sentiment import score_texts
+
+
+@pytest.mark.parametrize("text", [
+    "Apple won a lucrative contract",
+    "We can deliver strong growth",
+])
+def test_modal_verbs_do_not_negate(text):
+    assert score_texts([text])["score"][0] == 1.0
+
+
+@pytest.mark.parametrize("text", [
+    "We can't deliver strong growth",
+    "Apple won't see gains this year",
+    "Margins didn't improve",
+    "Sales won’t improve",
+])
+def test_contractions_negate(text):
+    result = score_texts([text])
+    assert result["positive"][0] == 0
+    assert result["score"][0] == -1.0
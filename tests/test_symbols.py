@@ -0,0 +1,35 @@
+import csv
+
+from backend.services.symbols import FIELDS, SymbolIndex
+
+
+def _index(tmp_path, records) -> SymbolIndex:
+    path = tmp_path / "symbols.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    return SymbolIndex(str(path))
+
+
+def test_name_search_matches_every_query_word(tmp_path):
+    index = _index(tmp_path, [
+        {"symbol": "AAPL", "name": "Apple Inc", "type": "Common Stock", "exchange": "XNAS"},
+        {"symbol": "APLE", "name": "Apple Hospitality REIT", "type": "REIT", "exchange": "XNYS"},
+        {"symbol": "MSFT", "name": "Microsoft Corp", "type": "Common Stock", "exchange": "XNAS"},
+    ])
+
+    assert [r["symbol"] for r in index.search("apple hosp")] == ["APLE"]
+    assert [r["symbol"] for r in index.search("MS")] == ["MSFT"]
+
+
+def test_name_scan_is_bounded_by_limit(tmp_path):
+    records = [
+        {"symbol": f"G{i:04d}", "name": f"Global Fund {i:04d}", "type": "ETF", "exchange": "XNYS"}
+        for i in range(5000)
+    ]
+    index = _index(tmp_path, records)
+
+    # Only the first limit * 20 entries for "global" are examined.
+    assert index.search("global fund 0150", limit=5) == []
+    assert [r["symbol"] for r in index.search("global fund 0042", limit=5)] == ["G0042"]
@@ -0,0 +1,26 @@
+import pytest
+
+from backend.services import synthesis
+from backend.services.cancellation import RunCancelled, RunContext, bind_run, check_cancelled
+
+
+def _report(sections: int) -> str:
+    return "\n\n".join(f"## Section {i}\n\n" + ("Revenue grew 12% on strong demand. " * 60) for i in range(sections))
+
+
+def test_cancelled_run_stops_condensing(monkeypatch):
+    run = RunContext(run_id="digest-cancel")
+    calls = []
+
+    def fake_invoke(agent, turn, messages, temperature=0.7, tools=None):
+        check_cancelled()
+        calls.append(turn)
+        run.cancel("token_budget_exceeded")
+        raise RunCancelled(run.reason)
+
+    monkeypatch.setattr(synthesis, "invoke_llm", fake_invoke)
+    monkeypatch.setattr(synthesis, "MAP_WORKERS", 1)
+
+    with bind_run(run), pytest.raises(RunCancelled):
+        synthesis.build_writer_digests("AAPL", _report(4), _report(4))
+    assert len(calls) == 1